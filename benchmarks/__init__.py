@@ -0,0 +1,2 @@
+"""
+Benchmarks measuring the overhead dynapipeline adds around user code"""
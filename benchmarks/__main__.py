@@ -0,0 +1,88 @@
+"""
+    Command line entry point: python -m benchmarks run|compare
+"""
+import argparse
+import datetime
+import json
+import platform
+import sys
+
+from benchmarks import bench_context, bench_factory, bench_handlers, bench_strategies
+from benchmarks.compare import compare_results
+from benchmarks.harness import run_benchmarks
+
+
+def _all_benchmarks():
+    """Returns every benchmark of the suite"""
+    return (
+        bench_strategies.benchmarks()
+        + bench_handlers.benchmarks()
+        + bench_context.benchmarks()
+        + bench_factory.benchmarks()
+    )
+
+
+def _run(args) -> int:
+    """Runs the suite and writes the JSON results"""
+    results = run_benchmarks(
+        _all_benchmarks(), quick=args.quick, name_filter=args.filter
+    )
+    document = {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(document, file, indent=2)
+    print(f"results written to {args.output}")
+    return 0
+
+
+def _compare(args) -> int:
+    """Compares two result files, the exit code is 1 on regressions"""
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    with open(args.current, encoding="utf-8") as file:
+        current = json.load(file)
+    lines, regressions = compare_results(baseline, current, args.threshold)
+    print("\n".join(lines))
+    if regressions:
+        print(
+            f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}"
+        )
+        return 1
+    return 0
+
+
+def main() -> int:
+    """Parses the command line"""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the benchmarks")
+    run.add_argument("-o", "--output", default="benchmark-results.json")
+    run.add_argument("-k", "--filter", default="", help="only run matching benchmarks")
+    run.add_argument(
+        "--quick",
+        action="store_true",
+        help="fewer repeats, skip the slowest benchmarks",
+    )
+    run.set_defaults(func=_run)
+
+    compare = commands.add_parser("compare", help="compare results with a baseline")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.1)
+    compare.set_defaults(func=_compare)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+    Lock contention of AsyncLockableContext
+"""
+import asyncio
+from typing import List
+
+from benchmarks.harness import Benchmark
+from dynapipeline.contexts.async_ctx import AsyncLockableContext
+
+UPDATES = 200
+
+
+def _contended(tasks: int):
+    """Returns a setup function updating one key from several tasks"""
+
+    def setup():
+        """Builds the context and returns the contended update function"""
+        context = AsyncLockableContext({"counter": 0})
+
+        async def worker():
+            """Increments the counter under the context lock"""
+            for _ in range(UPDATES):
+                async with context as ctx:
+                    ctx["counter"] += 1
+                    await asyncio.sleep(0)
+
+        async def run():
+            """Runs all workers concurrently"""
+            await asyncio.gather(*(worker() for _ in range(tasks)))
+
+        return run
+
+    return setup
+
+
+def _key_locked(tasks: int):
+    """Returns a setup function where every task updates its own key"""
+
+    def setup():
+        """Builds the context and returns the per-key update function"""
+        context = AsyncLockableContext({f"key-{i}": 0 for i in range(tasks)})
+
+        async def worker(key: str):
+            """Increments a key under its own lock"""
+            for _ in range(UPDATES):
+                async with context.locked(key) as ctx:
+                    ctx[key] += 1
+                    await asyncio.sleep(0)
+
+        async def run():
+            """Runs all workers concurrently"""
+            await asyncio.gather(*(worker(f"key-{i}") for i in range(tasks)))
+
+        return run
+
+    return setup
+
+
+def benchmarks() -> List[Benchmark]:
+    """Returns the context benchmarks"""
+    return [
+        Benchmark(
+            f"context.async_lock.tasks_{tasks}", _contended(tasks), ops=tasks * UPDATES
+        )
+        for tasks in (1, 10, 100)
+    ] + [
+        Benchmark(
+            f"context.key_lock.tasks_{tasks}", _key_locked(tasks), ops=tasks * UPDATES
+        )
+        for tasks in (1, 10, 100)
+    ]
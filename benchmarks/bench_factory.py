@@ -0,0 +1,59 @@
+"""
+    Construction time of pipelines with 10 to 100k stages
+"""
+from typing import List
+
+from benchmarks.bench_strategies import NoopStage
+from benchmarks.harness import Benchmark
+from dynapipeline import PipelineFactory, PipeLineType, StageGroup
+from dynapipeline.execution.cycle_strategies import OnceCycleStrategy
+from dynapipeline.execution.strategies import SequentialExecutionStrategy
+
+STAGES_PER_GROUP = 10
+
+
+def _build(stages: int):
+    """Returns a setup function building a pipeline with the given number of stages"""
+
+    def setup():
+        """Returns a function constructing stages, groups and the pipeline"""
+
+        def build():
+            """Builds the whole pipeline through PipelineFactory"""
+            groups = [
+                StageGroup(
+                    name=f"group-{g}",
+                    stages=[
+                        NoopStage(name=f"stage-{g}-{s}")
+                        for s in range(min(STAGES_PER_GROUP, stages))
+                    ],
+                    cycle_strategy=OnceCycleStrategy(),
+                    execution_strategy=SequentialExecutionStrategy(),
+                )
+                for g in range(max(stages // STAGES_PER_GROUP, 1))
+            ]
+            PipelineFactory().create_pipeline(
+                pipeline_type=PipeLineType.SIMPLE,
+                name="bench",
+                groups=groups,
+                cycle_strategy=OnceCycleStrategy(),
+                execution_strategy=SequentialExecutionStrategy(),
+            )
+
+        return build
+
+    return setup
+
+
+def benchmarks() -> List[Benchmark]:
+    """Returns the factory benchmarks"""
+    return [
+        Benchmark(
+            f"factory.create_pipeline.stages_{stages}",
+            _build(stages),
+            ops=stages,
+            repeat=3 if stages >= 10_000 else 5,
+            quick=stages <= 10_000,
+        )
+        for stages in (10, 100, 1_000, 10_000, 100_000)
+    ]
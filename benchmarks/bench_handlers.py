@@ -0,0 +1,45 @@
+"""
+    Cost of HandlerRegistry.notify with 0, 1 and N attached handlers
+"""
+from typing import List
+
+from benchmarks.harness import Benchmark
+from dynapipeline.handlers.handler import Handler
+from dynapipeline.handlers.handler_registry import HandlerRegistry
+from dynapipeline.utils.handler_types import HandlerType
+
+CALLS = 1000
+
+
+class CountingHandler(Handler):
+    """A handler with a trivial before hook"""
+
+    def before(self, component, *args, **kwargs):
+        """Does nothing"""
+        return None
+
+
+def _notify(handlers: int):
+    """Returns a setup function for a registry with the given number of handlers"""
+
+    def setup():
+        """Builds the registry and returns a function notifying it CALLS times"""
+        registry = HandlerRegistry()
+        registry.attach([CountingHandler() for _ in range(handlers)])
+
+        async def notify():
+            """Notifies the before hook"""
+            for _ in range(CALLS):
+                await registry.notify(HandlerType.BEFORE, None)
+
+        return notify
+
+    return setup
+
+
+def benchmarks() -> List[Benchmark]:
+    """Returns the handler benchmarks"""
+    return [
+        Benchmark(f"handlers.notify.{count}", _notify(count), ops=CALLS)
+        for count in (0, 1, 10)
+    ]
@@ -0,0 +1,100 @@
+"""
+    Per-stage dispatch overhead of every execution strategy
+"""
+from typing import List
+
+from benchmarks.harness import Benchmark
+from dynapipeline import Stage, StageGroup
+from dynapipeline.execution.cycle_strategies import OnceCycleStrategy
+from dynapipeline.execution.strategies import (
+    ConcurrentExecutionStrategy,
+    MultiprocessExecutionStrategy,
+    MultithreadExecutionStrategy,
+    SemaphoreExecutionStrategy,
+    SequentialExecutionStrategy,
+)
+
+CALLS = 1000
+
+
+class NoopStage(Stage):
+    """A stage without any work so only the framework overhead is measured"""
+
+    async def execute(self, *args, **kwargs):
+        """Returns immediately"""
+        return None
+
+
+def _group_runner(strategy_factory, stages: int):
+    """Returns a setup function building a group of noop stages"""
+
+    def setup():
+        """Builds the group and returns its run method"""
+        group = StageGroup(
+            name="bench",
+            stages=[NoopStage(name=f"stage-{i}") for i in range(stages)],
+            cycle_strategy=OnceCycleStrategy(),
+            execution_strategy=strategy_factory(),
+        )
+        return group.run
+
+    return setup
+
+
+def _stage_runner(direct: bool):
+    """Returns a setup function running a single noop stage CALLS times"""
+
+    def setup():
+        """Builds the stage and returns a function running it"""
+        stage = NoopStage(name="stage")
+        call = stage.execute if direct else stage.run
+
+        async def run():
+            """Runs the stage"""
+            for _ in range(CALLS):
+                await call()
+
+        return run
+
+    return setup
+
+
+def benchmarks() -> List[Benchmark]:
+    """Returns the strategy benchmarks"""
+    return [
+        # floor and cost of Stage.run with every optional feature off, the
+        # difference is the framework's per-stage overhead budget
+        Benchmark("stage.execute.direct", _stage_runner(True), ops=CALLS),
+        Benchmark("stage.run.plain", _stage_runner(False), ops=CALLS),
+        Benchmark(
+            "strategy.sequential.per_stage",
+            _group_runner(SequentialExecutionStrategy, 100),
+            ops=100,
+            number=20,
+        ),
+        Benchmark(
+            "strategy.concurrent.per_stage",
+            _group_runner(ConcurrentExecutionStrategy, 100),
+            ops=100,
+            number=20,
+        ),
+        Benchmark(
+            "strategy.semaphore.per_stage",
+            _group_runner(lambda: SemaphoreExecutionStrategy(10), 100),
+            ops=100,
+            number=20,
+        ),
+        Benchmark(
+            "strategy.multithread.per_stage",
+            _group_runner(MultithreadExecutionStrategy, 20),
+            ops=20,
+            number=5,
+        ),
+        Benchmark(
+            "strategy.multiprocess.per_stage",
+            _group_runner(MultiprocessExecutionStrategy, 8),
+            ops=8,
+            repeat=3,
+            quick=False,
+        ),
+    ]
@@ -0,0 +1,30 @@
+"""
+    Compares benchmark results against a saved baseline
+"""
+from typing import Any, Dict, List, Tuple
+
+
+def compare_results(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float
+) -> Tuple[List[str], List[str]]:
+    """
+    Returns the report lines and the names of benchmarks whose median per
+    operation time grew by more than threshold (0.1 == 10%)
+    """
+    lines = [f"{'benchmark':<45} {'baseline':>12} {'current':>12} {'change':>9}"]
+    regressions = []
+    for name, result in sorted(current["results"].items()):
+        base = baseline["results"].get(name)
+        if base is None:
+            lines.append(f"{name:<45} {'-':>12} {result['median']:>12.3e} {'new':>9}")
+            continue
+        change = result["median"] / base["median"] - 1 if base["median"] else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        lines.append(
+            f"{name:<45} {base['median']:>12.3e} {result['median']:>12.3e} "
+            f"{change:>+8.1%}{flag}"
+        )
+    return lines, regressions
@@ -0,0 +1,82 @@
+"""
+    Contains the timing harness shared by all benchmarks
+"""
+import asyncio
+import inspect
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+BenchFn = Callable[[], Union[None, Awaitable[None]]]
+
+
+class Benchmark:
+    """
+    A named benchmark, `setup` builds the function to time and `ops` tells how
+    many operations a single call of that function performs
+    """
+
+    def __init__(
+        self,
+        name: str,
+        setup: Callable[[], BenchFn],
+        ops: int = 1,
+        repeat: int = 5,
+        number: int = 1,
+        quick: bool = True,
+    ):
+        self.name = name
+        self.setup = setup
+        self.ops = ops
+        self.repeat = repeat
+        self.number = number
+        self.quick = quick
+
+    async def _call(self, fn: BenchFn) -> None:
+        """Calls the benchmark function, awaiting it if needed"""
+        result = fn()
+        if inspect.isawaitable(result):
+            await result
+
+    async def measure(self, repeat: Optional[int] = None) -> Dict[str, Any]:
+        """Times the benchmark and returns per operation statistics in seconds"""
+        fn = self.setup()
+        await self._call(fn)  # warm up
+        samples: List[float] = []
+        for _ in range(repeat or self.repeat):
+            start = time.perf_counter()
+            for _ in range(self.number):
+                await self._call(fn)
+            elapsed = time.perf_counter() - start
+            samples.append(elapsed / (self.number * self.ops))
+        return {
+            "unit": "s/op",
+            "ops": self.ops * self.number,
+            "repeat": len(samples),
+            "min": min(samples),
+            "median": statistics.median(samples),
+            "mean": statistics.fmean(samples),
+            "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        }
+
+
+def run_benchmarks(
+    benchmarks: List[Benchmark], quick: bool = False, name_filter: str = ""
+) -> Dict[str, Dict[str, Any]]:
+    """Runs the benchmarks in a fresh event loop and returns their results by name"""
+
+    async def _run_all():
+        """Measures every selected benchmark"""
+        results = {}
+        for benchmark in benchmarks:
+            if name_filter and name_filter not in benchmark.name:
+                continue
+            if quick and not benchmark.quick:
+                continue
+            print(f"running {benchmark.name} ...", flush=True)
+            results[benchmark.name] = await benchmark.measure(
+                repeat=2 if quick else None
+            )
+        return results
+
+    return asyncio.run(_run_all())
@@ -2,6 +2,7 @@
 from dynapipeline.pipelines.factory import PipelineFactory
 from dynapipeline.pipelines.stage import Stage
 from dynapipeline.pipelines.stage_group import StageGroup
+from dynapipeline.utils.idle import IDLE
 from dynapipeline.utils.pipeline_types import PipeLineType
 
-__all__ = ["PipelineFactory", "Stage", "StageGroup", "PipeLineType"]
+__all__ = ["PipelineFactory", "Stage", "StageGroup", "PipeLineType", "IDLE"]
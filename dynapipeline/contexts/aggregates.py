@@ -0,0 +1,309 @@
+"""
+    Contains mergeable aggregate values that stages update without the context lock
+"""
+import hashlib
+import math
+import threading
+import uuid
+import weakref
+from abc import ABC, abstractmethod
+from collections import Counter as _Counter
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from dynapipeline.metrics.cells import ThreadCells
+from dynapipeline.metrics.histogram import LatencyHistogram
+
+# aggregates created in this process, keyed by their id
+_instances: "weakref.WeakValueDictionary[str, Aggregate]" = (
+    weakref.WeakValueDictionary()
+)
+# copies of aggregates unpickled in this process
+_copies: "weakref.WeakSet[Aggregate]" = weakref.WeakSet()
+
+
+class Aggregate(ABC):
+    """
+    Base class for conflict-free aggregate values stored in a context
+
+    Every thread updates its own replica so updates never take a lock, reads
+    merge the replicas on demand. The replica of a finished thread is merged
+    and dropped, so threads created per cycle do not pile up. A copy unpickled in a worker process only
+    records the updates made there, `collect_deltas` ships them back and
+    `apply_deltas` merges them into the original aggregate
+    """
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self._base = self._empty()
+        self._replicas: ThreadCells[Any] = ThreadCells(self._empty, self._merge)
+        self._lock = threading.Lock()
+        _instances[self.id] = self
+
+    @abstractmethod
+    def _empty(self) -> Any:
+        """Returns a new empty state"""
+        raise NotImplementedError("Subclasses must implement the _empty method")
+
+    @abstractmethod
+    def _merge(self, target: Any, source: Any) -> None:
+        """Merges source into target in place"""
+        raise NotImplementedError("Subclasses must implement the _merge method")
+
+    @abstractmethod
+    def _result(self, state: Any) -> Any:
+        """Returns the user facing value of a state"""
+        raise NotImplementedError("Subclasses must implement the _result method")
+
+    def _replica(self) -> Any:
+        """Returns the replica of the calling thread"""
+        return self._replicas.get()
+
+    def _state(self) -> Any:
+        """Returns a new state merging the base with every replica"""
+        with self._lock:
+            state = self._empty()
+            self._merge(state, self._base)
+        return self._replicas.fold_into(state)
+
+    @property
+    def value(self) -> Any:
+        """Returns the merged value of all replicas"""
+        return self._result(self._state())
+
+    def merge(self, other: "Aggregate") -> None:
+        """Merges the value of another aggregate of the same type"""
+        if type(other) is not type(self):
+            raise TypeError(
+                f"Cannot merge {type(other).__name__} into {type(self).__name__}"
+            )
+        self.merge_state(other._state())
+
+    def merge_state(self, state: Any) -> None:
+        """Merges a raw state, such as a delta returned by a worker process"""
+        with self._lock:
+            self._merge(self._base, state)
+
+    def drain(self) -> Any:
+        """Removes the replicas and returns their merged state"""
+        with self._lock:
+            delta = self._replicas.drain(self._empty())
+            self._merge(self._base, delta)
+        return delta
+
+    def __getstate__(self):
+        """Pickles the merged value as the base of the copy"""
+        state = self.__dict__.copy()
+        state["_base"] = self._state()
+        del state["_lock"], state["_replicas"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._replicas = ThreadCells(self._empty, self._merge)
+        self._lock = threading.Lock()
+        _copies.add(self)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(value={self.value!r})"
+
+
+def collect_deltas() -> Dict[str, Any]:
+    """Drains the updates made to unpickled aggregates in this process"""
+    return {
+        aggregate.id: aggregate.drain()
+        for aggregate in list(_copies)
+        if aggregate._replicas.written()
+    }
+
+
+def apply_deltas(deltas: Dict[str, Any]) -> None:
+    """Merges deltas collected in another process into the local aggregates"""
+    for aggregate_id, delta in deltas.items():
+        aggregate = _instances.get(aggregate_id)
+        if aggregate is not None:
+            aggregate.merge_state(delta)
+
+
+class Counter(Aggregate):
+    """Sum of the amounts added, amounts may be negative"""
+
+    def _empty(self) -> List[int]:
+        return [0]
+
+    def _merge(self, target: List[int], source: List[int]) -> None:
+        target[0] += source[0]
+
+    def _result(self, state: List[int]) -> int:
+        return state[0]
+
+    def add(self, amount: int = 1) -> None:
+        """Adds amount to the counter"""
+        self._replica()[0] += amount
+
+
+class Maximum(Aggregate):
+    """Largest value added, None while empty"""
+
+    def _empty(self) -> List[Any]:
+        return [None]
+
+    def _merge(self, target: List[Any], source: List[Any]) -> None:
+        if source[0] is not None and (target[0] is None or source[0] > target[0]):
+            target[0] = source[0]
+
+    def _result(self, state: List[Any]) -> Any:
+        return state[0]
+
+    def add(self, value: Any) -> None:
+        """Keeps value if it is larger than the current maximum"""
+        self._merge(self._replica(), [value])
+
+
+class Minimum(Aggregate):
+    """Smallest value added, None while empty"""
+
+    def _empty(self) -> List[Any]:
+        return [None]
+
+    def _merge(self, target: List[Any], source: List[Any]) -> None:
+        if source[0] is not None and (target[0] is None or source[0] < target[0]):
+            target[0] = source[0]
+
+    def _result(self, state: List[Any]) -> Any:
+        return state[0]
+
+    def add(self, value: Any) -> None:
+        """Keeps value if it is smaller than the current minimum"""
+        self._merge(self._replica(), [value])
+
+
+class SetUnion(Aggregate):
+    """Union of the items added"""
+
+    def _empty(self) -> set:
+        return set()
+
+    def _merge(self, target: set, source: set) -> None:
+        target |= source
+
+    def _result(self, state: set) -> frozenset:
+        return frozenset(state)
+
+    def add(self, item: Hashable) -> None:
+        """Adds item to the set"""
+        self._replica().add(item)
+
+
+def _hash64(item: Any) -> int:
+    """Returns a 64 bit hash of item that is stable across processes"""
+    if isinstance(item, str):
+        data = item.encode()
+    elif isinstance(item, (bytes, bytearray, memoryview)):
+        data = bytes(item)
+    else:
+        data = repr(item).encode()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+
+class HyperLogLog(Aggregate):
+    """
+    Approximate count of distinct items using 2**precision registers
+    The standard error is about 1.04 / sqrt(2**precision)
+    """
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        super().__init__()
+
+    def _empty(self) -> bytearray:
+        return bytearray(1 << self.precision)
+
+    def _merge(self, target: bytearray, source: bytearray) -> None:
+        target[:] = bytes(map(max, target, source))
+
+    def _result(self, state: bytearray) -> int:
+        registers = len(state)
+        alpha = 0.7213 / (1 + 1.079 / registers)
+        estimate = alpha * registers**2 / sum(2.0**-rank for rank in state)
+        zeros = state.count(0)
+        if estimate <= 2.5 * registers and zeros:
+            estimate = registers * math.log(registers / zeros)
+        return round(estimate)
+
+    def add(self, item: Any) -> None:
+        """Adds item to the distinct count"""
+        value = _hash64(item)
+        bits = 64 - self.precision
+        index = value >> bits
+        rank = bits - (value & ((1 << bits) - 1)).bit_length() + 1
+        replica = self._replica()
+        if rank > replica[index]:
+            replica[index] = rank
+
+
+class TopK(Aggregate):
+    """
+    Most frequent items and their counts
+
+    Every replica keeps at most `capacity` items, the least frequent ones are
+    dropped when it grows beyond twice that, so counts of rare items are
+    approximate while the heavy hitters stay accurate
+    """
+
+    def __init__(self, k: int = 10, capacity: Optional[int] = None):
+        if k < 1:
+            raise ValueError("k must be a positive integer")
+        self.k = k
+        self.capacity = max(capacity or 10 * k, k)
+        super().__init__()
+
+    def _empty(self) -> _Counter:
+        return _Counter()
+
+    def _merge(self, target: _Counter, source: _Counter) -> None:
+        target.update(dict(source))
+        self._trim(target)
+
+    def _trim(self, state: _Counter) -> None:
+        """Keeps the capacity most frequent items once the state grows too large"""
+        if len(state) > 2 * self.capacity:
+            kept = dict(state.most_common(self.capacity))
+            state.clear()
+            state.update(kept)
+
+    def _result(self, state: _Counter) -> List[Tuple[Hashable, int]]:
+        return state.most_common(self.k)
+
+    def add(self, item: Hashable, count: int = 1) -> None:
+        """Adds count occurrences of item"""
+        replica = self._replica()
+        replica[item] += count
+        self._trim(replica)
+
+
+class Histogram(Aggregate):
+    """Log-bucketed histogram of non-negative integer values"""
+
+    def __init__(self, precision: int = 5):
+        self.precision = precision
+        super().__init__()
+
+    def _empty(self) -> LatencyHistogram:
+        return LatencyHistogram(self.precision)
+
+    def _merge(self, target: LatencyHistogram, source: LatencyHistogram) -> None:
+        snapshot = LatencyHistogram(self.precision)
+        # copy the buckets first, the owning thread may be recording into source
+        snapshot._buckets = dict(source._buckets)
+        snapshot.count, snapshot.total = source.count, source.total
+        snapshot.min, snapshot.max = source.min, source.max
+        target.merge(snapshot)
+
+    def _result(self, state: LatencyHistogram) -> LatencyHistogram:
+        return state
+
+    def add(self, value: int) -> None:
+        """Records value"""
+        self._replica().record(value)
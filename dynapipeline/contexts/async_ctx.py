@@ -2,14 +2,64 @@
     Contains AsyncLockableContext that extends AsyncLockableContext with asyncio.Lock
 """
 import asyncio
-from typing import Any, Dict, Optional
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
 
 from dynapipeline.core.context import AbstractContext
+from dynapipeline.exceptions.context import ContextKeyError
+from dynapipeline.tracing.tracer import trace_span
+
+_DELETED = object()
+
+
+class KeyTransaction:
+    """
+    Buffers writes to the locked keys of an AsyncLockableContext,
+    they are applied together when the transaction succeeds
+    """
+
+    def __init__(self, context: "AsyncLockableContext", keys: frozenset):
+        self._context = context
+        self._keys = keys
+        self.changes: Dict[str, Any] = {}
+
+    def _check(self, key: str):
+        """Raises ContextKeyError for keys that are not locked by the transaction"""
+        if key not in self._keys:
+            raise ContextKeyError(key, f"Key '{key}' is not locked by the transaction")
+
+    def __getitem__(self, key: str) -> Any:
+        self._check(key)
+        if key in self.changes:
+            value = self.changes[key]
+            if value is _DELETED:
+                raise KeyError(key)
+            return value
+        return self._context[key]
+
+    def __setitem__(self, key: str, value: Any):
+        self._check(key)
+        self.changes[key] = value
+
+    def __delitem__(self, key: str):
+        self._check(key)
+        self.changes[key] = _DELETED
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Returns the value of a key as seen by the transaction"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
 
 
 class AsyncLockableContext(AbstractContext):
     """
     Extends AbstractContext with an asyncio.Lock
+
+    Besides the global lock, single keys can be locked with `locked(*keys)` so
+    stages updating unrelated keys do not serialise each other. The global lock
+    waits for all key locks to be released and blocks new ones while held
     """
 
     def __init__(self, initial_data: Optional[Dict[str, Any]] = None):
@@ -17,26 +67,100 @@ class AsyncLockableContext(AbstractContext):
         if initial_data:
             self._data.update(initial_data)
         self._async_lock = asyncio.Lock()
+        self._key_locks: Dict[str, asyncio.Lock] = {}
+        self._key_holders = 0
+        self._keys_idle = asyncio.Event()
+        self._keys_idle.set()
+        self._global_released = asyncio.Event()
+        self._global_released.set()
+
+    async def _acquire_global(self):
+        """Acquires the global lock and waits for key lock holders to finish"""
+        if self._async_lock.locked() or self._key_holders:
+            with trace_span("wait:context lock", kind="wait"):
+                await self._async_lock.acquire()
+                self._global_released.clear()
+                try:
+                    await self._keys_idle.wait()
+                except BaseException:
+                    self._release_global()
+                    raise
+        else:
+            await self._async_lock.acquire()
+            self._global_released.clear()
+
+    def _release_global(self):
+        """Releases the global lock"""
+        self._async_lock.release()
+        self._global_released.set()
 
     async def lock(self):
         """Locks the context to prevent further modifications"""
-        await self._async_lock.acquire()
+        await self._acquire_global()
 
     async def unlock(self):
         """Unlocks the context to allow modifications"""
         if self.is_locked:
-            self._async_lock.release()
+            self._release_global()
 
     @property
     def is_locked(self) -> bool:
         """Returns True if the context is locked"""
         return self._async_lock.locked()
 
+    @asynccontextmanager
+    async def locked(self, *keys: str) -> AsyncIterator["AsyncLockableContext"]:
+        """
+        Locks only the given keys for the duration of the block
+        Keys are always acquired in sorted order so overlapping key sets cannot
+        deadlock, do not enter the global lock while holding key locks
+        """
+        ordered = sorted(set(keys))
+        while self._async_lock.locked():
+            await self._global_released.wait()
+        self._key_holders += 1
+        self._keys_idle.clear()
+        acquired = []
+        try:
+            for key in ordered:
+                key_lock = self._key_locks.get(key)
+                if key_lock is None:
+                    key_lock = self._key_locks[key] = asyncio.Lock()
+                if key_lock.locked():
+                    with trace_span("wait:context key lock", kind="wait", key=key):
+                        await key_lock.acquire()
+                else:
+                    await key_lock.acquire()
+                acquired.append(key_lock)
+            yield self
+        finally:
+            for key_lock in reversed(acquired):
+                key_lock.release()
+            self._key_holders -= 1
+            if not self._key_holders:
+                self._keys_idle.set()
+
+    @asynccontextmanager
+    async def transaction(self, *keys: str) -> AsyncIterator[KeyTransaction]:
+        """
+        Locks the keys and yields a KeyTransaction, its writes are applied
+        together at the end of the block and discarded if the block fails
+        """
+        async with self.locked(*keys):
+            transaction = KeyTransaction(self, frozenset(keys))
+            yield transaction
+            for key, value in transaction.changes.items():
+                if value is _DELETED:
+                    self._data.pop(key, None)
+                else:
+                    self._data[key] = value
+            self._touch(*transaction.changes)
+
     async def __aenter__(self):
         """Asynchronous context manager entry method
 
         Acquires the asyncio lock when entering"""
-        await self._async_lock.acquire()
+        await self._acquire_global()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -44,7 +168,7 @@ class AsyncLockableContext(AbstractContext):
         releases the asyncio lock when exiting"""
 
         if self.is_locked:
-            self._async_lock.release()
+            self._release_global()
         return False
 
     async def __aiter__(self):
@@ -0,0 +1,259 @@
+"""
+    Contains PersistentContext, a context persisted to SQLite with write-behind
+"""
+import logging
+import pickle
+import sqlite3
+import threading
+import weakref
+from typing import Any, Dict, Optional, Set
+
+from dynapipeline.core.context import AbstractContext
+from dynapipeline.exceptions.context import ContextKeyError, ContextLockedError
+
+logger = logging.getLogger(__name__)
+
+_DELETED = object()
+
+
+class PersistentContext(AbstractContext):
+    """
+    Context whose values survive restarts in a local SQLite database
+
+    Writes only update memory and mark the key dirty, a background thread
+    writes the dirty keys in one transaction every `flush_interval` seconds or
+    as soon as `flush_size` keys are dirty. Values of an existing database are
+    loaded on first access of their key. Call `flush()` to persist pending
+    writes immediately and `close()` to flush and stop the background thread
+
+    Copies unpickled in worker processes write through to the database
+    instead of starting a background thread of their own. The database
+    connection is closed by `close()` or once the context is garbage collected
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval: float = 1.0,
+        flush_size: int = 1000,
+        table: str = "context",
+    ):
+        super().__init__()
+        if flush_interval <= 0:
+            raise ValueError("flush_interval must be positive")
+        if flush_size < 1:
+            raise ValueError("flush_size must be a positive integer")
+        if not table.isidentifier():
+            raise ValueError("table must be a valid identifier")
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.table = table
+        self._dirty: Dict[str, Any] = {}
+        self._stored_keys: Optional[Set[str]] = None
+        self._lock = threading.RLock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._flusher: Optional[threading.Thread] = None
+        self._write_through = False
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        # copies unpickled for every task are rarely closed explicitly
+        self._finalizer = weakref.finalize(self, self._connection.close)
+        with self._connection:
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value BLOB)"
+            )
+
+    def lock(self):
+        """Locks the context to make it immutable"""
+        self._is_locked = True
+
+    def unlock(self):
+        """Unlocks the context to allow it to be modified"""
+        self._is_locked = False
+
+    @property
+    def pending(self) -> int:
+        """Returns the number of keys waiting to be written"""
+        return len(self._dirty)
+
+    def _stored(self) -> Set[str]:
+        """Returns the keys in the database with pending writes applied, loaded once"""
+        stored = self._stored_keys
+        if stored is not None:
+            return stored
+        with self._lock:
+            if self._stored_keys is None:
+                rows = self._connection.execute(f"SELECT key FROM {self.table}")
+                stored = {key for (key,) in rows}
+                stored.update(
+                    key for key, value in self._dirty.items() if value is not _DELETED
+                )
+                stored.difference_update(
+                    key for key, value in self._dirty.items() if value is _DELETED
+                )
+                self._stored_keys = stored
+            return self._stored_keys
+
+    def _has_key(self, key: str) -> bool:
+        """Returns whether a key is in memory or in the database"""
+        return key in self._data or key in self._stored()
+
+    def _keys(self) -> Set[str]:
+        """Returns every key in memory or in the database, without loading values"""
+        with self._lock:
+            return self._stored() | self._data.keys()
+
+    def _mark_dirty(self, key: str, value: Any):
+        """Queues a write for the background flush, write-through copies flush it now"""
+        with self._lock:
+            self._dirty[key] = value
+            if self._stored_keys is not None:
+                if value is _DELETED:
+                    self._stored_keys.discard(key)
+                else:
+                    self._stored_keys.add(key)
+            if self._write_through:
+                self.flush()
+                return
+            if self._flusher is None and not self._closed:
+                self._flusher = threading.Thread(
+                    target=self._flush_loop, name="context-flusher", daemon=True
+                )
+                self._flusher.start()
+        if len(self._dirty) >= self.flush_size:
+            self._wakeup.set()
+
+    def _flush_loop(self):
+        """Flushes the dirty keys periodically until the context is closed"""
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Flushing context to '%s' failed", self.path)
+
+    def flush(self):
+        """Writes all dirty keys to the database in one transaction"""
+        with self._lock:
+            if not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, {}
+            try:
+                writes = [
+                    (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+                    for key, value in dirty.items()
+                    if value is not _DELETED
+                ]
+                deletes = [(key,) for key, value in dirty.items() if value is _DELETED]
+                with self._connection:
+                    self._connection.executemany(
+                        f"INSERT OR REPLACE INTO {self.table} (key, value) VALUES (?, ?)",
+                        writes,
+                    )
+                    self._connection.executemany(
+                        f"DELETE FROM {self.table} WHERE key = ?", deletes
+                    )
+            except Exception:
+                # keep the writes for the next flush unless they were superseded
+                dirty.update(self._dirty)
+                self._dirty = dirty
+                raise
+
+    def close(self):
+        """Flushes pending writes, stops the background thread and closes the database"""
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        self._wakeup.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self._finalizer()
+
+    def __getitem__(self, key: str) -> Any:
+        """Retrieve the value of a key, loading it from the database on first access"""
+        self._track(key)
+        try:
+            return self._data[key]
+        except KeyError:
+            pass
+        with self._lock:
+            if self._dirty.get(key) is _DELETED:
+                raise KeyError(key)
+            row = self._connection.execute(
+                f"SELECT value FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(key)
+            value = self._data[key] = pickle.loads(row[0])
+            return value
+
+    def __setitem__(self, key: str, value: Any):
+        """Sets item in memory and queues it for the database"""
+        if self.is_locked:
+            raise ContextLockedError()
+        self._data[key] = value
+        self._touch(key)
+        self._mark_dirty(key, value)
+
+    def __delitem__(self, key: str):
+        """Deletes item from memory and queues the delete for the database"""
+        if self.is_locked:
+            raise ContextLockedError()
+        if not self._has_key(key):
+            raise ContextKeyError(key)
+        self._data.pop(key, None)
+        self._touch(key)
+        self._mark_dirty(key, _DELETED)
+
+    def __contains__(self, key: object) -> bool:
+        self._track(key)
+        return self._has_key(key)
+
+    def __iter__(self):
+        """Return an iterator over the keys in memory and in the database"""
+        self._track_all()
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        """Return the number of keys in memory and in the database"""
+        self._track_all()
+        return len(self._keys())
+
+    def keys(self):
+        """Return the keys in memory and in the database"""
+        self._track_all()
+        return self._keys()
+
+    def items(self):
+        """Return the items of the context, loading every value"""
+        self._track_all()
+        return [(key, self[key]) for key in self._keys()]
+
+    def values(self):
+        """Return the values of the context, loading every value"""
+        self._track_all()
+        return [self[key] for key in self._keys()]
+
+    def __getstate__(self):
+        """
+        Flushes and pickles the configuration, the copy reopens the database
+        The flush lets the copy read every earlier write and keeps pending
+        writes of this context from overwriting later writes of the copy
+        """
+        self.flush()
+        return {
+            "path": self.path,
+            "flush_interval": self.flush_interval,
+            "flush_size": self.flush_size,
+            "table": self.table,
+            "locked": self._is_locked,
+        }
+
+    def __setstate__(self, state):
+        locked = state.pop("locked")
+        self.__init__(**state)
+        self._is_locked = locked
+        self._write_through = True
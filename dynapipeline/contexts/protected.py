@@ -3,30 +3,36 @@ from typing import Any, Dict, Optional
 
 from dynapipeline.core.context import AbstractContext
 from dynapipeline.exceptions.context import ContextKeyError, ContextLockedError
+from dynapipeline.utils.freeze import freeze
 
-# for now i just lock the context before pipeline execution but it has some limitations
-# and problems like context itself is locked, mutable objects inside
-# can still be modified, leading to potential inconsistencies and
-# simple boolean lock is not suffient so later i may add Versioning with vector clock or Snapshots for context to
-# let users modify context safely
+# locking replaces the values with deeply frozen copies (see utils.freeze) so nested
+# objects can be shared with threads and processes without defensive copies,
+# unlocking restores the original values
 
 
 class ProtectedContext(AbstractContext):
     """
-    A basic lockable context using a simple boolean  to make context immutable when locked
+    A basic lockable context that is deeply immutable when locked
     """
 
     def __init__(self, initial_data: Optional[Dict[str, Any]] = None):
         super().__init__()
         if initial_data:
             self._data.update(initial_data)
+        self._originals: Optional[Dict[str, Any]] = None
 
     def lock(self):
-        """Locks the context to make it immutable"""
+        """Locks the context and replaces its values with deeply frozen ones"""
+        if not self._is_locked:
+            self._originals = self._data
+            self._data = {key: freeze(value) for key, value in self._originals.items()}
         self._is_locked = True
 
     def unlock(self):
-        """Unlocks the context to allow it to be modified"""
+        """Unlocks the context and restores the mutable values"""
+        if self._is_locked and self._originals is not None:
+            self._data = self._originals
+            self._originals = None
         self._is_locked = False
 
     @property
@@ -40,6 +46,7 @@ class ProtectedContext(AbstractContext):
         if self.is_locked:
             raise ContextLockedError()
         self._data[key] = value
+        self._touch(key)
 
     def __delitem__(self, key: str):
         """
@@ -50,3 +57,19 @@ class ProtectedContext(AbstractContext):
             del self._data[key]
         except KeyError:
             raise ContextKeyError(key)
+        self._touch(key)
+
+    def __getstate__(self):
+        """Pickles the original values, frozen memoryviews cannot be pickled"""
+        state = super().__getstate__()
+        if state["_originals"] is not None:
+            state["_data"] = state.pop("_originals")
+        state["_originals"] = None
+        return state
+
+    def __setstate__(self, state):
+        locked = state["_is_locked"]
+        super().__setstate__(state)
+        self._is_locked = False
+        if locked:
+            self.lock()
@@ -0,0 +1,234 @@
+"""
+    Contains SharedMemoryContext which publishes frozen values into shared memory
+"""
+import pickle
+import struct
+import sys
+import weakref
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional, Tuple
+
+from dynapipeline.core.context import AbstractContext
+from dynapipeline.exceptions.context import ContextKeyError, ContextLockedError
+
+# contexts already attached in this process, keyed by shared memory name
+_ATTACHED: Dict[str, "SharedMemoryContext"] = {}
+
+_HEADER = struct.Struct("<Q")
+_BUFFER = "buffer"
+_PICKLE = "pickle"
+
+IndexEntry = Tuple[str, int, int, Optional[str], Optional[Tuple[int, ...]]]
+
+_BYTE_ORDERS = {"<": "little", ">": "big", "!": "big", "=": sys.byteorder}
+
+
+def _attach(name: str) -> "SharedMemoryContext":
+    """Returns the context published under name, attaching to it once per process"""
+    context = _ATTACHED.get(name)
+    if context is None:
+        context = SharedMemoryContext._attach(name)
+        _ATTACHED[name] = context
+    return context
+
+
+def _native_format(value_format: str) -> Optional[str]:
+    """
+    Returns the native format memoryview.cast accepts for value_format, or None
+    A byte-order prefix is dropped when the order and item size are native
+    """
+    if value_format[:1] in _BYTE_ORDERS:
+        code = value_format[1:]
+        if _BYTE_ORDERS[value_format[0]] != sys.byteorder:
+            return None
+    else:
+        code = value_format[1:] if value_format.startswith("@") else value_format
+    if len(code) != 1:
+        return None
+    try:
+        if struct.calcsize(value_format) != struct.calcsize(code):
+            return None
+    except struct.error:
+        return None
+    return code
+
+
+def _release(segment: shared_memory.SharedMemory) -> None:
+    """Closes and removes a shared memory segment"""
+    try:
+        segment.close()
+        segment.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class SharedMemoryContext(AbstractContext):
+    """
+    Read-only context for multiprocess workers
+
+    Locking the context publishes its values once into a shared memory segment.
+    While locked the context pickles as the segment name only, so workers attach
+    to the segment instead of receiving a copy of the data. Buffer values
+    (bytes, bytearray, array.array, memoryview...) are exposed to workers as
+    zero-copy read-only memoryviews, other values are unpickled from the
+    segment once per worker process on first access
+    """
+
+    def __init__(self, initial_data: Optional[Dict[str, Any]] = None):
+        super().__init__()
+        if initial_data:
+            self._data.update(initial_data)
+        self._segment: Optional[shared_memory.SharedMemory] = None
+        self._index: Dict[str, IndexEntry] = {}
+        self._data_start = 0
+        self._owner = True
+        self._finalizer: Optional[weakref.finalize] = None
+
+    @property
+    def segment_name(self) -> Optional[str]:
+        """Returns the name of the published segment"""
+        return None if self._segment is None else self._segment.name
+
+    def lock(self):
+        """Publishes the values into shared memory and makes the context immutable"""
+        if self._owner and self._segment is None:
+            self._publish()
+        self._is_locked = True
+
+    def unlock(self):
+        """Unpublishes the values and allows modifications again"""
+        if not self._owner:
+            raise ContextLockedError("An attached shared memory context is read-only")
+        self.close()
+        self._is_locked = False
+
+    def _publish(self):
+        """Writes every value into a new shared memory segment"""
+        blobs = []
+        index: Dict[str, IndexEntry] = {}
+        offset = 0
+        for key, value in self._data.items():
+            try:
+                view = memoryview(value)
+                value_format = _native_format(view.format)
+            except TypeError:
+                value_format = None
+            if value_format is None:
+                # buffers in a format workers cannot cast to are pickled
+                blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                index[key] = (_PICKLE, offset, len(blob), None, None)
+            else:
+                blob = view.cast("B") if view.c_contiguous else view.tobytes()
+                index[key] = (_BUFFER, offset, len(blob), value_format, view.shape)
+            blobs.append(blob)
+            offset += len(blob)
+        header = pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL)
+        data_start = _HEADER.size + len(header)
+        segment = shared_memory.SharedMemory(
+            create=True, size=max(data_start + offset, 1)
+        )
+        _HEADER.pack_into(segment.buf, 0, len(header))
+        segment.buf[_HEADER.size : data_start] = header
+        position = data_start
+        for blob in blobs:
+            segment.buf[position : position + len(blob)] = blob
+            position += len(blob)
+        self._segment = segment
+        self._index = index
+        self._finalizer = weakref.finalize(self, _release, segment)
+
+    @classmethod
+    def _attach(cls, name: str) -> "SharedMemoryContext":
+        """Creates a read-only context backed by an existing segment"""
+        context = cls()
+        context._owner = False
+        context._segment = shared_memory.SharedMemory(name=name)
+        (header_size,) = _HEADER.unpack_from(context._segment.buf, 0)
+        header = context._segment.buf[_HEADER.size : _HEADER.size + header_size]
+        context._index = pickle.loads(header)
+        context._data_start = _HEADER.size + header_size
+        context._is_locked = True
+        return context
+
+    def _load(self, key: str) -> Any:
+        """Reads a value from the attached segment"""
+        kind, offset, size, value_format, shape = self._index[key]
+        start = self._data_start + offset
+        view = self._segment.buf[start : start + size]  # type: ignore[union-attr]
+        if kind == _PICKLE:
+            return pickle.loads(view)
+        if value_format != "B" or shape != (size,):
+            view = view.cast(value_format, shape)
+        return view.toreadonly()
+
+    def close(self):
+        """Releases the shared memory segment, removing it if this context owns it"""
+        if self._segment is None:
+            return
+        if self._owner and self._finalizer is not None:
+            self._finalizer()
+            self._finalizer = None
+        else:
+            self._data.clear()
+            self._segment.close()
+        self._segment = None
+        self._index = {}
+
+    def __getitem__(self, key: str) -> Any:
+        """Retrieve the value of a key, attached contexts load it on first access"""
+        self._track(key)
+        try:
+            return self._data[key]
+        except KeyError:
+            if self._owner or key not in self._index:
+                raise
+        value = self._data[key] = self._load(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        """Sets item in the context"""
+        if self.is_locked:
+            raise ContextLockedError()
+        self._data[key] = value
+        self._touch(key)
+
+    def __delitem__(self, key: str):
+        """Deletes item from the context"""
+        if self.is_locked:
+            raise ContextLockedError()
+        try:
+            del self._data[key]
+        except KeyError:
+            raise ContextKeyError(key)
+        self._touch(key)
+
+    def __iter__(self):
+        """Return an iterator over the keys stored in the context"""
+        self._track_all()
+        return iter(self._data if self._owner else self._index)
+
+    def __len__(self) -> int:
+        """Return the number of keys stored in the context"""
+        self._track_all()
+        return len(self._data if self._owner else self._index)
+
+    def keys(self):
+        """Return the keys of the context"""
+        self._track_all()
+        return self._data.keys() if self._owner else self._index.keys()
+
+    def items(self):
+        """Return the items of the context"""
+        self._track_all()
+        return [(key, self[key]) for key in self.keys()]
+
+    def values(self):
+        """Return the values of the context"""
+        self._track_all()
+        return [self[key] for key in self.keys()]
+
+    def __reduce__(self):
+        """Pickles a published context as the name of its segment"""
+        if self._segment is not None:
+            return _attach, (self._segment.name,)
+        return self.__class__, (dict(self._data),)
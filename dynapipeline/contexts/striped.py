@@ -0,0 +1,128 @@
+"""
+    Contains StripedLockContext, a context that can be written from several threads
+"""
+import threading
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from dynapipeline.core.context import AbstractContext
+from dynapipeline.exceptions.context import ContextKeyError, ContextLockedError
+
+
+class StripedLockContext(AbstractContext):
+    """
+    Thread-safe context guarding keys with a fixed number of striped locks
+
+    Writers only lock the stripe of their key. Every stripe has a sequence
+    number that is odd while its lock is held, readers of several keys read
+    optimistically and fall back to the stripe locks only if a writer interfered
+    """
+
+    def __init__(
+        self, initial_data: Optional[Dict[str, Any]] = None, stripes: int = 16
+    ):
+        super().__init__()
+        if stripes < 1:
+            raise ValueError("stripes must be a positive integer")
+        if initial_data:
+            self._data.update(initial_data)
+        self._stripes = [threading.RLock() for _ in range(stripes)]
+        self._sequences = [0] * stripes
+        self._depths = [0] * stripes
+
+    def lock(self):
+        """Locks the context to make it immutable"""
+        self._is_locked = True
+
+    def unlock(self):
+        """Unlocks the context to allow it to be modified"""
+        self._is_locked = False
+
+    def _stripe(self, key: str) -> int:
+        """Returns the index of the stripe guarding a key"""
+        return hash(key) % len(self._stripes)
+
+    def _acquire(self, index: int):
+        """Acquires a stripe, the outermost acquisition makes its sequence odd"""
+        self._stripes[index].acquire()
+        self._depths[index] += 1
+        if self._depths[index] == 1:
+            self._sequences[index] += 1
+
+    def _release(self, index: int):
+        """Releases a stripe, the outermost release makes its sequence even"""
+        self._depths[index] -= 1
+        if self._depths[index] == 0:
+            self._sequences[index] += 1
+        self._stripes[index].release()
+
+    @contextmanager
+    def locked(self, *keys: str) -> Iterator["StripedLockContext"]:
+        """
+        Holds the stripe locks of the keys for the duration of the block
+        Stripes are acquired in index order so overlapping key sets cannot deadlock
+        """
+        with ExitStack() as stack:
+            for index in sorted({self._stripe(key) for key in keys}):
+                self._acquire(index)
+                stack.callback(self._release, index)
+            yield self
+
+    def __setitem__(self, key: str, value: Any):
+        """Sets item in the context under the stripe lock of the key"""
+        if self.is_locked:
+            raise ContextLockedError()
+        with self.locked(key):
+            self._data[key] = value
+            self._touch(key)
+
+    def __delitem__(self, key: str):
+        """Deletes item from the context under the stripe lock of the key"""
+        if self.is_locked:
+            raise ContextLockedError()
+        with self.locked(key):
+            try:
+                del self._data[key]
+            except KeyError:
+                raise ContextKeyError(key)
+            self._touch(key)
+
+    def update_value(
+        self, key: str, fn: Callable[[Any], Any], default: Any = None
+    ) -> Any:
+        """Atomically replaces the value of a key with fn(value) and returns it"""
+        with self.locked(key):
+            self._track(key)
+            value = fn(self._data.get(key, default))
+            self[key] = value
+            return value
+
+    def get_many(self, *keys: str, retries: int = 3) -> Tuple[Any, ...]:
+        """
+        Returns the values of several keys as one consistent read
+        Reads without locking first and retries under the stripe locks if a
+        writer touched one of the stripes meanwhile
+        """
+        for key in keys:
+            self._track(key)
+        indexes: List[int] = [self._stripe(key) for key in keys]
+        for _ in range(retries):
+            before = [self._sequences[index] for index in indexes]
+            if any(sequence % 2 for sequence in before):
+                continue
+            values = tuple(self._data[key] for key in keys)
+            if before == [self._sequences[index] for index in indexes]:
+                return values
+        with self.locked(*keys):
+            return tuple(self._data[key] for key in keys)
+
+    def __getstate__(self):
+        return {
+            "data": dict(self._data),
+            "stripes": len(self._stripes),
+            "locked": self._is_locked,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(state["data"], state["stripes"])
+        self._is_locked = state["locked"]
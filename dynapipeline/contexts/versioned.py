@@ -0,0 +1,219 @@
+"""
+    Contains VersionedContext, a multi-version context with lock-free snapshots
+"""
+import threading
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Iterator, Mapping, Optional
+
+from dynapipeline.core.context import AbstractContext
+from dynapipeline.exceptions.context import (
+    ContextConflictError,
+    ContextKeyError,
+    ContextLockedError,
+)
+
+_DELETED = object()
+
+
+class ContextVersion:
+    """
+    Immutable committed state of a VersionedContext
+    """
+
+    __slots__ = ("number", "data")
+
+    def __init__(self, number: int, data: Mapping[str, Any]):
+        self.number = number
+        self.data = data
+
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.data
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Returns the value of a key in this version"""
+        return self.data.get(key, default)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(number={self.number}, keys={list(self.data)})"
+        )
+
+
+class ContextTransaction:
+    """
+    Buffers writes on top of a snapshot, they become visible on commit
+    """
+
+    def __init__(self, base: ContextVersion):
+        self.base = base
+        self.changes: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.changes:
+            value = self.changes[key]
+            if value is _DELETED:
+                raise KeyError(key)
+            return value
+        return self.base[key]
+
+    def __setitem__(self, key: str, value: Any):
+        self.changes[key] = value
+
+    def __delitem__(self, key: str):
+        if self.get(key, _DELETED) is _DELETED:
+            raise KeyError(key)
+        self.changes[key] = _DELETED
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Returns the value of a key as seen by the transaction"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+class VersionedContext(AbstractContext):
+    """
+    Context keeping its data in immutable versions
+
+    Readers take a snapshot without locking and keep seeing it while writers
+    commit new versions. A commit copies the top-level mapping and shares every
+    unchanged value with the previous version, then swaps the current version
+    if it is still the one the writer started from (compare-and-swap)
+    """
+
+    def __init__(self, initial_data: Optional[Dict[str, Any]] = None):
+        super().__init__()
+        self._version = ContextVersion(0, MappingProxyType(dict(initial_data or {})))
+        self._commit_lock = threading.Lock()
+
+    def lock(self):
+        """Locks the context to make it immutable"""
+        self._is_locked = True
+
+    def unlock(self):
+        """Unlocks the context to allow new commits"""
+        self._is_locked = False
+
+    @property
+    def version(self) -> int:
+        """Returns the number of the current version"""
+        return self._version.number
+
+    def snapshot(self) -> ContextVersion:
+        """Returns the current version, it never changes after it is returned"""
+        return self._version
+
+    def commit(
+        self,
+        changes: Mapping[str, Any],
+        deletes: Iterable[str] = (),
+        expected_version: Optional[int] = None,
+    ) -> ContextVersion:
+        """
+        Commits changes as a new version and returns it
+        Raises ContextConflictError if expected_version is no longer current
+        """
+        if self.is_locked:
+            raise ContextLockedError()
+        with self._commit_lock:
+            current = self._version
+            if expected_version is not None and current.number != expected_version:
+                raise ContextConflictError()
+            data = dict(current.data)
+            data.update(changes)
+            for key in deletes:
+                if key not in data:
+                    raise ContextKeyError(key)
+                del data[key]
+            self._version = ContextVersion(current.number + 1, MappingProxyType(data))
+            self._touch(*changes, *deletes)
+            return self._version
+
+    def apply(
+        self,
+        fn: Callable[[ContextVersion], Mapping[str, Any]],
+        retries: int = 10,
+    ) -> ContextVersion:
+        """
+        Optimistically applies fn to the current snapshot and commits the
+        changes it returns, retrying with a fresh snapshot on conflicts
+        """
+        for _ in range(retries + 1):
+            base = self.snapshot()
+            try:
+                return self.commit(fn(base), expected_version=base.number)
+            except ContextConflictError:
+                continue
+        raise ContextConflictError(f"Commit still conflicting after {retries} retries")
+
+    @contextmanager
+    def transaction(self) -> Iterator[ContextTransaction]:
+        """
+        Yields a transaction reading from a snapshot, its writes are committed
+        at the end of the block or ContextConflictError is raised
+        """
+        transaction = ContextTransaction(self.snapshot())
+        yield transaction
+        if transaction.changes:
+            changes = {
+                key: value
+                for key, value in transaction.changes.items()
+                if value is not _DELETED
+            }
+            deletes = [
+                key for key, value in transaction.changes.items() if value is _DELETED
+            ]
+            self.commit(changes, deletes, expected_version=transaction.base.number)
+
+    def __getitem__(self, key: str) -> Any:
+        """Retrieve the value of a key from the current version"""
+        self._track(key)
+        return self._version.data[key]
+
+    def __setitem__(self, key: str, value: Any):
+        """Commits a new version with the key set"""
+        self.commit({key: value})
+
+    def __delitem__(self, key: str):
+        """Commits a new version without the key"""
+        self.commit({}, deletes=(key,))
+
+    def __iter__(self):
+        """Return an iterator over the keys of the current version"""
+        self._track_all()
+        return iter(self._version.data)
+
+    def __len__(self) -> int:
+        """Return the number of keys in the current version"""
+        self._track_all()
+        return len(self._version.data)
+
+    def keys(self):
+        """Return the keys of the current version"""
+        self._track_all()
+        return self._version.data.keys()
+
+    def items(self):
+        """Return the items of the current version"""
+        self._track_all()
+        return self._version.data.items()
+
+    def values(self):
+        """Return the values of the current version"""
+        self._track_all()
+        return self._version.data.values()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(version={self.version}, data={dict(self.items())})"
+
+    def __getstate__(self):
+        return {"data": dict(self._version.data), "locked": self._is_locked}
+
+    def __setstate__(self, state):
+        self.__init__(state["data"])
+        self._is_locked = state["locked"]
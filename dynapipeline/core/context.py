@@ -2,10 +2,35 @@
 Contains AbstractContext class for managing key-value pairs within a pipeline context
 """
 
+import threading
 from abc import ABC, abstractmethod
 from collections.abc import MutableMapping
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass, field
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, Optional
+
+# key recording a read of the whole context, its version counts every write
+ALL_KEYS = "*"
+
+# keys read while tracking is active, with the key version at the first read
+_reads: ContextVar[Optional[Dict[str, int]]] = ContextVar(
+    "dynapipeline_context_reads", default=None
+)
+
+
+@contextmanager
+def track_reads() -> Iterator[Dict[str, int]]:
+    """
+    Records the keys read from contexts inside the block
+    Yields a dict mapping every key read to its version at the first read
+    """
+    reads: Dict[str, int] = {}
+    token = _reads.set(reads)
+    try:
+        yield reads
+    finally:
+        _reads.reset(token)
 
 
 @dataclass
@@ -16,6 +41,10 @@ class AbstractContext(ABC, MutableMapping[str, Any]):
 
     _data: Dict[str, Any] = field(default_factory=dict)
     _is_locked: bool = field(default=False)
+    _key_versions: Dict[str, int] = field(default_factory=dict)
+    _writes: int = field(default=0)
+    # guards _writes, keys written under different locks still share the count
+    _writes_lock: Any = field(default_factory=threading.Lock, repr=False, compare=False)
 
     @abstractmethod
     def lock(self):
@@ -32,8 +61,48 @@ class AbstractContext(ABC, MutableMapping[str, Any]):
         """Check if the context is locked"""
         return self._is_locked
 
+    def flush(self):
+        """Persists pending writes, a no-op for contexts that are not persisted"""
+
+    def key_version(self, key: str) -> int:
+        """
+        Returns how many times a key has been written or deleted
+        The version of ALL_KEYS counts the writes to any key
+        """
+        if key == ALL_KEYS:
+            return self._writes
+        return self._key_versions.get(key, 0)
+
+    def _track(self, key: str):
+        """Records a read of key when read tracking is active"""
+        reads = _reads.get()
+        if reads is not None and key not in reads:
+            reads[key] = self.key_version(key)
+
+    def _track_all(self):
+        """Records a read of the whole context, by iteration or a bulk accessor"""
+        self._track(ALL_KEYS)
+
+    def _touch(self, *keys: str):
+        """Marks keys as changed by bumping their versions"""
+        for key in keys:
+            self._key_versions[key] = self._key_versions.get(key, 0) + 1
+        with self._writes_lock:
+            self._writes += len(keys)
+
+    def __getstate__(self):
+        """Pickles the fields without the lock, which cannot be pickled"""
+        state = self.__dict__.copy()
+        del state["_writes_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._writes_lock = threading.Lock()
+
     def __getitem__(self, key: str) -> Any:
         """Retrieve the value associated with the given key"""
+        self._track(key)
         try:
             return self._data[key]
         except KeyError:
@@ -42,6 +111,7 @@ class AbstractContext(ABC, MutableMapping[str, Any]):
     def __setitem__(self, key: str, value: Any):
         """Assign a value to a specific key in the context"""
         self._data[key] = value
+        self._touch(key)
 
     def __delitem__(self, key: str):
         """Remove the value associated with the given key"""
@@ -49,23 +119,29 @@ class AbstractContext(ABC, MutableMapping[str, Any]):
             del self._data[key]
         except KeyError:
             raise
+        self._touch(key)
 
     def __iter__(self):
         """Return an iterator over the keys stored in the context"""
+        self._track_all()
         return iter(self._data)
 
     def __len__(self) -> int:
         """Return the number of key-value pairs stored in the context"""
+        self._track_all()
         return len(self._data)
 
     def keys(self):
         """Return the keys of the internal _data dictionary"""
+        self._track_all()
         return self._data.keys()
 
     def items(self):
         """Return the items of the internal _data dictionary"""
+        self._track_all()
         return self._data.items()
 
     def values(self):
         """Return the values of the internal _data dictionary"""
+        self._track_all()
         return self._data.values()
@@ -20,6 +20,15 @@ class AbstractHandlerRegistry(ABC):
         """
         raise NotImplementedError("Subclasses must implement 'attach' method")
 
+    def detach(self, handler: List[AbstractHandler]) -> None:
+        """
+        detaches a handler from the registry
+        Registries that cannot detach handlers keep this default, which raises
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support detaching handlers"
+        )
+
     @abstractmethod
     async def notify(self, method_name: str, *args, **kwargs) -> None:
         """
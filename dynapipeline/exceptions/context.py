@@ -20,3 +20,12 @@ class ContextKeyError(DynaPipelineException):
         if message is None:
             message = f"Key '{key}' not found in the context"
         super().__init__(message)
+
+
+class ContextConflictError(DynaPipelineException):
+    """Raised when a commit is based on a version that is no longer current"""
+
+    def __init__(
+        self, message: str = "The context was modified by a concurrent commit"
+    ):
+        super().__init__(message)
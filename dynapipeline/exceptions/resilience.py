@@ -0,0 +1,25 @@
+"""
+    Contains exceptions related to resilience policies
+"""
+from typing import Optional
+
+from dynapipeline.exceptions.base import DynaPipelineException
+
+
+class CircuitOpenError(DynaPipelineException):
+    """Raised when a stage is not run because its circuit breaker is open"""
+
+    def __init__(self, name: str, message: Optional[str] = None):
+        if message is None:
+            message = f"Circuit of '{name}' is open"
+        super().__init__(message, name)
+
+
+class AdmissionRejectedError(DynaPipelineException):
+    """Raised when an admission controller rejects work because of overload"""
+
+    def __init__(self, reason: str, message: Optional[str] = None):
+        self.reason = reason
+        if message is None:
+            message = f"Work was rejected by admission control ({reason})"
+        super().__init__(message)
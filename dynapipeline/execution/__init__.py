@@ -1,6 +1,7 @@
 """
 This module provides execution strategies for controlling the execution flow of pipeline components in dynapipeline"""
 
+from dynapipeline.execution.pools import Bulkhead, ResourcePool
 from dynapipeline.execution.strategies import (
     ConcurrentExecutionStrategy,
     MultiprocessExecutionStrategy,
@@ -15,4 +16,6 @@ __all__ = [
     "SemaphoreExecutionStrategy",
     "MultithreadExecutionStrategy",
     "MultiprocessExecutionStrategy",
+    "Bulkhead",
+    "ResourcePool",
 ]
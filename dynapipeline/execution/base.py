@@ -35,3 +35,8 @@ class ExecutionStrategy(ABC):
         Executes the list of pipeline components according to strategy
         """
         raise NotImplementedError("Execution strategy is not implemented")
+
+    @property
+    def queue_depth(self) -> int:
+        """Returns the number of components waiting for the strategy to run them"""
+        return 0
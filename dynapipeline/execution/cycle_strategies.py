@@ -1,9 +1,16 @@
 """Contains Strategies for specifying how often a component should run"""
 import asyncio
-from typing import Any, Callable, List, Optional
+import random
+import threading
+from typing import Any, Callable, Dict, List, Optional
 
 from dynapipeline.execution.base import CycleStrategy
+from dynapipeline.execution.triggers import Trigger
+from dynapipeline.metrics.histogram import LatencyHistogram
 from dynapipeline.pipelines.component import PipelineComponent
+from dynapipeline.utils.cycles import CycleGates, CycleState, enter_cycle
+from dynapipeline.utils.idle import is_idle
+from dynapipeline.utils.interval_modes import IntervalMode, MissedTickPolicy
 
 
 class OnceCycleStrategy(CycleStrategy):
@@ -20,11 +27,58 @@ class OnceCycleStrategy(CycleStrategy):
         return result
 
 
+async def _sleep(delay: float, event: Optional[asyncio.Event] = None) -> None:
+    """Sleeps for delay seconds, waking up early when the event is set"""
+    if event is None:
+        await asyncio.sleep(delay)
+        return
+    try:
+        await asyncio.wait_for(event.wait(), delay)
+    except asyncio.TimeoutError:
+        pass
+
+
 class InfinitLoopStrategy(CycleStrategy):
-    """Executes the group of components in a loop until event is set or pipeline stops"""
+    """
+    Executes the group of components in a loop until event is set or pipeline stops
 
-    def __init__(self, event: Optional[asyncio.Event] = None) -> None:
+    With backoff enabled, a cycle in which every stage returned IDLE is followed
+    by a sleep that starts at `min_delay` and doubles with every further idle
+    cycle up to `max_delay`, with jitter so that idle groups do not wake up in
+    lockstep. The first cycle that does work resets the delay
+    """
+
+    def __init__(
+        self,
+        event: Optional[asyncio.Event] = None,
+        backoff: bool = False,
+        min_delay: float = 0.001,
+        max_delay: float = 1.0,
+        multiplier: float = 2.0,
+    ) -> None:
+        if not 0 < min_delay <= max_delay:
+            raise ValueError("min_delay must be positive and not above max_delay")
+        if multiplier < 1:
+            raise ValueError("multiplier must be at least 1")
         self.event = event
+        self.backoff = backoff
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.delay = 0.0
+        self.idle_cycles = 0
+
+    def _next_delay(self, result: Any) -> float:
+        """Returns how long to sleep after a cycle with the given result"""
+        if not is_idle(result):
+            self.delay = 0.0
+            return 0.0
+        self.idle_cycles += 1
+        if self.delay == 0:
+            self.delay = self.min_delay
+        else:
+            self.delay = min(self.delay * self.multiplier, self.max_delay)
+        return max(self.min_delay, self.delay * random.uniform(0.5, 1.0))
 
     async def run(
         self,
@@ -33,21 +87,32 @@ class InfinitLoopStrategy(CycleStrategy):
         *args: Any,
         **kwargs: Any
     ) -> None:
-        if self.event is None:
-            while True:
-                await execute_fn(components, *args, **kwargs)
-
+        self.delay = 0.0
         # If an event is provided loop until the event is set
-        else:
-            while not self.event.is_set():
-                await execute_fn(components, *args, **kwargs)
+        while self.event is None or not self.event.is_set():
+            result = await execute_fn(components, *args, **kwargs)
+            if self.backoff:
+                delay = self._next_delay(result)
+                if delay:
+                    await _sleep(delay, self.event)
 
 
 class LoopCycleStrategy(CycleStrategy):
-    """Executes the group of components in a specified cycles"""
+    """
+    Executes the group of components in a specified cycles
 
-    def __init__(self, cycles: int) -> None:
+    With overlap > 1 up to `overlap` cycles are in flight at once like the
+    stages of a hardware pipeline: a component starts cycle N + 1 as soon as it
+    finished cycle N, but never runs two cycles at the same time. Stages can
+    keep values of a single cycle in `current_cycle().data`. Results are
+    returned in cycle order
+    """
+
+    def __init__(self, cycles: int, overlap: int = 1) -> None:
+        if overlap < 1:
+            raise ValueError("overlap must be a positive integer")
         self.cycles = cycles
+        self.overlap = overlap
 
     async def run(
         self,
@@ -56,8 +121,263 @@ class LoopCycleStrategy(CycleStrategy):
         *args: Any,
         **kwargs: Any
     ) -> Any:
+        if self.overlap > 1:
+            return await self._run_overlapped(execute_fn, components, *args, **kwargs)
         results = []
         for _ in range(self.cycles):
             result = await execute_fn(components, *args, **kwargs)
             results.append(result)
         return results
+
+    async def _run_overlapped(
+        self,
+        execute_fn: Callable[[List[PipelineComponent], Any], Any],
+        components: List[PipelineComponent],
+        *args: Any,
+        **kwargs: Any
+    ) -> List[Any]:
+        """Runs the cycles with up to `overlap` of them in flight"""
+        gates = CycleGates(components)
+        slots = asyncio.Semaphore(self.overlap)
+        results: List[Any] = [None] * self.cycles
+        failed = asyncio.Event()
+
+        async def run_cycle(number: int):
+            """Runs one cycle as the current cycle of its task"""
+            try:
+                enter_cycle(CycleState(number), gates)
+                results[number] = await execute_fn(components, *args, **kwargs)
+            except BaseException:
+                failed.set()
+                raise
+            finally:
+                slots.release()
+
+        tasks: List[asyncio.Task] = []
+        try:
+            for number in range(self.cycles):
+                await slots.acquire()
+                if failed.is_set():
+                    slots.release()
+                    break
+                tasks.append(asyncio.create_task(run_cycle(number)))
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return results
+
+
+class IntervalCycleStrategy(CycleStrategy):
+    """
+    Executes the group of components on a schedule derived from loop.time()
+
+    In FIXED_RATE mode cycles start at multiples of `interval` after the first
+    one, so the period does not drift by the execution time. A cycle running
+    past the next tick is an overrun and `missed_ticks` decides what happens
+    with the ticks it covered: SKIP drops them, CATCH_UP runs them back to back
+    and COALESCE runs a single cycle for all of them right away. A cycle that
+    starts late while catching up and ends after its tick counts as another
+    overrun. In FIXED_DELAY mode every cycle starts `interval` seconds after
+    the previous one ended. Runs `cycles` times and returns the results, or
+    until event is set
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        mode: IntervalMode = IntervalMode.FIXED_RATE,
+        missed_ticks: MissedTickPolicy = MissedTickPolicy.SKIP,
+        cycles: Optional[int] = None,
+        event: Optional[asyncio.Event] = None,
+    ) -> None:
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.interval = interval
+        self.mode = mode
+        self.missed_ticks = missed_ticks
+        self.cycles = cycles
+        self.event = event
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped_ticks = 0
+        self.lateness = LatencyHistogram()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the number of cycles, overruns, skipped ticks and start lateness in seconds"""
+        return {
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "skipped_ticks": self.skipped_ticks,
+            "lateness_mean": None
+            if self.lateness.mean is None
+            else self.lateness.mean / 1e9,
+            "lateness_p99": None
+            if self.lateness.count == 0
+            else self.lateness.percentile(99) / 1e9,
+            "lateness_max": None
+            if self.lateness.max is None
+            else self.lateness.max / 1e9,
+        }
+
+    def _done(self, runs: int) -> bool:
+        """Returns True once the cycle limit is reached or the event is set"""
+        if self.cycles is not None and runs >= self.cycles:
+            return True
+        return self.event is not None and self.event.is_set()
+
+    async def run(
+        self,
+        execute_fn: Callable[[List[PipelineComponent], Any], Any],
+        components: List[PipelineComponent],
+        *args: Any,
+        **kwargs: Any
+    ) -> Optional[List[Any]]:
+        loop = asyncio.get_running_loop()
+        results = []
+        runs = 0
+        due = tick = loop.time()
+        while not self._done(runs):
+            delay = due - loop.time()
+            if delay > 0:
+                await _sleep(delay, self.event)
+                if self._done(runs):
+                    break
+            start = loop.time()
+            self.lateness.record(int(max(start - due, 0) * 1e9))
+            result = await execute_fn(components, *args, **kwargs)
+            if self.cycles is not None:
+                results.append(result)
+            runs += 1
+            self.ticks += 1
+            end = loop.time()
+
+            if self.mode == IntervalMode.FIXED_DELAY:
+                due = end + self.interval
+                continue
+
+            tick += self.interval
+            due = tick
+            if end <= tick:
+                continue
+            self.overruns += 1
+            # ticks that passed while the cycle was running, including tick
+            missed = int((end - tick) // self.interval) + 1
+            if self.missed_ticks == MissedTickPolicy.SKIP:
+                self.skipped_ticks += missed
+                tick += missed * self.interval
+                due = tick
+            elif self.missed_ticks == MissedTickPolicy.COALESCE:
+                self.skipped_ticks += missed - 1
+                tick += (missed - 1) * self.interval
+                due = end
+        return results if self.cycles is not None else None
+
+
+class TriggeredCycleStrategy(CycleStrategy):
+    """
+    Sleeps until one of the triggers fires and then executes the group of components
+
+    Triggers firing while the group is running cause one more run afterwards.
+    With `debounce` set, a run starts only once no trigger fired for `debounce`
+    seconds, but at most `max_wait` seconds after the first one, so a burst of
+    activity is coalesced into a single run. Runs `cycles` times and returns the
+    results, or until event is set
+    """
+
+    def __init__(
+        self,
+        triggers: List[Trigger],
+        debounce: float = 0.0,
+        max_wait: Optional[float] = None,
+        cycles: Optional[int] = None,
+        event: Optional[asyncio.Event] = None,
+    ) -> None:
+        if not triggers:
+            raise ValueError("at least one trigger is required")
+        self.triggers = triggers
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.cycles = cycles
+        self.event = event
+        self.fired = 0
+        self.runs = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Returns how often the triggers fired and how many runs they caused"""
+        return {
+            "fired": self.fired,
+            "runs": self.runs,
+            "coalesced": max(self.fired - self.runs, 0),
+        }
+
+    async def _settle(self, wake: asyncio.Event) -> None:
+        """Waits until the triggers are quiet for `debounce` seconds"""
+        loop = asyncio.get_running_loop()
+        deadline = None if self.max_wait is None else loop.time() + self.max_wait
+        while not (self.event is not None and self.event.is_set()):
+            wake.clear()
+            delay = self.debounce
+            if deadline is not None:
+                delay = min(delay, deadline - loop.time())
+                if delay <= 0:
+                    return
+            await asyncio.sleep(delay)
+            if not wake.is_set():
+                return
+
+    async def run(
+        self,
+        execute_fn: Callable[[List[PipelineComponent], Any], Any],
+        components: List[PipelineComponent],
+        *args: Any,
+        **kwargs: Any
+    ) -> Optional[List[Any]]:
+        loop = asyncio.get_running_loop()
+        thread = threading.get_ident()
+        wake = asyncio.Event()
+
+        def on_fire():
+            """Counts the activity and wakes the strategy up"""
+            self.fired += 1
+            wake.set()
+
+        def fire():
+            """Thread-safe entry point for the triggers"""
+            if threading.get_ident() == thread:
+                on_fire()
+            else:
+                loop.call_soon_threadsafe(on_fire)
+
+        async def watch_event():
+            """Wakes the strategy up when the stop event is set"""
+            await self.event.wait()
+            wake.set()
+
+        watcher = None if self.event is None else loop.create_task(watch_event())
+        results = []
+        for trigger in self.triggers:
+            trigger.start(fire)
+        try:
+            while self.cycles is None or len(results) < self.cycles:
+                await wake.wait()
+                if self.event is not None and self.event.is_set():
+                    break
+                if self.debounce > 0:
+                    await self._settle(wake)
+                    if self.event is not None and self.event.is_set():
+                        break
+                wake.clear()
+                self.runs += 1
+                result = await execute_fn(components, *args, **kwargs)
+                if self.cycles is not None:
+                    results.append(result)
+                for trigger in self.triggers:
+                    trigger.rearm()
+        finally:
+            for trigger in self.triggers:
+                trigger.stop()
+            if watcher is not None:
+                watcher.cancel()
+        return results if self.cycles is not None else None
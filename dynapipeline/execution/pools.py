@@ -0,0 +1,311 @@
+"""
+    Contains bulkheads, named resource pools isolating stage groups from each other
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterator, Optional
+
+from dynapipeline.exceptions.registry import ItemAlreadyRegisteredError
+from dynapipeline.tracing.tracer import trace_span
+from dynapipeline.utils.pool_kinds import PoolKind
+from dynapipeline.utils.slots import ExecutionSlot, holding_slot
+
+# marks the worker threads of thread pools with their pool
+_worker = threading.local()
+
+
+def _mark_worker(pool: "ResourcePool") -> None:
+    """Initializer of the worker threads of a thread pool"""
+    _worker.pool = pool
+
+
+class _Waiter:
+    """A task waiting for a slot of a pool"""
+
+    __slots__ = ("pool", "loop", "future", "granted")
+
+    def __init__(self, pool: "ResourcePool"):
+        self.pool = pool
+        self.loop = asyncio.get_running_loop()
+        self.future = self.loop.create_future()
+        self.granted = False
+
+
+def _wake(future: asyncio.Future) -> None:
+    """Resolves the future of a waiter that was granted a slot"""
+    if not future.done():
+        future.set_result(None)
+
+
+class Bulkhead:
+    """
+    Capacity of one kind of resource shared by named pools
+
+    Every pool is guaranteed `min_size` slots and may burst up to `max_size`
+    slots with capacity the other pools neither use nor have reserved, so a
+    slow pool only degrades its own throughput. Slots can be taken from any
+    thread and event loop, waiting pools are served in arrival order
+    """
+
+    def __init__(self, capacity: int, kind: PoolKind = PoolKind.ASYNC):
+        if capacity < 1:
+            raise ValueError("capacity must be a positive integer")
+        self.capacity = capacity
+        self.kind = PoolKind(kind)
+        self.pools: Dict[str, ResourcePool] = {}
+        self._lock = threading.Lock()
+        self._waiters: Deque[_Waiter] = deque()
+
+    def pool(
+        self, name: str, min_size: int = 0, max_size: Optional[int] = None
+    ) -> "ResourcePool":
+        """Creates a pool with a guaranteed and a maximum number of slots"""
+        if max_size is None:
+            max_size = self.capacity
+        if not (0 <= min_size <= max_size and 1 <= max_size <= self.capacity):
+            raise ValueError(
+                "pool sizes must satisfy 0 <= min_size <= max_size <= capacity"
+            )
+        with self._lock:
+            if name in self.pools:
+                raise ItemAlreadyRegisteredError(name, "bulkhead")
+            if self.reserved + min_size > self.capacity:
+                raise ValueError("guaranteed sizes of the pools exceed the capacity")
+            pool = self.pools[name] = ResourcePool(name, self, min_size, max_size)
+        return pool
+
+    @property
+    def reserved(self) -> int:
+        """Returns the sum of the guaranteed sizes of the pools"""
+        return sum(pool.min_size for pool in self.pools.values())
+
+    @property
+    def in_use(self) -> int:
+        """Returns the number of slots held in all pools"""
+        return sum(pool.in_use for pool in self.pools.values())
+
+    def _can_take(self, pool: "ResourcePool") -> bool:
+        """Returns True if pool may take one more slot, the lock must be held"""
+        if pool.in_use >= pool.max_size:
+            return False
+        if pool.in_use < pool.min_size:
+            return True
+        unused_reserves = sum(
+            max(0, other.min_size - other.in_use) for other in self.pools.values()
+        )
+        return self.in_use + unused_reserves < self.capacity
+
+    async def _acquire(self, pool: "ResourcePool") -> None:
+        """Waits until pool may take a slot and takes it"""
+        with self._lock:
+            queued = any(waiter.pool is pool for waiter in self._waiters)
+            if not queued and self._can_take(pool):
+                pool._in_use += 1
+                return
+            waiter = _Waiter(pool)
+            self._waiters.append(waiter)
+        try:
+            with trace_span(f"wait:pool:{pool.name}", kind="wait"):
+                await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiters.remove(waiter)
+            if granted:
+                self._release(pool)
+            raise
+
+    def _try_acquire(self, pool: "ResourcePool") -> bool:
+        """Takes a slot for pool if it is free and nobody waits for it"""
+        with self._lock:
+            queued = any(waiter.pool is pool for waiter in self._waiters)
+            if queued or not self._can_take(pool):
+                return False
+            pool._in_use += 1
+            return True
+
+    def _release(self, pool: "ResourcePool") -> None:
+        """Gives a slot back and hands the free capacity to waiting pools"""
+        with self._lock:
+            pool._in_use -= 1
+            blocked = set()
+            for waiter in list(self._waiters):
+                if waiter.pool in blocked:
+                    continue
+                if not self._can_take(waiter.pool):
+                    blocked.add(waiter.pool)
+                    continue
+                self._waiters.remove(waiter)
+                waiter.pool._in_use += 1
+                waiter.granted = True
+                waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+
+    def _waiting(self, pool: "ResourcePool") -> int:
+        """Returns the number of tasks waiting for a slot of pool"""
+        with self._lock:
+            return sum(1 for waiter in self._waiters if waiter.pool is pool)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the usage of every pool"""
+        return {name: pool.stats() for name, pool in self.pools.items()}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shuts down the executors of all pools"""
+        for pool in self.pools.values():
+            pool.shutdown(wait)
+
+
+class ResourcePool:
+    """
+    Named share of a bulkhead, stage groups running in the pool hold one of its
+    slots per running stage and use its executor for threads or processes
+    Create pools with `Bulkhead.pool`
+    """
+
+    def __init__(self, name: str, bulkhead: Bulkhead, min_size: int, max_size: int):
+        self.name = name
+        self.bulkhead = bulkhead
+        self.min_size = min_size
+        self.max_size = max_size
+        self._in_use = 0
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def kind(self) -> PoolKind:
+        """Returns the kind of resource of the pool"""
+        return self.bulkhead.kind
+
+    @property
+    def in_use(self) -> int:
+        """Returns the number of slots held in the pool"""
+        return self._in_use
+
+    @property
+    def waiting(self) -> int:
+        """Returns the number of tasks waiting for a slot"""
+        return self.bulkhead._waiting(self)
+
+    async def acquire(self) -> None:
+        """Waits for a free slot and takes it"""
+        await self.bulkhead._acquire(self)
+
+    async def try_acquire(self) -> bool:
+        """Takes a slot if one is free right away, returns whether it was taken"""
+        return self.bulkhead._try_acquire(self)
+
+    def release(self) -> None:
+        """Gives a slot back"""
+        self.bulkhead._release(self)
+
+    @property
+    def executor(self) -> Optional[Executor]:
+        """
+        Returns the executor of a thread or process pool, created on first use
+        with max_size workers, None for pools of async slots
+        """
+        if self.kind is PoolKind.ASYNC:
+            return None
+        with self._executor_lock:
+            if self._executor is None:
+                if self.kind is PoolKind.THREAD:
+                    self._executor = ThreadPoolExecutor(
+                        self.max_size,
+                        thread_name_prefix=f"pool-{self.name}",
+                        initializer=_mark_worker,
+                        initargs=(self,),
+                    )
+                else:
+                    self._executor = ProcessPoolExecutor(self.max_size)
+            return self._executor
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shuts down the executor of the pool, it is recreated when used again"""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the usage of the pool"""
+        return {
+            "kind": self.kind.value,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(name={self.name!r}, kind={self.kind.value!r}, "
+            f"min_size={self.min_size}, max_size={self.max_size})"
+        )
+
+
+_current_pool: ContextVar[Optional[ResourcePool]] = ContextVar(
+    "dynapipeline_resource_pool", default=None
+)
+
+
+def current_pool() -> Optional[ResourcePool]:
+    """Returns the pool the current stage group runs in"""
+    return _current_pool.get()
+
+
+@contextmanager
+def use_pool(pool: Optional[ResourcePool]) -> Iterator[None]:
+    """Makes pool the resource pool of the components run in the block"""
+    token = _current_pool.set(pool)
+    try:
+        yield
+    finally:
+        _current_pool.reset(token)
+
+
+@asynccontextmanager
+async def pool_slot() -> AsyncIterator[None]:
+    """Holds a slot of the current pool, if there is one, for the duration of the block"""
+    pool = _current_pool.get()
+    if pool is None:
+        yield
+        return
+    async with holding_slot(
+        ExecutionSlot(pool.acquire, pool.release, pool.try_acquire)
+    ):
+        yield
+
+
+def pool_executor(kind: PoolKind) -> Optional[Executor]:
+    """
+    Returns the executor of the current pool if it provides the kind of workers
+    Returns None on the pool's own worker threads, waiting there for another
+    worker of the same pool could deadlock
+    """
+    pool = _current_pool.get()
+    if pool is None or pool.kind is not kind:
+        return None
+    if getattr(_worker, "pool", None) is pool:
+        return None
+    return pool.executor
+
+
+async def to_thread(func: Callable[..., Any], *args) -> Any:
+    """
+    Runs func in the executor of the current thread pool, or in the default
+    executor when the current pool does not provide threads
+    """
+    executor = pool_executor(PoolKind.THREAD)
+    if executor is None:
+        return await asyncio.to_thread(func, *args)
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, functools.partial(context.run, func, *args)
+    )
@@ -1,10 +1,44 @@
 """Contains Strategies for execution of components"""
 import asyncio
-from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
-from typing import List
+import contextvars
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, List, Optional
 
+from dynapipeline.contexts.aggregates import apply_deltas, collect_deltas
 from dynapipeline.execution.base import ExecutionStrategy
+from dynapipeline.execution.pools import current_pool, pool_executor, pool_slot
 from dynapipeline.pipelines.component import PipelineComponent
+from dynapipeline.tracing.span import SpanContext
+from dynapipeline.tracing.tracer import (
+    current_span_context,
+    trace_span,
+    use_span_context,
+)
+from dynapipeline.utils.pool_kinds import PoolKind
+from dynapipeline.utils.slots import ExecutionSlot, holding_slot
+
+
+def _run_pooled(component: PipelineComponent, *args, **kwargs) -> Awaitable[Any]:
+    """
+    Runs a component holding a slot of the current resource pool
+    Without a pool the run is returned as is, saving a coroutine per component
+    """
+    if current_pool() is None:
+        return component.run(*args, **kwargs)
+    return _in_pool_slot(component.run, *args, **kwargs)
+
+
+def _submit(run_in_executor, *args, **kwargs) -> Awaitable[Any]:
+    """Holds a slot of the current resource pool while an executor runs the call"""
+    if current_pool() is None:
+        return run_in_executor(*args, **kwargs)
+    return _in_pool_slot(run_in_executor, *args, **kwargs)
+
+
+async def _in_pool_slot(func: Callable[..., Awaitable[Any]], *args, **kwargs):
+    """Awaits func holding a slot of the current resource pool"""
+    async with pool_slot():
+        return await func(*args, **kwargs)
 
 
 class SequentialExecutionStrategy(ExecutionStrategy):
@@ -15,7 +49,7 @@ class SequentialExecutionStrategy(ExecutionStrategy):
     async def execute(self, components: List[PipelineComponent], *args, **kwargs):
         results = []
         for component in components:
-            result = await component.run(*args, **kwargs)
+            result = await _run_pooled(component, *args, **kwargs)
             results.append(result)
         return results
 
@@ -26,8 +60,8 @@ class ConcurrentExecutionStrategy(ExecutionStrategy):
     """
 
     async def execute(self, components: List[PipelineComponent], *args, **kwargs):
-        tasks = [component.run(*args, **kwargs) for component in components]
-        await asyncio.gather(*tasks)
+        tasks = [_run_pooled(component, *args, **kwargs) for component in components]
+        return await asyncio.gather(*tasks)
 
 
 class SemaphoreExecutionStrategy(ExecutionStrategy):
@@ -37,6 +71,7 @@ class SemaphoreExecutionStrategy(ExecutionStrategy):
 
     def __init__(self, max_concurrent: int):
         self.semaphore = asyncio.Semaphore(max_concurrent)
+        self._waiting = 0
 
     async def execute(self, components: List[PipelineComponent], *args, **kwargs):
         """
@@ -53,30 +88,76 @@ class SemaphoreExecutionStrategy(ExecutionStrategy):
     async def _run_with_semaphore(self, component: PipelineComponent, *args, **kwargs):
         """
         Wraps the execution of a component with a semaphore to limit concurrency
-
+        The slot is exposed to the component so it can give it back while waiting
         """
-        async with self.semaphore:
-            return await component.run(*args, **kwargs)
+        slot = ExecutionSlot(self._acquire, self.semaphore.release, self._try_acquire)
+        async with holding_slot(slot):
+            return await _run_pooled(component, *args, **kwargs)
+
+    async def _acquire(self):
+        """Acquires the semaphore, tracing the wait when no slot is free"""
+        self._waiting += 1
+        try:
+            if self.semaphore.locked():
+                with trace_span("wait:semaphore", kind="wait"):
+                    await self.semaphore.acquire()
+            else:
+                await self.semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+    async def _try_acquire(self) -> bool:
+        """Acquires the semaphore if no one has to wait for it"""
+        if self.semaphore.locked():
+            return False
+        # an unlocked semaphore is acquired without suspending
+        await self.semaphore.acquire()
+        return True
+
+    @property
+    def queue_depth(self) -> int:
+        """Returns the number of components waiting for a free slot"""
+        return self._waiting
 
 
 class MultithreadExecutionStrategy(ExecutionStrategy):
-    """Executes pipeline components concurrently in multiple threads"""
+    """
+    Executes pipeline components concurrently in multiple threads
+    Uses the executor of the resource pool when the group runs in a thread pool
+    """
 
     async def execute(self, components: List[PipelineComponent], *args, **kwargs):
         """
         Executes the stages concurrently in multiple threads using ThreadPoolExecutor
 
         """
-        loop = asyncio.get_event_loop()
+        executor = pool_executor(PoolKind.THREAD)
+        if executor is not None:
+            return await self._execute(executor, components, *args, **kwargs)
         with ThreadPoolExecutor() as executor:
-            tasks = []
-            for component in components:
-                tasks.append(
-                    loop.run_in_executor(
-                        executor, self._run_component, component, *args, **kwargs
-                    )
+            return await self._execute(executor, components, *args, **kwargs)
+
+    async def _execute(
+        self, executor: Executor, components: List[PipelineComponent], *args, **kwargs
+    ):
+        """Runs the components in the executor"""
+        loop = asyncio.get_event_loop()
+        tasks = []
+        for component in components:
+            # copy the context so the active span is the parent of spans in the thread
+            context = contextvars.copy_context()
+            tasks.append(
+                _submit(
+                    loop.run_in_executor,
+                    executor,
+                    context.run,
+                    self._run_component,
+                    component,
+                    *args,
+                    **kwargs,
                 )
-            await asyncio.gather(*tasks)
+            )
+        return await asyncio.gather(*tasks)
 
     @staticmethod
     def _run_component(component: PipelineComponent, *args, **kwargs):
@@ -85,21 +166,62 @@ class MultithreadExecutionStrategy(ExecutionStrategy):
 
 
 class MultiprocessExecutionStrategy(ExecutionStrategy):
-    """Executes stages concurrently in multiple processes using ProcessPoolExecutor"""
+    """
+    Executes stages concurrently in multiple processes using ProcessPoolExecutor
+    Uses the executor of the resource pool when the group runs in a process pool
+    """
 
     async def execute(self, components: List[PipelineComponent], *args, **kwargs):
-        with ProcessPoolExecutor() as executor:
-            loop = asyncio.get_event_loop()
-            tasks = []
-            for component in components:
-                tasks.append(
-                    loop.run_in_executor(
-                        executor, self._run_component, component, *args, **kwargs
-                    )
+        executor = pool_executor(PoolKind.PROCESS)
+        if executor is not None:
+            outcomes = await self._execute(executor, components, *args, **kwargs)
+        else:
+            with ProcessPoolExecutor() as executor:
+                outcomes = await self._execute(executor, components, *args, **kwargs)
+        results = []
+        for component, (result, spans, deltas) in zip(components, outcomes):
+            if component.tracer is not None:
+                component.tracer.collect(spans)
+            apply_deltas(deltas)
+            results.append(result)
+        return results
+
+    async def _execute(
+        self, executor: Executor, components: List[PipelineComponent], *args, **kwargs
+    ):
+        """Runs the components in the executor and returns their outcomes"""
+        span_context = current_span_context()
+        loop = asyncio.get_event_loop()
+        tasks = []
+        for component in components:
+            tasks.append(
+                _submit(
+                    loop.run_in_executor,
+                    executor,
+                    self._run_component,
+                    component,
+                    span_context,
+                    *args,
+                    **kwargs,
                 )
-            await asyncio.gather(*tasks)
+            )
+        return await asyncio.gather(*tasks)
 
     @staticmethod
-    def _run_component(component: PipelineComponent, *args, **kwargs):
-        """Helper function to run stage's execute method in a separate process."""
-        return asyncio.run(component.run(*args, **kwargs))
+    def _run_component(
+        component: PipelineComponent,
+        span_context: Optional[SpanContext],
+        *args,
+        **kwargs
+    ):
+        """
+        Helper function to run stage's execute method in a separate process.
+        Returns the result together with the spans recorded in the process
+        and the updates made to context aggregates
+        """
+        if component.tracer is None:
+            result = asyncio.run(component.run(*args, **kwargs))
+            return result, [], collect_deltas()
+        with use_span_context(component.tracer, span_context):
+            result = asyncio.run(component.run(*args, **kwargs))
+        return result, component.tracer.drain(), collect_deltas()
@@ -0,0 +1,218 @@
+"""
+    Contains triggers that wake up a TriggeredCycleStrategy
+"""
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import socket
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional, Tuple
+
+from dynapipeline.utils.handler_types import HandlerType
+
+Fire = Callable[[], None]
+
+# inotify event masks, see inotify(7)
+IN_MODIFY = 0x002
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+
+
+class Trigger(ABC):
+    """
+    Abstract base class for sources waking up a TriggeredCycleStrategy
+    Triggers are started and stopped on the event loop running the strategy
+    """
+
+    @abstractmethod
+    def start(self, fire: Fire) -> None:
+        """Starts calling fire whenever the watched source has activity"""
+        raise NotImplementedError("Subclasses must implement the start method")
+
+    @abstractmethod
+    def stop(self) -> None:
+        """Stops watching the source"""
+        raise NotImplementedError("Subclasses must implement the stop method")
+
+    def rearm(self) -> None:
+        """Called after every triggered run, for triggers that disarm when firing"""
+
+
+class QueueTrigger(Trigger):
+    """
+    Fires when an item is put into an asyncio.Queue or any channel with put_nowait
+    `put_nowait` of the queue instance is wrapped while the trigger is started
+    """
+
+    def __init__(self, queue: Any):
+        self.queue = queue
+
+    def start(self, fire: Fire) -> None:
+        put_nowait = self.queue.put_nowait
+
+        def notify_put_nowait(item, *args, **kwargs):
+            """Puts the item and fires the trigger"""
+            put_nowait(item, *args, **kwargs)
+            fire()
+
+        self.queue.put_nowait = notify_put_nowait
+        if not self.queue.empty():
+            fire()
+
+    def stop(self) -> None:
+        vars(self.queue).pop("put_nowait", None)
+
+
+class SocketTrigger(Trigger):
+    """
+    Fires when a socket becomes readable
+    The reader is removed when it fires and added again after the run, so the
+    run should consume the pending data
+    """
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self._fire: Optional[Fire] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._armed = False
+
+    def _readable(self) -> None:
+        """Disarms the reader and fires"""
+        self._disarm()
+        self._fire()  # type: ignore[misc]
+
+    def _disarm(self) -> None:
+        """Removes the reader from the loop"""
+        if self._armed:
+            self._loop.remove_reader(self.sock.fileno())  # type: ignore[union-attr]
+            self._armed = False
+
+    def start(self, fire: Fire) -> None:
+        self._fire = fire
+        self._loop = asyncio.get_running_loop()
+        self.rearm()
+
+    def rearm(self) -> None:
+        if not self._armed and self._loop is not None:
+            self._loop.add_reader(self.sock.fileno(), self._readable)
+            self._armed = True
+
+    def stop(self) -> None:
+        self._disarm()
+        self._loop = None
+
+
+class GroupTrigger(Trigger):
+    """Fires whenever another component, such as a stage group, finishes a run"""
+
+    def __init__(self, component: Any):
+        self.component = component
+        self._fire: Optional[Fire] = None
+
+    def _completed(self, component: Any, result: Any, *args, **kwargs) -> None:
+        """After handler of the watched component"""
+        if self._fire is not None:
+            self._fire()
+
+    def start(self, fire: Fire) -> None:
+        self._fire = fire
+        # register the after hook only, a full Handler would also add an around hook
+        self.component.handlers.register(HandlerType.AFTER.value, [self._completed])
+
+    def stop(self) -> None:
+        self._fire = None
+        self.component.handlers.detach([self])
+
+
+def _load_inotify() -> Optional[ctypes.CDLL]:
+    """Returns libc if it provides inotify"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.inotify_init1  # pylint: disable=pointless-statement
+    except (OSError, AttributeError, TypeError):
+        return None
+    return libc
+
+
+class FileTrigger(Trigger):
+    """
+    Fires when a file or a directory (its direct entries) changes
+    Uses inotify when available and falls back to polling the modification
+    times every `poll_interval` seconds
+    """
+
+    mask = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self, path: str, poll_interval: float = 0.5, use_inotify: bool = True):
+        self.path = os.fspath(path)
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self._fd: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._poller: Optional[asyncio.Task] = None
+
+    @property
+    def uses_inotify(self) -> bool:
+        """Returns True while the trigger is watching through inotify"""
+        return self._fd is not None
+
+    def start(self, fire: Fire) -> None:
+        self._loop = asyncio.get_running_loop()
+        libc = _load_inotify() if self.use_inotify else None
+        if libc is not None:
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd >= 0:
+                if libc.inotify_add_watch(fd, self.path.encode(), self.mask) >= 0:
+                    self._fd = fd
+                    self._loop.add_reader(fd, self._drain, fire)
+                    return
+                os.close(fd)
+        self._poller = self._loop.create_task(self._poll(fire))
+
+    def _drain(self, fire: Fire) -> None:
+        """Reads the pending inotify events and fires once for all of them"""
+        try:
+            while os.read(self._fd, 65536):  # type: ignore[arg-type]
+                pass
+        except BlockingIOError:
+            pass
+        fire()
+
+    def _signature(self) -> Optional[Tuple]:
+        """Returns a value that changes when the file or the directory entries change"""
+        try:
+            if os.path.isdir(self.path):
+                with os.scandir(self.path) as entries:
+                    return tuple(
+                        sorted(
+                            (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+                            for entry in entries
+                        )
+                    )
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    async def _poll(self, fire: Fire) -> None:
+        """Fires whenever the signature of the path changes"""
+        previous = self._signature()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            current = self._signature()
+            if current != previous:
+                previous = current
+                fire()
+
+    def stop(self) -> None:
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)  # type: ignore[union-attr]
+            os.close(self._fd)
+            self._fd = None
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
@@ -7,6 +7,7 @@ from pydantic import BaseModel, ConfigDict
 
 from dynapipeline.core.handler import AbstractHandler
 from dynapipeline.pipelines.component import PipelineComponent
+from dynapipeline.utils.circuit_states import CircuitState
 
 
 class Handler(BaseModel, AbstractHandler[PipelineComponent]):
@@ -57,3 +58,15 @@ class Handler(BaseModel, AbstractHandler[PipelineComponent]):
         Can be overridden
         """
         return None
+
+    def on_circuit_change(
+        self,
+        component: PipelineComponent,
+        previous: CircuitState,
+        state: CircuitState,
+    ) -> Optional[Awaitable[None]]:
+        """
+        Called when the circuit breaker of the component changes its state
+        Can be overridden
+        """
+        return None
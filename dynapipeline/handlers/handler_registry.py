@@ -39,6 +39,15 @@ class HandlerRegistry(
         for name, methods in method_dict.items():
             super().register(name, methods)
 
+    def detach(self, handlers: List[AbstractHandler]) -> None:
+        """
+        detaches handlers by unregistering every method bound to one of them
+        """
+        for name in list(self._items):
+            for method in list(self._items[name]):
+                if any(getattr(method, "__self__", None) is h for h in handlers):
+                    super().unregister(name, method)
+
     async def notify(self, method_name: str, *args, **kwargs):
         """
         Notifies (calls) all handlers registered under a specific method name
@@ -46,7 +55,8 @@ class HandlerRegistry(
         methods = self.get(method_name)
         result = None
         if methods:
-            for method in methods:
+            # iterate over a copy so handlers can detach themselves while notified
+            for method in tuple(methods):
                 result = method(*args, **kwargs)
                 if asyncio.iscoroutine(result):
                     result = await result
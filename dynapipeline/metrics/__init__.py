@@ -0,0 +1,16 @@
+"""
+This module provides runtime metrics collected for pipeline components"""
+
+from dynapipeline.metrics.counters import ThreadLocalCounter
+from dynapipeline.metrics.exporter import OpenMetricsExporter
+from dynapipeline.metrics.histogram import LatencyHistogram
+from dynapipeline.metrics.openmetrics import render_openmetrics
+from dynapipeline.metrics.stats import ComponentStats
+
+__all__ = [
+    "LatencyHistogram",
+    "ComponentStats",
+    "ThreadLocalCounter",
+    "OpenMetricsExporter",
+    "render_openmetrics",
+]
@@ -0,0 +1,120 @@
+"""
+    Contains ThreadCells, per-thread values that are folded together when a thread ends
+"""
+import itertools
+import threading
+import weakref
+from typing import Callable, Dict, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class _CellOwner:
+    """Stored in the thread-local storage of a thread, dies when the thread ends"""
+
+    __slots__ = ("__weakref__",)
+
+
+def _retire(cells_ref: "weakref.ref[ThreadCells]", key: int) -> None:
+    """Retires the cell of a finished thread if its ThreadCells still exists"""
+    cells = cells_ref()
+    if cells is not None:
+        cells._retire(key)
+
+
+class ThreadCells(Generic[T]):
+    """
+    One mutable cell per thread plus a retired cell
+
+    Every thread writes only the cell returned by `get`, which never takes a
+    lock after the first call in a thread. When a thread ends its cell is
+    folded into the retired cell and forgotten, so the number of cells is
+    bounded by the number of live threads
+    """
+
+    __slots__ = (
+        "_factory",
+        "_fold",
+        "_local",
+        "_live",
+        "_retired",
+        "_keys",
+        "_written",
+        "_lock",
+        "__weakref__",
+    )
+
+    def __init__(self, factory: Callable[[], T], fold: Callable[[T, T], None]):
+        self._factory = factory
+        self._fold = fold
+        self._local = threading.local()
+        self._live: Dict[int, T] = {}
+        self._retired = factory()
+        self._keys = itertools.count()
+        self._written = False
+        # reentrant, dropping the old thread-local storage in `drain` retires
+        # the cell of the calling thread while the lock is held
+        self._lock = threading.RLock()
+
+    def get(self) -> T:
+        """Returns the cell of the calling thread"""
+        try:
+            return self._local.cell
+        except AttributeError:
+            return self._new_cell()
+
+    def _new_cell(self) -> T:
+        """Creates the cell of the calling thread"""
+        cell = self._factory()
+        owner = _CellOwner()
+        with self._lock:
+            key = next(self._keys)
+            self._live[key] = cell
+            self._written = True
+        finalizer = weakref.finalize(owner, _retire, weakref.ref(self), key)
+        finalizer.atexit = False
+        self._local.cell = cell
+        self._local.owner = owner
+        return cell
+
+    def _retire(self, key: int) -> None:
+        """Folds the cell of a finished thread into the retired cell"""
+        with self._lock:
+            cell = self._live.pop(key, None)
+            if cell is not None:
+                self._fold(self._retired, cell)
+
+    def absorb(self, value: T) -> None:
+        """Folds a value recorded elsewhere, such as in another process, into the retired cell"""
+        with self._lock:
+            self._fold(self._retired, value)
+            self._written = True
+
+    def fold_into(self, target: T) -> T:
+        """Folds the retired cell and the cells of live threads into target"""
+        with self._lock:
+            self._fold(target, self._retired)
+            for cell in tuple(self._live.values()):
+                self._fold(target, cell)
+        return target
+
+    def drain(self, target: T) -> T:
+        """Folds every cell into target and starts over with empty cells"""
+        with self._lock:
+            live, retired = self._live, self._retired
+            self._live, self._retired = {}, self._factory()
+            self._written = False
+            # threads get new cells, the old ones are no longer retired
+            self._local = threading.local()
+            self._fold(target, retired)
+            for cell in live.values():
+                self._fold(target, cell)
+        return target
+
+    def written(self) -> bool:
+        """Returns whether any value was recorded since creation or the last drain"""
+        return self._written
+
+    def __len__(self) -> int:
+        """Returns the number of cells of live threads"""
+        return len(self._live)
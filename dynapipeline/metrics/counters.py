@@ -0,0 +1,52 @@
+"""
+    Contains ThreadLocalCounter, a counter that threads update without locking
+"""
+from typing import List
+
+from dynapipeline.metrics.cells import ThreadCells
+
+
+def _new_cell() -> List[int]:
+    """Returns an empty counter cell"""
+    return [0]
+
+
+def _fold(target: List[int], source: List[int]) -> None:
+    """Adds the value of a cell to another one"""
+    target[0] += source[0]
+
+
+class ThreadLocalCounter:
+    """
+    Counter split into one cell per thread
+
+    Every thread only writes its own cell so increments never contend, readers
+    sum a snapshot of the cells. Cells may go negative when a value is
+    increased in one thread and decreased in another, the sum stays correct.
+    Cells of finished threads are folded together
+    """
+
+    __slots__ = ("_cells",)
+
+    def __init__(self):
+        self._cells: ThreadCells[List[int]] = ThreadCells(_new_cell, _fold)
+
+    def add(self, amount: int = 1) -> None:
+        """Adds amount to the cell of the calling thread"""
+        self._cells.get()[0] += amount
+
+    @property
+    def value(self) -> int:
+        """Returns the sum of all cells"""
+        return self._cells.fold_into([0])[0]
+
+    def __getstate__(self):
+        """Pickles the summed value so the copy does not carry thread cells"""
+        return {"value": self.value}
+
+    def __setstate__(self, state):
+        self._cells = ThreadCells(_new_cell, _fold)
+        self._cells.absorb([state["value"]])
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(value={self.value})"
@@ -0,0 +1,108 @@
+"""
+    Contains OpenMetricsExporter which publishes runtime metrics of pipelines
+"""
+import asyncio
+import os
+from typing import TYPE_CHECKING, List, Optional
+
+from dynapipeline.metrics.openmetrics import (
+    CONTENT_TYPE,
+    render_openmetrics,
+    walk_components,
+)
+
+if TYPE_CHECKING:
+    from dynapipeline.pipelines.pipeline import Pipeline
+
+
+class OpenMetricsExporter:
+    """
+    Optional exporter serving pipeline metrics as OpenMetrics text over a local
+    HTTP or Unix socket endpoint, or writing them to a file on an interval
+    Creating the exporter starts counting the runs in progress of the
+    pipelines' components, pipelines without an exporter do not pay for it
+    """
+
+    def __init__(self, pipelines: List["Pipeline"]):
+        self.pipelines = pipelines
+        for pipeline in pipelines:
+            for component, _, _ in walk_components(pipeline):
+                component.component_stats.track_in_flight()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writer_task: Optional[asyncio.Task] = None
+
+    def render(self) -> str:
+        """Returns the current metrics in OpenMetrics text format"""
+        return render_openmetrics(self.pipelines)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Answers a single HTTP request with the current metrics"""
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            writer.close()
+            return
+        body = self.render().encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            + f"Content-Type: {CONTENT_TYPE}\r\n".encode()
+            + f"Content-Length: {len(body)}\r\n".encode()
+            + b"Connection: close\r\n\r\n"
+            + body
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve_http(self, host: str = "127.0.0.1", port: int = 9464):
+        """Starts serving metrics over HTTP and returns the server"""
+        self._ensure_not_serving()
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server
+
+    async def serve_unix(self, path: str):
+        """Starts serving metrics over HTTP on a Unix socket and returns the server"""
+        self._ensure_not_serving()
+        self._server = await asyncio.start_unix_server(self._handle, path)
+        return self._server
+
+    def write(self, path: str) -> None:
+        """Atomically writes the current metrics to a file"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(self.render())
+        os.replace(tmp_path, path)
+
+    def write_periodically(self, path: str, interval: float) -> asyncio.Task:
+        """Starts a task writing the metrics to a file every interval seconds"""
+        if self._writer_task and not self._writer_task.done():
+            raise RuntimeError("Exporter is already writing metrics")
+
+        async def _write_loop():
+            """Writes the metrics until the task is cancelled"""
+            while True:
+                self.write(path)
+                await asyncio.sleep(interval)
+
+        self._writer_task = asyncio.create_task(_write_loop())
+        return self._writer_task
+
+    def _ensure_not_serving(self):
+        """Raises RuntimeError if a server is already running"""
+        if self._server is not None:
+            raise RuntimeError("Exporter is already serving metrics")
+
+    async def close(self):
+        """Stops the server and the periodic writer"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
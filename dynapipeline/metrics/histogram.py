@@ -0,0 +1,93 @@
+"""
+    Contains LatencyHistogram, a log-bucketed histogram with bounded memory
+"""
+import math
+from typing import Dict, Iterator, Optional, Tuple
+
+
+class LatencyHistogram:
+    """
+    HDR style histogram for non-negative integer values (nanoseconds)
+
+    Values below 2**precision are counted exactly, larger values share a bucket
+    with the values that have the same `precision` leading bits so the relative
+    error stays below 2**(1 - precision) and the number of buckets is bounded
+    """
+
+    __slots__ = ("precision", "count", "total", "min", "max", "_buckets")
+
+    def __init__(self, precision: int = 5):
+        if precision < 1:
+            raise ValueError("precision must be a positive integer")
+        self.precision = precision
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+        self._buckets: Dict[int, int] = {}
+
+    def _index(self, value: int) -> int:
+        """Returns the bucket index of a value"""
+        shift = value.bit_length() - self.precision
+        if shift <= 0:
+            return value
+        return (shift << (self.precision - 1)) + (value >> shift)
+
+    def _bounds(self, index: int) -> Tuple[int, int]:
+        """Returns the lowest and highest value stored in a bucket"""
+        if index < (1 << self.precision):
+            return index, index
+        half = 1 << (self.precision - 1)
+        shift = (index >> (self.precision - 1)) - 1
+        mantissa = half + (index & (half - 1))
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        """Records a single value"""
+        value = max(int(value), 0)
+        index = self._index(value)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Adds all values recorded by another histogram of the same precision"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge histograms with different precision")
+        for index, count in other._buckets.items():
+            self._buckets[index] = self._buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def buckets(self) -> Iterator[Tuple[int, int]]:
+        """Yields (upper bound, count) for every non-empty bucket in ascending order"""
+        for index in sorted(self._buckets):
+            yield self._bounds(index)[1], self._buckets[index]
+
+    def percentile(self, quantile: float) -> Optional[int]:
+        """
+        Returns the value at the given quantile (0-100)
+        The result is the upper bound of the bucket clamped to the recorded range
+        """
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(self.count * quantile / 100))
+        seen = 0
+        for upper, count in self.buckets():
+            seen += count
+            if seen >= rank:
+                return min(max(upper, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Returns the mean of the recorded values"""
+        return self.total / self.count if self.count else None
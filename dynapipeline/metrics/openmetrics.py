@@ -0,0 +1,176 @@
+"""
+    Renders runtime metrics of pipelines in the OpenMetrics text format
+"""
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Tuple
+
+from dynapipeline.metrics.stats import PERCENTILES
+from dynapipeline.utils.circuit_states import CircuitState
+
+if TYPE_CHECKING:
+    from dynapipeline.pipelines.component import PipelineComponent
+    from dynapipeline.pipelines.pipeline import Pipeline
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PREFIX = "dynapipeline"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    """Escapes a label value"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    """Formats labels as {name="value",...}"""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def walk_components(
+    pipeline: "Pipeline",
+) -> Iterator[Tuple["PipelineComponent", str, str]]:
+    """Yields every component of a pipeline with its kind and path"""
+    yield pipeline, "pipeline", pipeline.name
+    for group in pipeline.stage_groups:
+        group_path = f"{pipeline.name}/{group.name}"
+        yield group, "group", group_path
+        for stage in group.stages:
+            yield stage, "stage", f"{group_path}/{stage.name}"
+
+
+class _Family:
+    """Samples of a single metric family"""
+
+    __slots__ = ("metric_type", "help", "unit", "samples")
+
+    def __init__(self, metric_type: str, help_text: str, unit: str = ""):
+        self.metric_type = metric_type
+        self.help = help_text
+        self.unit = unit
+        self.samples: List[Tuple[str, Labels, float]] = []
+
+
+def _format_value(value: float) -> str:
+    """Formats a sample value"""
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def render_openmetrics(pipelines: Iterable["Pipeline"]) -> str:
+    """
+    Returns the OpenMetrics exposition of the given pipelines
+    Reading the metrics never blocks threads that are recording them
+    """
+    families: Dict[str, _Family] = {}
+
+    def family(name: str, metric_type: str, help_text: str, unit: str = ""):
+        """Returns the named family, creating it on first use"""
+        if name not in families:
+            families[name] = _Family(metric_type, help_text, unit)
+        return families[name]
+
+    for pipeline in pipelines:
+        for component, kind, path in walk_components(pipeline):
+            labels: Labels = (("kind", kind), ("path", path))
+            stats = component.component_stats
+            snapshot = stats.snapshot()
+            latency = family(
+                f"{PREFIX}_latency_seconds",
+                "summary",
+                "Run latency of pipeline components",
+                "seconds",
+            )
+            for quantile in PERCENTILES.values():
+                value = snapshot.latency.percentile(quantile)
+                if value is not None:
+                    # :g keeps 99.9 / 100 from rendering as 0.9990000000000001
+                    quantile_label = ("quantile", f"{quantile / 100:g}")
+                    latency.samples.append(
+                        ("", labels + (quantile_label,), value / 1e9)
+                    )
+            latency.samples.append(("_count", labels, snapshot.latency.count))
+            latency.samples.append(("_sum", labels, snapshot.latency.total / 1e9))
+            family(f"{PREFIX}_runs", "counter", "Finished runs").samples.append(
+                ("_total", labels, snapshot.runs)
+            )
+            family(f"{PREFIX}_errors", "counter", "Failed runs").samples.append(
+                ("_total", labels, snapshot.errors)
+            )
+            if stats.in_flight is not None:
+                family(
+                    f"{PREFIX}_in_flight", "gauge", "Runs in progress"
+                ).samples.append(("", labels, stats.in_flight.value))
+            for name, counter in sorted(tuple(stats.counters.items())):
+                family(
+                    f"{PREFIX}_{name}", "counter", f"Number of {name} of components"
+                ).samples.append(("_total", labels, counter.value))
+            strategy = getattr(component, "execution_strategy", None)
+            if strategy is not None:
+                family(
+                    f"{PREFIX}_queue_depth",
+                    "gauge",
+                    "Components waiting for the execution strategy",
+                ).samples.append(("", labels, strategy.queue_depth))
+            admission = getattr(component, "admission", None)
+            if admission is not None:
+                shed = family(
+                    f"{PREFIX}_admission_shed",
+                    "counter",
+                    "Items rejected or dropped by admission control",
+                )
+                for reason, count in admission.shed.items():
+                    shed.samples.append(
+                        ("_total", labels + (("reason", reason.value),), count)
+                    )
+                family(
+                    f"{PREFIX}_admission_admitted",
+                    "counter",
+                    "Items admitted by admission control",
+                ).samples.append(("_total", labels, admission.admitted))
+                family(
+                    f"{PREFIX}_admission_queued",
+                    "gauge",
+                    "Items waiting in the admission queue",
+                ).samples.append(("", labels, admission.qsize()))
+            pool = getattr(component, "pool", None)
+            if pool is not None:
+                pool_labels = labels + (("pool", pool.name),)
+                family(
+                    f"{PREFIX}_pool_in_use", "gauge", "Slots held in the resource pool"
+                ).samples.append(("", pool_labels, pool.in_use))
+                family(
+                    f"{PREFIX}_pool_waiting",
+                    "gauge",
+                    "Runs waiting for a slot of the resource pool",
+                ).samples.append(("", pool_labels, pool.waiting))
+            breaker = getattr(component, "circuit_breaker", None)
+            if breaker is not None:
+                states = family(
+                    f"{PREFIX}_circuit_state",
+                    "stateset",
+                    "State of the circuit breaker of the component",
+                )
+                for state in CircuitState:
+                    states.samples.append(
+                        (
+                            "",
+                            labels + ((f"{PREFIX}_circuit_state", state.value),),
+                            int(breaker.state is state),
+                        )
+                    )
+
+    lines: List[str] = []
+    for name, metric in families.items():
+        lines.append(f"# TYPE {name} {metric.metric_type}")
+        if metric.unit:
+            lines.append(f"# UNIT {name} {metric.unit}")
+        lines.append(f"# HELP {name} {metric.help}")
+        for suffix, labels, value in metric.samples:
+            lines.append(
+                f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}"
+            )
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
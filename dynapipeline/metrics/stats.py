@@ -0,0 +1,162 @@
+"""
+    Contains ComponentStats which aggregates run records of a pipeline component
+"""
+from typing import Any, Dict, Optional
+
+from dynapipeline.metrics.cells import ThreadCells
+from dynapipeline.metrics.counters import ThreadLocalCounter
+from dynapipeline.metrics.histogram import LatencyHistogram
+from dynapipeline.utils.run_record import RunRecord
+
+PERCENTILES = {"p50": 50, "p90": 90, "p99": 99, "p999": 99.9}
+
+# names of built-in summary keys and metric families, counters cannot use them
+RESERVED_NAMES = frozenset(
+    {
+        "runs",
+        "errors",
+        "in_flight",
+        "throughput",
+        "mean",
+        "max",
+        "stages",
+        "groups",
+        "admission",
+        "latency_seconds",
+        "queue_depth",
+        "admission_shed",
+        "admission_admitted",
+        "admission_queued",
+        "pool_in_use",
+        "pool_waiting",
+        "circuit_state",
+        *PERCENTILES,
+    }
+)
+
+
+class StatsShard:
+    """
+    Latency histogram and run counters written by a single thread
+    """
+
+    __slots__ = ("latency", "runs", "errors", "first_start_ns", "last_end_ns")
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.runs = 0
+        self.errors = 0
+        self.first_start_ns: Optional[int] = None
+        self.last_end_ns: Optional[int] = None
+
+    def record(self, record: RunRecord) -> None:
+        """Updates the histogram and counters with a finished run"""
+        self.latency.record(record.duration_ns)
+        self.runs += 1
+        if record.failed:
+            self.errors += 1
+        if self.first_start_ns is None or record.start_ns < self.first_start_ns:
+            self.first_start_ns = record.start_ns
+        if self.last_end_ns is None or record.end_ns > self.last_end_ns:
+            self.last_end_ns = record.end_ns
+
+    def merge(self, other: "StatsShard") -> None:
+        """Adds the values recorded by another shard"""
+        self.latency.merge(other.latency)
+        self.runs += other.runs
+        self.errors += other.errors
+        if other.first_start_ns is not None and (
+            self.first_start_ns is None or other.first_start_ns < self.first_start_ns
+        ):
+            self.first_start_ns = other.first_start_ns
+        if other.last_end_ns is not None and (
+            self.last_end_ns is None or other.last_end_ns > self.last_end_ns
+        ):
+            self.last_end_ns = other.last_end_ns
+
+    @property
+    def throughput(self) -> Optional[float]:
+        """Returns finished runs per second over the observed time window"""
+        if self.first_start_ns is None or self.last_end_ns is None:
+            return None
+        elapsed = self.last_end_ns - self.first_start_ns
+        return self.runs / (elapsed / 1e9) if elapsed > 0 else None
+
+
+class ComponentStats:
+    """
+    Latency histogram and counters of a single component
+
+    Runs are recorded into a shard owned by the recording thread so the hot
+    path never takes a lock, readers merge a snapshot of all shards. Shards of
+    finished threads are merged into one retired shard. Runs in progress are
+    only counted once `track_in_flight` was called, the metrics exporter does
+    it for the components it publishes
+    """
+
+    __slots__ = ("_shards", "in_flight", "counters")
+
+    def __init__(self):
+        self._shards: ThreadCells[StatsShard] = ThreadCells(
+            StatsShard, StatsShard.merge
+        )
+        self.in_flight: Optional[ThreadLocalCounter] = None
+        self.counters: Dict[str, ThreadLocalCounter] = {}
+
+    def record(self, record: RunRecord) -> None:
+        """Records a finished run in the shard of the calling thread"""
+        self._shards.get().record(record)
+
+    def track_in_flight(self) -> None:
+        """Starts counting the runs in progress"""
+        if self.in_flight is None:
+            self.in_flight = ThreadLocalCounter()
+
+    def counter(self, name: str) -> ThreadLocalCounter:
+        """
+        Returns the named counter, creating it on first use
+        Raises ValueError for names of built-in statistics
+        """
+        counter = self.counters.get(name)
+        if counter is None:
+            if name in RESERVED_NAMES:
+                raise ValueError(f"'{name}' is the name of a built-in statistic")
+            counter = self.counters.setdefault(name, ThreadLocalCounter())
+        return counter
+
+    def snapshot(self) -> StatsShard:
+        """Returns a shard holding the merged values of all threads"""
+        return self._shards.fold_into(StatsShard())
+
+    def __getstate__(self):
+        """Pickles the merged values so the copy does not carry thread shards"""
+        return {
+            "shard": self.snapshot(),
+            "in_flight": self.in_flight,
+            "counters": dict(self.counters),
+        }
+
+    def __setstate__(self, state):
+        self._shards = ThreadCells(StatsShard, StatsShard.merge)
+        self._shards.absorb(state["shard"])
+        self.in_flight = state["in_flight"]
+        self.counters = state["counters"]
+
+    def summary(self) -> Dict[str, Any]:
+        """Returns the counters and latency percentiles, latencies are in seconds"""
+        snapshot = self.snapshot()
+        latency = snapshot.latency
+        summary: Dict[str, Any] = {
+            "runs": snapshot.runs,
+            "errors": snapshot.errors,
+            "in_flight": None if self.in_flight is None else self.in_flight.value,
+            "throughput": snapshot.throughput,
+            "mean": None if latency.mean is None else latency.mean / 1e9,
+            "max": None if latency.max is None else latency.max / 1e9,
+        }
+        for name, quantile in PERCENTILES.items():
+            value = latency.percentile(quantile)
+            summary[name] = None if value is None else value / 1e9
+        for name, counter in tuple(self.counters.items()):
+            summary[name] = counter.value
+        return summary
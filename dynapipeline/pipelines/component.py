@@ -3,15 +3,20 @@
 """
 import uuid
 from abc import abstractmethod
-from typing import Any, Optional
+from collections import deque
+from typing import Any, Deque, Dict, Optional
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_validator
 
 from dynapipeline.core.component import AbstractComponent
 from dynapipeline.core.context import AbstractContext
 from dynapipeline.core.handler_registry import AbstractHandlerRegistry
 from dynapipeline.handlers.handler_registry import HandlerRegistry
+from dynapipeline.metrics.stats import ComponentStats
+from dynapipeline.tracing.tracer import Tracer
+from dynapipeline.utils.cycles import cycle_turn
 from dynapipeline.utils.handler_types import HandlerType
+from dynapipeline.utils.run_record import RunRecord
 from dynapipeline.utils.timer import measure_execution_time
 
 
@@ -24,10 +29,62 @@ class PipelineComponent(BaseModel, AbstractComponent):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), init=False)
     context: Optional[AbstractContext] = None
     handlers: AbstractHandlerRegistry = Field(default_factory=HandlerRegistry)
+    tracer: Optional[Tracer] = None
     model_config = ConfigDict(arbitrary_types_allowed=True, extra="ignore")
-    start_time: Optional[float] = None
-    end_time: Optional[float] = None
-    execution_time: Optional[float] = None
+    history_size: int = Field(
+        default=32, gt=0, description="Number of run records kept for the component"
+    )
+    _run_history: Deque[RunRecord] = PrivateAttr()
+    _stats: ComponentStats = PrivateAttr(default_factory=ComponentStats)
+
+    def model_post_init(self, __context: Any) -> None:
+        """Creates the bounded run history once the fields are validated"""
+        self._run_history = deque(maxlen=self.history_size)
+
+    @property
+    def run_history(self) -> Deque[RunRecord]:
+        """Returns the most recent run records, oldest first"""
+        return self._run_history
+
+    @property
+    def last_run(self) -> Optional[RunRecord]:
+        """Returns the record of the most recently finished run"""
+        return self._run_history[-1] if self._run_history else None
+
+    @property
+    def start_time(self) -> Optional[float]:
+        """Start of the last finished run in seconds (perf_counter based)"""
+        record = self.last_run
+        return None if record is None else record.start_ns / 1e9
+
+    @property
+    def end_time(self) -> Optional[float]:
+        """End of the last finished run in seconds (perf_counter based)"""
+        record = self.last_run
+        return None if record is None else record.end_ns / 1e9
+
+    @property
+    def execution_time(self) -> Optional[float]:
+        """Duration of the last finished run in seconds"""
+        record = self.last_run
+        return None if record is None else record.duration
+
+    def record_run(self, record: RunRecord) -> None:
+        """Stores the record of a finished run and updates the latency statistics"""
+        # private attributes are read from __pydantic_private__ directly, the
+        # model's __getattr__ fallback is slow enough to show on every run
+        private = self.__pydantic_private__
+        private["_run_history"].append(record)
+        private["_stats"].record(record)
+
+    @property
+    def component_stats(self) -> ComponentStats:
+        """Returns the latency histogram and counters of the component"""
+        return self.__pydantic_private__["_stats"]
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns latency percentiles and throughput counters of the component"""
+        return self._stats.summary()
 
     def set_context(self, context: AbstractContext):
         """
@@ -36,6 +93,13 @@ class PipelineComponent(BaseModel, AbstractComponent):
         """
         self.context = context
 
+    def set_tracer(self, tracer: Optional[Tracer]):
+        """
+        Set the tracer recording spans of the component.
+
+        """
+        self.tracer = tracer
+
     @field_validator("name")
     def validate_name(cls, value):
         """Check that the name is non-empty string"""
@@ -43,9 +107,26 @@ class PipelineComponent(BaseModel, AbstractComponent):
             raise ValueError("The 'name' must be non-empty string")
         return value
 
-    @measure_execution_time
     async def run(self, *args, **kwargs):
-        """Run component"""
+        """Run component, in cycle order when it is part of overlapping cycles"""
+        turn = cycle_turn(self)
+        if turn is None:
+            return await self._measured_run(*args, **kwargs)
+        async with turn:
+            return await self._measured_run(*args, **kwargs)
+
+    @measure_execution_time
+    async def _measured_run(self, *args, **kwargs):
+        """Runs the component inside a span when a tracer is set"""
+        if self.tracer is None:
+            return await self._run(*args, **kwargs)
+        with self.tracer.span(
+            self.name, kind=type(self).__name__, component_id=self.id
+        ):
+            return await self._run(*args, **kwargs)
+
+    async def _run(self, *args, **kwargs):
+        """Runs the component with its handlers"""
         try:
             await self.handlers.notify(HandlerType.BEFORE, self, *args, **kwargs)
             if self.handlers.get(HandlerType.AROUND):
@@ -9,6 +9,8 @@ from dynapipeline.core.context import AbstractContext
 from dynapipeline.execution.base import CycleStrategy, ExecutionStrategy
 from dynapipeline.pipelines.pipeline import Pipeline
 from dynapipeline.pipelines.stage_group import StageGroup
+from dynapipeline.resilience.admission import AdmissionController
+from dynapipeline.tracing.tracer import Tracer
 from dynapipeline.utils.pipeline_types import PipeLineType
 
 
@@ -24,9 +26,14 @@ class PipelineFactory:
         cycle_strategy: CycleStrategy,
         execution_strategy: ExecutionStrategy,
         context_data: Optional[Dict[str, Any]] = None,
+        tracer: Optional[Tracer] = None,
+        context: Optional[AbstractContext] = None,
+        admission: Optional[AdmissionController] = None,
     ) -> Pipeline:
         """
         Method to create and return a Pipeline instance
+        A context can be passed explicitly, it is required for CUSTOM pipelines
+        An admission controller queues the input items submitted to the pipeline
         """
         pipeline = Pipeline(
             name=name,
@@ -34,9 +41,15 @@ class PipelineFactory:
             stage_groups=groups,
             cycle_strategy=cycle_strategy,
             execution_strategy=execution_strategy,
+            admission=admission,
         )
-        context = self.get_context(pipeline_type, context_data)
+        if context is None:
+            context = self.get_context(pipeline_type, context_data)
+        elif context_data:
+            context.update(context_data)
         self.inject_context(context, pipeline)
+        if tracer is not None:
+            self.inject_tracer(tracer, pipeline)
         return pipeline
 
     def get_context(
@@ -48,6 +61,8 @@ class PipelineFactory:
                 return AsyncLockableContext(context_data)
             case PipeLineType.ADVANCED:
                 return ProtectedContext(context_data)
+            case PipeLineType.CUSTOM:
+                raise ValueError("CUSTOM pipelines require an explicit context")
 
             case _:
                 raise ValueError("Invalid pipeline type")
@@ -63,3 +78,15 @@ class PipelineFactory:
 
             for stage in stage_group.stages:
                 stage.set_context(context)
+
+    def inject_tracer(self, tracer: Tracer, pipeline: Pipeline):
+        """
+        Injects the tracer into the pipeline, its stage groups, and individual stages
+        """
+        pipeline.set_tracer(tracer)
+
+        for stage_group in pipeline.stage_groups:
+            stage_group.set_tracer(tracer)
+
+            for stage in stage_group.stages:
+                stage.set_tracer(tracer)
@@ -1,6 +1,6 @@
 """ Contains Pipeline component which allows grouping GroupStages and specifiying execution style"""
 import asyncio
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import Field, ValidationInfo, field_validator
 
@@ -11,6 +11,8 @@ from dynapipeline.execution.strategies import (
 )
 from dynapipeline.pipelines.component import PipelineComponent
 from dynapipeline.pipelines.stage_group import StageGroup
+from dynapipeline.resilience.admission import AdmissionController
+from dynapipeline.tracing.tracer import trace_span
 from dynapipeline.utils.pipeline_types import PipeLineType
 
 
@@ -33,6 +35,10 @@ class Pipeline(PipelineComponent):
     execution_strategy: ExecutionStrategy = Field(
         ..., description="Strategy to determine how each stage group is executed"
     )
+    admission: Optional[AdmissionController] = Field(
+        default=None,
+        description="Admission controller queueing the input items of the pipeline",
+    )
     pipeline_task: Optional[asyncio.Task] = None
 
     @field_validator("execution_strategy")
@@ -81,7 +87,7 @@ class Pipeline(PipelineComponent):
         if not self.pipeline_task or self.pipeline_task.done():
             self.pipeline_task = asyncio.create_task(
                 self.cycle_strategy.run(
-                    self.execution_strategy.execute, self.stage_groups, *args, **kwargs
+                    self.execute_cycle, self.stage_groups, *args, **kwargs
                 )
             )
             results = await self.pipeline_task
@@ -89,9 +95,39 @@ class Pipeline(PipelineComponent):
         else:
             raise RuntimeError("Pipeline is already running")
 
+    async def execute_cycle(self, stage_groups: List[StageGroup], *args, **kwargs):
+        """Executes one cycle of the stage groups and counts it"""
+        self.component_stats.counter("cycles").add(1)
+        with trace_span("cycle", kind="cycle"):
+            return await self.execution_strategy.execute(stage_groups, *args, **kwargs)
+
+    def submit(self, item: Any, priority: int = 0):
+        """
+        Queues an input item in the admission controller of the pipeline
+        Raises AdmissionRejectedError when the pipeline is overloaded
+        """
+        if self.admission is None:
+            raise RuntimeError("Pipeline has no admission controller")
+        self.admission.submit(item, priority)
+
     def stop(self):
         """
-        Cancels the pipeline task if it's running
+        Cancels the pipeline task if it's running and flushes the context
+        The flush blocks until pending writes are on disk, call it through
+        `asyncio.to_thread(pipeline.stop)` to keep the event loop running
         """
         if self.pipeline_task and not self.pipeline_task.done():
             self.pipeline_task.cancel()
+        if self.context is not None:
+            self.context.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns latency percentiles and throughput counters of the pipeline
+        with the statistics of every stage group and stage nested under it
+        """
+        summary = super().stats()
+        summary["groups"] = {group.name: group.stats() for group in self.stage_groups}
+        if self.admission is not None:
+            summary["admission"] = self.admission.stats()
+        return summary
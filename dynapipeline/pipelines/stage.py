@@ -2,11 +2,34 @@
    Defines stage class  
 """
 import asyncio
-from typing import Optional
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
 
-from pydantic import Field
+from pydantic import Field, PrivateAttr, ValidationInfo, field_validator
 
+from dynapipeline.core.context import track_reads
+from dynapipeline.exceptions.resilience import CircuitOpenError
+from dynapipeline.execution.pools import to_thread
 from dynapipeline.pipelines.component import PipelineComponent
+from dynapipeline.resilience.breaker import CircuitBreaker
+from dynapipeline.resilience.hedge import HedgePolicy
+from dynapipeline.resilience.retry import RetryPolicy
+from dynapipeline.utils.circuit_states import CircuitState
+from dynapipeline.utils.cycles import cycle_turn
+from dynapipeline.utils.handler_types import HandlerType
+from dynapipeline.utils.slots import (
+    ExecutionSlot,
+    released_slot,
+    spare_slots,
+    using_slots,
+)
+from dynapipeline.utils.timer import RunScope, use_run_scope
+
+# seconds the current run spent waiting to retry, excluded from breaker timings
+_retry_wait: ContextVar[Optional[List[float]]] = ContextVar(
+    "dynapipeline_retry_wait", default=None
+)
 
 
 class Stage(PipelineComponent):
@@ -15,16 +38,269 @@ class Stage(PipelineComponent):
     timeout: Optional[float] = Field(
         default=None, description="Timeout in seconds for the stage execution"
     )
+    offload: bool = Field(
+        default=False,
+        description="Run the stage in a worker thread with its own event loop, "
+        "for stages doing synchronous work inside execute",
+    )
+    offload_safe: bool = Field(
+        default=False,
+        description="The stage uses no primitives bound to the pipeline's event "
+        "loop, such as AsyncLockableContext locks, and may be offloaded by "
+        "LoopStallMonitor",
+    )
+    reactive: bool = Field(
+        default=False,
+        description="Skip the run and return the previous result while the "
+        "context keys the stage depends on are unchanged",
+    )
+    depends_on: Optional[List[str]] = Field(
+        default=None,
+        description="Context keys a reactive stage depends on, "
+        "tracked from the keys it reads when not given",
+    )
+    retry: Optional[RetryPolicy] = Field(
+        default=None, description="Policy for retrying failed runs of the stage"
+    )
+    hedge: Optional[HedgePolicy] = Field(
+        default=None,
+        description="Policy for duplicating slow runs, only for idempotent stages",
+    )
+    circuit_breaker: Optional[CircuitBreaker] = Field(
+        default=None,
+        description="Breaker rejecting runs while the stage keeps failing or is slow",
+    )
+    _inputs: Optional[Dict[str, int]] = PrivateAttr(default=None)
+    _cached_result: Any = PrivateAttr(default=None)
+    _hedge_delay: Optional[float] = PrivateAttr(default=None)
+    _hedge_runs: int = PrivateAttr(default=0)
+    _hedges: int = PrivateAttr(default=0)
+
+    @field_validator("hedge")
+    @classmethod
+    def validate_hedge(cls, hedge, values: ValidationInfo):
+        """
+        Validate the hedge policy against the run history
+        The threshold is computed from the history, which must fit min_samples runs
+        """
+        history_size = values.data.get("history_size")
+        if hedge is not None and history_size is not None:
+            if hedge.min_samples > history_size:
+                raise ValueError("hedge.min_samples cannot exceed history_size")
+        return hedge
+
+    def invalidate(self):
+        """Forces the next run of a reactive stage"""
+        self._inputs = None
+
+    def _inputs_changed(self) -> bool:
+        """
+        Returns True if a key read by the previous run has been written since
+        A run that read no key and declared no dependencies always runs again,
+        its inputs are not known
+        """
+        if self._inputs is None or self.context is None:
+            return True
+        if not self._inputs and self.depends_on is None:
+            return True
+        return any(
+            self.context.key_version(key) != version
+            for key, version in self._inputs.items()
+        )
 
     async def run(self, *args, **kwargs):
-        """Execute the stage with an optional timeout"""
+        """
+        Execute the stage with an optional timeout, in cycle order when it is
+        part of overlapping cycles
+        The cycle turn is taken once per run, retries and hedged copies run
+        inside it
+        """
+        turn = cycle_turn(self)
+        if turn is None:
+            if self._has_layers():
+                return await self._run_in_turn(*args, **kwargs)
+            return await self._measured_run(*args, **kwargs)
+        async with turn:
+            return await self._run_in_turn(*args, **kwargs)
+
+    def _has_layers(self) -> bool:
+        """Returns True if a run needs more than the measured run of the stage"""
+        return (
+            self.reactive
+            or self.offload
+            or self.circuit_breaker is not None
+            or self.retry is not None
+            or self.hedge is not None
+            or (self.timeout is not None and self.timeout > 0)
+        )
+
+    async def _run_in_turn(self, *args, **kwargs):
+        """Runs the stage through its reactive, breaker, retry and hedge layers"""
+        if self.reactive and not self._inputs_changed():
+            self.component_stats.counter("reactive_skips").add()
+            return self._cached_result
+        if self.circuit_breaker is None:
+            return await self._run_reactive(*args, **kwargs)
+        return await self._run_with_breaker(*args, **kwargs)
+
+    async def _run_with_breaker(self, *args, **kwargs):
+        """
+        Runs the stage if its circuit breaker admits the run and records the
+        outcome, rejected runs raise CircuitOpenError or return the fallback
+        The recorded duration covers the attempts, not the waits between retries
+        """
+        breaker = self.circuit_breaker
+        previous = breaker.state
+        permit = breaker.acquire()
+        await self._circuit_changed(previous)
+        if permit is None:
+            self.component_stats.counter("circuit_rejections").add()
+            if breaker.has_fallback:
+                return breaker.fallback
+            raise CircuitOpenError(self.name)
+        waited = [0.0]
+        token = _retry_wait.set(waited)
+        start = time.perf_counter()
         try:
-            if self.timeout is not None and self.timeout > 0:
-                result = await asyncio.wait_for(
-                    super().run(*args, **kwargs), timeout=self.timeout
+            result = await self._run_reactive(*args, **kwargs)
+        except asyncio.CancelledError:
+            breaker.release(permit)
+            raise
+        except Exception as error:
+            previous = breaker.state
+            breaker.record(permit, time.perf_counter() - start - waited[0], error)
+            await self._circuit_changed(previous)
+            raise
+        finally:
+            _retry_wait.reset(token)
+        previous = breaker.state
+        breaker.record(permit, time.perf_counter() - start - waited[0], None)
+        await self._circuit_changed(previous)
+        return result
+
+    async def _circuit_changed(self, previous: CircuitState):
+        """Notifies the handlers if the circuit breaker left the previous state"""
+        state = self.circuit_breaker.state
+        if state is previous:
+            return
+        if state is CircuitState.OPEN:
+            self.component_stats.counter("circuit_opened").add()
+        await self.handlers.notify(HandlerType.ON_CIRCUIT_CHANGE, self, previous, state)
+
+    async def _run_reactive(self, *args, **kwargs):
+        """Runs the stage, recording the inputs of a reactive stage"""
+        if not self.reactive:
+            return await self._run_with_retry(*args, **kwargs)
+        if self.depends_on is not None and self.context is not None:
+            inputs = {key: self.context.key_version(key) for key in self.depends_on}
+            result = await self._run_with_retry(*args, **kwargs)
+        else:
+            with track_reads() as inputs:
+                result = await self._run_with_retry(*args, **kwargs)
+        self._inputs, self._cached_result = inputs, result
+        return result
+
+    async def _run_with_retry(self, *args, **kwargs):
+        """
+        Runs the stage and retries failed attempts according to the retry policy
+        The execution slot of the stage is given back while it waits to retry
+        """
+        if self.retry is None:
+            return await self._run_hedged(*args, **kwargs)
+        attempt = 1
+        while True:
+            try:
+                return await self._run_hedged(*args, **kwargs)
+            except Exception as error:  # pylint: disable=broad-except
+                if not self.retry.should_retry(error, attempt):
+                    raise
+            self.component_stats.counter("retries").add()
+            start = time.perf_counter()
+            async with released_slot():
+                await asyncio.sleep(self.retry.backoff(attempt))
+            waited = _retry_wait.get()
+            if waited is not None:
+                waited[0] += time.perf_counter() - start
+            attempt += 1
+
+    async def _run_hedged(self, *args, **kwargs):
+        """
+        Runs the stage and starts a duplicate run if it is slower than the hedge
+        threshold, the first successful run wins and the other one is cancelled
+        The duplicate holds slots of its own in the strategies and pools the run
+        holds slots of, it is skipped when one of them is not free
+        """
+        if self.hedge is None:
+            return await self._run_stage(*args, **kwargs)
+        if self._hedge_runs % self.hedge.refresh_every == 0:
+            self._hedge_delay = self.hedge.threshold(self.run_history)
+        self._hedge_runs += 1
+        if self._hedge_delay is None:
+            return await self._run_stage(*args, **kwargs)
+
+        scopes = {}
+        hedge_slots: List[ExecutionSlot] = []
+
+        def start():
+            """Starts a run of the stage in its own task and run scope"""
+            scope = RunScope()
+            task = asyncio.ensure_future(self._attempt(scope, *args, **kwargs))
+            scopes[task] = scope
+            return task
+
+        primary = start()
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self._hedge_delay)
+            if not done and self.hedge.allows(self._hedge_runs, self._hedges):
+                slots = await spare_slots()
+                if slots is None:
+                    self.component_stats.counter("hedges_skipped").add()
+                else:
+                    hedge_slots = slots
+                    self._hedges += 1
+                    self.component_stats.counter("hedges").add()
+                    with using_slots(slots):
+                        pending.add(start())
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
                 )
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.component_stats.counter("hedge_wins").add()
+                        return task.result()
+            # every run failed, raise the error of the primary run
+            return primary.result()
+        finally:
+            for task in pending:
+                scopes[task].discarded = True
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+            for slot in hedge_slots:
+                slot.release()
+            for task in scopes:
+                # mark the errors of losing runs as retrieved
+                if not task.cancelled():
+                    task.exception()
+
+    async def _attempt(self, scope: RunScope, *args, **kwargs):
+        """Runs the stage inside a run scope"""
+        use_run_scope(scope)
+        return await self._run_stage(*args, **kwargs)
+
+    async def _run_stage(self, *args, **kwargs):
+        """Runs the stage, offloaded to a thread and with a timeout if configured"""
+        try:
+            run = self._measured_run(*args, **kwargs)
+            if self.offload:
+                run = to_thread(asyncio.run, run)
+            if self.timeout is not None and self.timeout > 0:
+                result = await asyncio.wait_for(run, timeout=self.timeout)
             else:
-                result = await super().run(*args, **kwargs)
+                result = await run
             return result
         except Exception:
             raise
@@ -2,13 +2,15 @@
    Defines stage group which allows grouping stages and sepecifying execution style
 """
 
-from typing import List
+from typing import Any, Dict, List, Optional
 
 from pydantic import Field
 
 from dynapipeline.execution.base import CycleStrategy, ExecutionStrategy
+from dynapipeline.execution.pools import ResourcePool, use_pool
 from dynapipeline.pipelines.component import PipelineComponent
 from dynapipeline.pipelines.stage import Stage
+from dynapipeline.tracing.tracer import trace_span
 
 
 class StageGroup(PipelineComponent):
@@ -24,10 +26,35 @@ class StageGroup(PipelineComponent):
     execution_strategy: ExecutionStrategy = Field(
         ..., description="Strategy to determine how each stage is executed"
     )
+    pool: Optional[ResourcePool] = Field(
+        default=None,
+        description="Resource pool bounding the stages running at once and "
+        "providing the threads or processes of the group",
+    )
 
     async def execute(self, *args, **kwargs):
         """Executes the stage group using the provided cycle strategy and execution strategy"""
         results = await self.cycle_strategy.run(
-            self.execution_strategy.execute, self.stages, *args, **kwargs
+            self.execute_cycle, self.stages, *args, **kwargs
         )
         return results
+
+    async def execute_cycle(self, stages: List[Stage], *args, **kwargs):
+        """Executes one cycle of the stages and counts it"""
+        self.component_stats.counter("cycles").add(1)
+        with trace_span("cycle", kind="cycle"), use_pool(self.pool):
+            return await self.execution_strategy.execute(stages, *args, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns statistics of the group together with the statistics of its stages"""
+        summary = super().stats()
+        summary["stages"] = {stage.name: stage.stats() for stage in self.stages}
+        return summary
+
+    def __getstate__(self):
+        """
+        Pickles the group without its pool, the bulkhead of the pool stays in
+        this process and copies run in worker processes without one
+        """
+        state = super().__getstate__()
+        return {**state, "__dict__": {**state["__dict__"], "pool": None}}
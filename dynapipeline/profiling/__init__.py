@@ -0,0 +1,18 @@
+"""
+This module provides on-demand profiling of pipeline components"""
+
+from dynapipeline.profiling.handler import ProfilerHandler, attach_profiler
+from dynapipeline.profiling.memory import MemoryProfilerHandler, attach_memory_profiler
+from dynapipeline.profiling.sampler import StackSampler
+from dynapipeline.profiling.stall_monitor import LoopStallMonitor
+from dynapipeline.utils.profiler_modes import ProfilerMode
+
+__all__ = [
+    "ProfilerHandler",
+    "ProfilerMode",
+    "StackSampler",
+    "LoopStallMonitor",
+    "MemoryProfilerHandler",
+    "attach_profiler",
+    "attach_memory_profiler",
+]
@@ -0,0 +1,53 @@
+"""
+    Contains helpers producing collapsed stack files for flamegraph tools
+"""
+import os
+import pstats
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Iterable, Mapping, Optional, Tuple
+
+
+def frame_label(code: CodeType) -> str:
+    """Returns the label of a frame in a collapsed stack"""
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+def collapse_frame(frame: Optional[FrameType]) -> Tuple[str, Tuple[CodeType, ...]]:
+    """Returns the collapsed stack of a frame, root first, and the code objects on it"""
+    codes = []
+    while frame is not None:
+        codes.append(frame.f_code)
+        frame = frame.f_back
+    codes.reverse()
+    return ";".join(frame_label(code) for code in codes), tuple(codes)
+
+
+def pstats_to_collapsed(stats: pstats.Stats) -> Counter:
+    """
+    Converts cProfile statistics to collapsed caller;callee stacks
+    cProfile only keeps caller/callee pairs so the stacks are two frames deep,
+    weights are the own time of the callee in microseconds
+    """
+    stacks: Counter = Counter()
+    for (filename, line, name), entry in stats.stats.items():  # type: ignore[attr-defined]
+        own_time, callers = entry[2], entry[4]
+        label = f"{name} ({os.path.basename(filename)}:{line})"
+        if not callers:
+            stacks[label] += int(own_time * 1e6)
+            continue
+        for (caller_file, caller_line, caller_name), caller_entry in callers.items():
+            caller = f"{caller_name} ({os.path.basename(caller_file)}:{caller_line})"
+            stacks[f"{caller};{label}"] += int(caller_entry[2] * 1e6)
+    return stacks
+
+
+def write_collapsed(stacks: Mapping[str, int], path: str) -> None:
+    """Writes stacks as 'frame;frame;frame count' lines"""
+    lines: Iterable[str] = (
+        f"{stack} {count}\n" for stack, count in sorted(stacks.items()) if count > 0
+    )
+    with open(path, "w", encoding="utf-8") as file:
+        file.writelines(lines)
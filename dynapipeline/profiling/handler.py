@@ -0,0 +1,173 @@
+"""
+    Contains ProfilerHandler which profiles components of a running pipeline
+"""
+import asyncio
+import cProfile
+import pstats
+import threading
+import time
+from types import CodeType
+from typing import Any, FrozenSet, List, Optional, Tuple
+
+from pydantic import Field, PrivateAttr
+
+from dynapipeline.handlers.handler import Handler
+from dynapipeline.pipelines.component import PipelineComponent
+from dynapipeline.profiling.collapsed import pstats_to_collapsed, write_collapsed
+from dynapipeline.profiling.sampler import StackSampler
+from dynapipeline.utils.handler_types import HandlerType
+from dynapipeline.utils.profiler_modes import ProfilerMode
+
+
+def _execute_codes(component: PipelineComponent) -> FrozenSet[CodeType]:
+    """Returns the code objects of execute methods of a component and its children"""
+    codes = {type(component).execute.__code__}
+    for child in getattr(component, "stage_groups", []) + getattr(
+        component, "stages", []
+    ):
+        codes |= _execute_codes(child)
+    return frozenset(codes)
+
+
+class ProfilerHandler(Handler):
+    """
+    Handler profiling the components it is attached to for a bounded duration
+    The result is written as a collapsed stack file ready for flamegraph tools
+    """
+
+    output: str = Field(..., description="Path of the collapsed stack file")
+    mode: ProfilerMode = Field(
+        default=ProfilerMode.SAMPLING, description="How the profile is collected"
+    )
+    duration: float = Field(
+        default=30.0, gt=0, description="Seconds after which profiling stops"
+    )
+    interval: float = Field(
+        default=0.005, gt=0, description="Seconds between samples in sampling mode"
+    )
+    _components: List[PipelineComponent] = PrivateAttr(default_factory=list)
+    _expires_at: float = PrivateAttr(default=0.0)
+    _sampler: Optional[StackSampler] = PrivateAttr(default=None)
+    _profiler: Optional[cProfile.Profile] = PrivateAttr(default=None)
+    _owner: Optional[Tuple[int, Any, str]] = PrivateAttr(default=None)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _active: bool = PrivateAttr(default=False)
+
+    def start(self, components: List[PipelineComponent]) -> None:
+        """Attaches the profiler to the components and starts profiling"""
+        if self._active:
+            raise RuntimeError("Profiler is already running")
+        self._active = True
+        self._components = list(components)
+        self._expires_at = time.monotonic() + self.duration
+        if self.mode == ProfilerMode.CPROFILE:
+            self._profiler = cProfile.Profile()
+        else:
+            targets = frozenset().union(*(_execute_codes(c) for c in components))
+            self._sampler = StackSampler(targets, self.interval)
+            self._sampler.start()
+        for component in self._components:
+            # register the hooks only, a full Handler would also add an around hook
+            # which makes execute run once more per around handler
+            component.handlers.register(HandlerType.BEFORE.value, [self.before])
+            component.handlers.register(HandlerType.AFTER.value, [self.after])
+            component.handlers.register(HandlerType.ON_ERROR.value, [self.on_error])
+        try:
+            asyncio.get_running_loop().call_later(self.duration, self.stop)
+        except RuntimeError:
+            # without a running loop the duration is enforced on the next run
+            pass
+
+    @staticmethod
+    def _run_owner(component: PipelineComponent) -> Tuple[int, Any, str]:
+        """Identifies the run of a component by its thread, task and component id"""
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        return threading.get_ident(), task, component.id
+
+    def before(self, component: PipelineComponent, *args, **kwargs) -> None:
+        """Starts cProfile for the run unless another run is being profiled"""
+        if time.monotonic() >= self._expires_at:
+            self.stop()
+            return
+        if self._profiler is None:
+            return
+        with self._lock:
+            if self._owner is not None or not self._active:
+                return
+            self._owner = self._run_owner(component)
+        self._profiler.enable()
+
+    def _finish_run(self, component: PipelineComponent) -> None:
+        """
+        Stops cProfile if the calling run enabled it, runs of nested
+        components in the same task leave it enabled
+        """
+        if self._profiler is None:
+            return
+        with self._lock:
+            if self._owner != self._run_owner(component):
+                return
+            self._owner = None
+        self._profiler.disable()
+
+    async def after(
+        self, component: PipelineComponent, result: Any, *args, **kwargs
+    ) -> None:
+        """Stops cProfile after the profiled run"""
+        self._finish_run(component)
+
+    def on_error(
+        self, component: PipelineComponent, error: Exception, *args, **kwargs
+    ) -> None:
+        """Stops cProfile after the profiled run failed"""
+        self._finish_run(component)
+
+    def stop(self) -> None:
+        """Detaches the profiler and writes the collapsed stacks"""
+        with self._lock:
+            if not self._active:
+                return
+            self._active = False
+        for component in self._components:
+            component.handlers.detach([self])
+        if self._sampler is not None:
+            self._sampler.stop()
+            write_collapsed(self._sampler.stacks, self.output)
+        if self._profiler is not None:
+            if self._owner is not None:
+                self._profiler.disable()
+                self._owner = None
+            try:
+                stats = pstats.Stats(self._profiler)
+            except TypeError:
+                # pstats refuses profilers that never ran
+                write_collapsed({}, self.output)
+                return
+            stats.dump_stats(f"{self.output}.prof")
+            write_collapsed(pstats_to_collapsed(stats), self.output)
+
+    @property
+    def active(self) -> bool:
+        """Returns True while the profiler is attached"""
+        return self._active
+
+
+def attach_profiler(
+    components: List[PipelineComponent],
+    output: str,
+    mode: ProfilerMode = ProfilerMode.SAMPLING,
+    duration: float = 30.0,
+    interval: float = 0.005,
+) -> ProfilerHandler:
+    """
+    Starts profiling stages or groups of a running pipeline and returns the handler
+    Profiling stops after duration seconds or when handler.stop() is called
+    """
+    handler = ProfilerHandler(
+        output=output, mode=mode, duration=duration, interval=interval
+    )
+    handler.start(components)
+    return handler
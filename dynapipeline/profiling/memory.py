@@ -0,0 +1,205 @@
+"""
+    Contains MemoryProfilerHandler which attributes allocations to stages with tracemalloc
+"""
+import asyncio
+import threading
+import tracemalloc
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from pydantic import Field, PrivateAttr
+
+from dynapipeline.handlers.handler import Handler
+from dynapipeline.pipelines.component import PipelineComponent
+from dynapipeline.utils.handler_types import HandlerType
+
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, __file__),
+)
+
+
+class MemoryStats:
+    """
+    Allocation deltas of the sampled runs of a single component
+    """
+
+    __slots__ = ("name", "sampled_runs", "total_delta", "recent", "sites")
+
+    def __init__(self, name: str, window: int):
+        self.name = name
+        self.sampled_runs = 0
+        self.total_delta = 0
+        self.recent: Deque[int] = deque(maxlen=window)
+        self.sites: Counter = Counter()
+
+    def record(self, delta: int, sites: Dict[str, int]) -> None:
+        """Adds the allocation delta of a sampled run"""
+        self.sampled_runs += 1
+        self.total_delta += delta
+        self.recent.append(delta)
+        self.sites.update(sites)
+
+    def summary(self, top: int) -> Dict[str, Any]:
+        """Returns the deltas in bytes and the top allocation sites"""
+        return {
+            "name": self.name,
+            "sampled_runs": self.sampled_runs,
+            "mean_delta": self.total_delta / self.sampled_runs
+            if self.sampled_runs
+            else 0,
+            "retained": sum(self.recent),
+            "top_sites": [
+                (site, size) for site, size in self.sites.most_common(top) if size > 0
+            ],
+        }
+
+
+class MemoryProfilerHandler(Handler):
+    """
+    Opt-in handler snapshotting tracemalloc around every `sample_every`-th run
+    of the components it is attached to
+
+    tracemalloc sees the allocations of the whole process, so only one sampled
+    run is in flight at a time and results are most precise for stages that do
+    not run concurrently with others
+    """
+
+    sample_every: int = Field(
+        default=10, gt=0, description="Snapshot one out of this many runs"
+    )
+    window: int = Field(
+        default=10,
+        gt=0,
+        description="Number of sampled runs summed up as retained growth",
+    )
+    top: int = Field(
+        default=10, gt=0, description="Number of allocation sites reported"
+    )
+    frames: int = Field(
+        default=1, gt=0, description="Traceback depth recorded by tracemalloc"
+    )
+    _components: List[PipelineComponent] = PrivateAttr(default_factory=list)
+    _stats: Dict[str, MemoryStats] = PrivateAttr(default_factory=dict)
+    _runs: Dict[str, int] = PrivateAttr(default_factory=dict)
+    _pending: Optional[Tuple[Any, int, tracemalloc.Snapshot]] = PrivateAttr(
+        default=None
+    )
+    _baseline: Optional[tracemalloc.Snapshot] = PrivateAttr(default=None)
+    _started_tracing: bool = PrivateAttr(default=False)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def start(self, components: List[PipelineComponent]) -> None:
+        """Starts tracemalloc if needed and attaches the handler to the components"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        self._baseline = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+        self._components = list(components)
+        for component in self._components:
+            # register the hooks only, a full Handler would also add an around hook
+            # which makes execute run once more per around handler
+            component.handlers.register(HandlerType.BEFORE.value, [self.before])
+            component.handlers.register(HandlerType.AFTER.value, [self.after])
+            component.handlers.register(HandlerType.ON_ERROR.value, [self.on_error])
+
+    def stop(self) -> None:
+        """Detaches the handler and stops tracemalloc if the handler started it"""
+        for component in self._components:
+            component.handlers.detach([self])
+        self._components = []
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @staticmethod
+    def _run_owner(component: PipelineComponent) -> Tuple[int, Any, str]:
+        """Identifies the run of a component by its thread, task and component id"""
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        return threading.get_ident(), task, component.id
+
+    def before(self, component: PipelineComponent, *args, **kwargs) -> None:
+        """Snapshots the allocations before a sampled run"""
+        runs = self._runs.get(component.id, 0) + 1
+        self._runs[component.id] = runs
+        if runs % self.sample_every or not tracemalloc.is_tracing():
+            return
+        with self._lock:
+            if self._pending is not None:
+                return
+            self._pending = (
+                self._run_owner(component),
+                tracemalloc.get_traced_memory()[0],
+                tracemalloc.take_snapshot(),
+            )
+
+    def _finish_run(self, component: PipelineComponent) -> None:
+        """
+        Records the allocation delta of the sampled run, runs of nested
+        components in the same task leave the sample open
+        """
+        with self._lock:
+            pending = self._pending
+            if pending is None or pending[0] != self._run_owner(component):
+                return
+            self._pending = None
+        _, start_size, before = pending
+        delta = tracemalloc.get_traced_memory()[0] - start_size
+        after = tracemalloc.take_snapshot()
+        sites = {
+            f"{diff.traceback[0].filename}:{diff.traceback[0].lineno}": diff.size_diff
+            for diff in after.filter_traces(_IGNORED).compare_to(
+                before.filter_traces(_IGNORED), "lineno"
+            )
+            if diff.size_diff
+        }
+        stats = self._stats.get(component.id)
+        if stats is None:
+            stats = self._stats[component.id] = MemoryStats(component.name, self.window)
+        stats.record(delta, sites)
+
+    async def after(
+        self, component: PipelineComponent, result: Any, *args, **kwargs
+    ) -> None:
+        """Records the sampled run"""
+        self._finish_run(component)
+
+    def on_error(
+        self, component: PipelineComponent, error: Exception, *args, **kwargs
+    ) -> None:
+        """Records the sampled run that failed"""
+        self._finish_run(component)
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns allocation statistics per component id, sizes are in bytes
+        Every summary carries the name of its component
+        """
+        return {
+            component_id: stats.summary(self.top)
+            for component_id, stats in self._stats.items()
+        }
+
+    def growth(self) -> List[Tuple[str, int]]:
+        """Returns the allocation sites that grew the most since the handler started"""
+        if self._baseline is None or not tracemalloc.is_tracing():
+            return []
+        current = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+        return [
+            (f"{diff.traceback[0].filename}:{diff.traceback[0].lineno}", diff.size_diff)
+            for diff in current.compare_to(self._baseline, "lineno")[: self.top]
+            if diff.size_diff > 0
+        ]
+
+
+def attach_memory_profiler(
+    components: List[PipelineComponent], sample_every: int = 10, **kwargs
+) -> MemoryProfilerHandler:
+    """Starts memory instrumentation of stages or groups and returns the handler"""
+    handler = MemoryProfilerHandler(sample_every=sample_every, **kwargs)
+    handler.start(components)
+    return handler
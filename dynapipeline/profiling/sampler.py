@@ -0,0 +1,51 @@
+"""
+    Contains StackSampler which periodically samples the stacks of all threads
+"""
+import sys
+import threading
+from collections import Counter
+from types import CodeType
+from typing import FrozenSet
+
+from dynapipeline.profiling.collapsed import collapse_frame
+
+
+class StackSampler:
+    """
+    Samples the stacks of all threads from a background thread and keeps the
+    ones that pass through one of the target code objects
+    """
+
+    def __init__(self, targets: FrozenSet[CodeType], interval: float = 0.005):
+        self.targets = targets
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._sample_loop, name="dynapipeline-sampler", daemon=True
+        )
+
+    def start(self) -> None:
+        """Starts sampling"""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops sampling and waits for the sampler thread"""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def sample(self) -> None:
+        """Takes a single sample of all threads"""
+        own_ident = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            stack, codes = collapse_frame(frame)
+            if not self.targets.isdisjoint(codes):
+                self.stacks[stack] += 1
+
+    def _sample_loop(self) -> None:
+        """Samples until stopped"""
+        while not self._stop.wait(self.interval):
+            self.sample()
@@ -0,0 +1,182 @@
+"""
+    Contains LoopStallMonitor which detects stages blocking the event loop
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+from types import FrameType
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Optional, Set
+
+from dynapipeline.metrics.histogram import LatencyHistogram
+
+if TYPE_CHECKING:
+    from dynapipeline.pipelines.pipeline import Pipeline
+    from dynapipeline.pipelines.stage import Stage
+
+logger = logging.getLogger(__name__)
+
+
+class LoopStallMonitor:
+    """
+    Measures event loop lag with a heartbeat task and attributes every stall to
+    the stage whose execute method was on the loop thread's stack during it
+
+    Stages marked `offload_safe` that stall the loop `offload_after` times are
+    switched to run in a worker thread on their following runs, other stages
+    only get a suggestion logged
+    """
+
+    def __init__(
+        self,
+        pipeline: "Pipeline",
+        threshold: float = 0.1,
+        interval: float = 0.02,
+        offload_after: Optional[int] = None,
+    ):
+        self.pipeline = pipeline
+        self.threshold = threshold
+        self.interval = interval
+        self.offload_after = offload_after
+        self.loop_lag = LatencyHistogram()
+        self.stalls: Dict[str, LatencyHistogram] = {}
+        self.unattributed = LatencyHistogram()
+        self._stages: Dict[str, "Stage"] = {}
+        self._suggested: Set[str] = set()
+        self._codes: FrozenSet[Any] = frozenset()
+        self._loop_thread: Optional[int] = None
+        self._last_beat = 0.0
+        self._suspect: Optional["Stage"] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """Starts monitoring the running event loop"""
+        if self._heartbeat_task is not None:
+            raise RuntimeError("Monitor is already running")
+        self._stages = {
+            stage.id: stage
+            for group in self.pipeline.stage_groups
+            for stage in group.stages
+        }
+        self._codes = frozenset(
+            type(stage).execute.__code__ for stage in self._stages.values()
+        )
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._stop.clear()
+        self._heartbeat_task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="dynapipeline-stall-monitor", daemon=True
+        )
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        """Stops monitoring"""
+        self._stop.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+    @property
+    def lag(self) -> float:
+        """Returns how many seconds the next heartbeat is overdue"""
+        if self._heartbeat_task is None:
+            return 0.0
+        return max(time.perf_counter() - self._last_beat - self.interval, 0.0)
+
+    async def _heartbeat(self) -> None:
+        """Wakes up every interval and records how late it woke up"""
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag = max(now - self._last_beat - self.interval, 0.0)
+            self._last_beat = now
+            self.loop_lag.record(int(lag * 1e9))
+            if lag > self.threshold:
+                suspect, self._suspect = self._suspect, None
+                self._record_stall(suspect, lag)
+
+    def _find_stage(self, frame: Optional[FrameType]) -> Optional["Stage"]:
+        """Returns the innermost monitored stage executing on the given stack"""
+        while frame is not None:
+            if frame.f_code in self._codes:
+                stage = frame.f_locals.get("self")
+                if stage is not None and stage.id in self._stages:
+                    return stage
+            frame = frame.f_back
+        return None
+
+    def _watch(self) -> None:
+        """Samples the loop thread while the heartbeat is overdue"""
+        period = min(self.interval, self.threshold) / 2
+        while not self._stop.wait(period):
+            if self.lag <= self.threshold or self._loop_thread is None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            stage = self._find_stage(frame)
+            if stage is not None:
+                self._suspect = stage
+
+    def _record_stall(self, stage: Optional["Stage"], lag: float) -> None:
+        """Records a stall and offloads repeat offenders"""
+        if stage is None:
+            self.unattributed.record(int(lag * 1e9))
+            return
+        histogram = self.stalls.get(stage.id)
+        if histogram is None:
+            histogram = self.stalls[stage.id] = LatencyHistogram()
+            logger.warning(
+                "Stage '%s' blocked the event loop for %.3fs, consider moving its "
+                "synchronous work to a thread (Stage.offload or "
+                "MultithreadExecutionStrategy)",
+                stage.name,
+                lag,
+            )
+        histogram.record(int(lag * 1e9))
+        stage.component_stats.counter("loop_stalls").add(1)
+        if (
+            self.offload_after is None
+            or stage.offload
+            or histogram.count < self.offload_after
+        ):
+            return
+        if stage.offload_safe:
+            logger.warning("Offloading stage '%s' to a worker thread", stage.name)
+            stage.offload = True
+        elif stage.id not in self._suggested:
+            # a worker thread's loop cannot use locks of the pipeline's loop
+            self._suggested.add(stage.id)
+            logger.warning(
+                "Stage '%s' keeps blocking the event loop but is not offloaded, "
+                "set offload_safe=True if it uses no primitives bound to the loop",
+                stage.name,
+            )
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Returns stall statistics per stage id, durations are in seconds"""
+        report = {}
+        for stage_id, histogram in self.stalls.items():
+            stage = self._stages[stage_id]
+            report[stage_id] = {
+                "name": stage.name,
+                "stalls": histogram.count,
+                "p50": histogram.percentile(50) / 1e9,
+                "p99": histogram.percentile(99) / 1e9,
+                "max": histogram.max / 1e9,
+                "offloaded": stage.offload,
+            }
+        return report
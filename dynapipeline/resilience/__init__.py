@@ -0,0 +1,14 @@
+"""
+This module provides policies that keep pipelines running when stages fail or slow down"""
+
+from dynapipeline.resilience.admission import AdmissionController
+from dynapipeline.resilience.breaker import CircuitBreaker
+from dynapipeline.resilience.hedge import HedgePolicy
+from dynapipeline.resilience.retry import RetryPolicy
+
+__all__ = [
+    "RetryPolicy",
+    "HedgePolicy",
+    "CircuitBreaker",
+    "AdmissionController",
+]
@@ -0,0 +1,203 @@
+"""
+    Contains AdmissionController which sheds work at the ingress of a pipeline under overload
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from dynapipeline.exceptions.resilience import AdmissionRejectedError
+from dynapipeline.utils.shed_reasons import ShedReason
+
+if TYPE_CHECKING:
+    from dynapipeline.profiling.stall_monitor import LoopStallMonitor
+
+_EMPTY = object()
+
+
+class AdmissionController:
+    """
+    Bounded priority queue in front of the stages consuming a pipeline's input
+
+    Producers `submit` items, stages `get` them and call `done` once an item is
+    processed. Items are served highest priority first and at most
+    `max_in_flight` items are processed at once. Submitting is rejected while
+    the event loop lag reported by `lag_monitor` exceeds `max_lag`. A queue
+    holding `max_queue` items sheds its lowest priority item to admit an item
+    of higher priority and rejects the item otherwise. Waiting time is
+    controlled like CoDel: once every item dequeued during `interval` seconds
+    waited longer than `target_delay`, the queue counts as overloaded. While it
+    is overloaded, items that waited longer than the target are shed when they
+    are dequeued. Items with at least `critical_priority` are only shed when
+    the queue is full
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 100,
+        max_queue: int = 1000,
+        target_delay: float = 0.05,
+        interval: float = 0.5,
+        lag_monitor: Optional["LoopStallMonitor"] = None,
+        max_lag: float = 0.1,
+        critical_priority: Optional[int] = None,
+        on_shed: Optional[Callable[[Any, ShedReason], None]] = None,
+    ):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be a positive integer")
+        if max_queue < 1:
+            raise ValueError("max_queue must be a positive integer")
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.target_delay = target_delay
+        self.interval = interval
+        self.lag_monitor = lag_monitor
+        self.max_lag = max_lag
+        self.critical_priority = critical_priority
+        self.on_shed = on_shed
+        self.admitted = 0
+        self.shed: Dict[ShedReason, int] = {reason: 0 for reason in ShedReason}
+        self._queue: List[Tuple[int, int, float, Any]] = []
+        self._order = itertools.count()
+        self._in_flight = 0
+        self._above_since: Optional[float] = None
+        self._getters: Deque[asyncio.Future] = deque()
+
+    @property
+    def in_flight(self) -> int:
+        """Returns the number of items taken by `get` and not yet done"""
+        return self._in_flight
+
+    def qsize(self) -> int:
+        """Returns the number of queued items"""
+        return len(self._queue)
+
+    def empty(self) -> bool:
+        """Returns True if no item is queued"""
+        return not self._queue
+
+    @property
+    def overloaded(self) -> bool:
+        """Returns True while the queue delay stays above the target"""
+        return (
+            self._above_since is not None
+            and time.monotonic() - self._above_since >= self.interval
+        )
+
+    def _critical(self, priority: int) -> bool:
+        """Returns True if items of priority are exempt from load shedding"""
+        return self.critical_priority is not None and priority >= self.critical_priority
+
+    def submit(self, item: Any, priority: int = 0) -> None:
+        """Queues item or raises AdmissionRejectedError if the pipeline is overloaded"""
+        self.put_nowait(item, priority)
+
+    def put_nowait(self, item: Any, priority: int = 0) -> None:
+        """Queues item, the queue interface used by QueueTrigger"""
+        if (
+            self.lag_monitor is not None
+            and self.lag_monitor.lag > self.max_lag
+            and not self._critical(priority)
+        ):
+            self._count_shed(ShedReason.LOOP_LAG)
+            raise AdmissionRejectedError(ShedReason.LOOP_LAG.value)
+        if len(self._queue) >= self.max_queue:
+            # the heap keeps the highest priority first, the lowest is searched
+            lowest = max(self._queue)
+            if -lowest[0] >= priority:
+                self._count_shed(ShedReason.QUEUE_FULL)
+                raise AdmissionRejectedError(ShedReason.QUEUE_FULL.value)
+            self._queue.remove(lowest)
+            heapq.heapify(self._queue)
+            self._shed(lowest[3], ShedReason.QUEUE_FULL)
+        heapq.heappush(
+            self._queue, (-priority, next(self._order), time.monotonic(), item)
+        )
+        self.admitted += 1
+        self._wake()
+
+    def _take(self) -> Any:
+        """Returns the next item to process, or _EMPTY if none can be taken now"""
+        while self._queue and self._in_flight < self.max_in_flight:
+            negated_priority, _, enqueued, item = heapq.heappop(self._queue)
+            now = time.monotonic()
+            delay = now - enqueued
+            if delay < self.target_delay or not self._queue:
+                self._above_since = None
+            elif self._above_since is None:
+                self._above_since = now
+            if (
+                delay > self.target_delay
+                and self.overloaded
+                and not self._critical(-negated_priority)
+            ):
+                self._shed(item, ShedReason.QUEUE_DELAY)
+                continue
+            self._in_flight += 1
+            return item
+        return _EMPTY
+
+    async def get(self) -> Any:
+        """Waits for an item and an in-flight slot, call `done` after processing it"""
+        loop = asyncio.get_running_loop()
+        while True:
+            item = self._take()
+            if item is not _EMPTY:
+                if self._queue and self._in_flight < self.max_in_flight:
+                    self._wake()
+                return item
+            getter = loop.create_future()
+            self._getters.append(getter)
+            try:
+                await getter
+            except asyncio.CancelledError:
+                if getter.done() and not getter.cancelled():
+                    # pass the wake up on to another getter
+                    self._wake()
+                else:
+                    self._getters.remove(getter)
+                raise
+
+    def get_nowait(self) -> Any:
+        """Returns an item if one can be taken now, raises asyncio.QueueEmpty otherwise"""
+        item = self._take()
+        if item is _EMPTY:
+            raise asyncio.QueueEmpty()
+        return item
+
+    def done(self) -> None:
+        """Marks an item taken by `get` as processed"""
+        if self._in_flight <= 0:
+            raise ValueError("done() called more times than items were taken")
+        self._in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        """Wakes up one waiting getter"""
+        while self._getters:
+            getter = self._getters.popleft()
+            if not getter.done():
+                getter.set_result(None)
+                return
+
+    def _count_shed(self, reason: ShedReason) -> None:
+        """Counts a rejected or dropped item"""
+        self.shed[reason] += 1
+
+    def _shed(self, item: Any, reason: ShedReason) -> None:
+        """Drops a queued item"""
+        self._count_shed(reason)
+        if self.on_shed is not None:
+            self.on_shed(item, reason)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the admitted and shed counts and the current load"""
+        return {
+            "admitted": self.admitted,
+            "shed": {reason.value: count for reason, count in self.shed.items()},
+            "queued": len(self._queue),
+            "in_flight": self._in_flight,
+            "overloaded": self.overloaded,
+        }
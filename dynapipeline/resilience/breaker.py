@@ -0,0 +1,155 @@
+"""
+    Contains CircuitBreaker which stops running a stage that keeps failing
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Optional, Tuple, Type
+
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+
+from dynapipeline.utils.circuit_states import CircuitState
+
+
+class CircuitBreaker(BaseModel):
+    """
+    Circuit breaker of a stage, a breaker may be shared by stages calling the
+    same dependency
+
+    The breaker opens when at least `failure_rate` of the last `window_size`
+    runs failed or at least `slow_rate` of them took `slow_duration` seconds or
+    longer, once `min_runs` runs were recorded. An open breaker rejects runs
+    for `open_duration` seconds and then lets `half_open_runs` trial runs
+    through. The breaker closes if all of them succeed in time and opens again
+    otherwise. Rejected runs raise CircuitOpenError, or return `fallback` when
+    one is given
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    failure_rate: float = Field(
+        default=0.5, gt=0, le=1, description="Fraction of failed runs that opens"
+    )
+    slow_duration: Optional[float] = Field(
+        default=None, gt=0, description="Seconds from which a run counts as slow"
+    )
+    slow_rate: float = Field(
+        default=1.0, gt=0, le=1, description="Fraction of slow runs that opens"
+    )
+    window_size: int = Field(
+        default=20, ge=1, description="Number of recent runs the rates are computed on"
+    )
+    min_runs: int = Field(
+        default=10, ge=1, description="Runs recorded before the breaker can open"
+    )
+    open_duration: float = Field(
+        default=30.0, ge=0, description="Seconds an open breaker rejects runs"
+    )
+    half_open_runs: int = Field(
+        default=1, ge=1, description="Successful trial runs needed to close"
+    )
+    failure_on: Tuple[Type[BaseException], ...] = Field(
+        default=(Exception,), description="Exception classes counted as failures"
+    )
+    fallback: Any = Field(
+        default=None, description="Result of rejected runs instead of raising"
+    )
+    _state: CircuitState = PrivateAttr(default=CircuitState.CLOSED)
+    _generation: int = PrivateAttr(default=0)
+    _window: Deque[Tuple[bool, bool]] = PrivateAttr()
+    _opened_at: float = PrivateAttr(default=0.0)
+    _trials: int = PrivateAttr(default=0)
+    _successes: int = PrivateAttr(default=0)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, __context: Any) -> None:
+        """Creates the window of recent runs once the fields are validated"""
+        self._window = deque(maxlen=self.window_size)
+
+    @property
+    def state(self) -> CircuitState:
+        """Returns the current state of the breaker"""
+        return self._state
+
+    @property
+    def has_fallback(self) -> bool:
+        """Returns True if rejected runs return the fallback result"""
+        return "fallback" in self.model_fields_set
+
+    def acquire(self) -> Optional[int]:
+        """
+        Returns a permit for a run, or None if the run is rejected
+        The permit is passed to `record` or `release` when the run finishes
+        """
+        with self._lock:
+            if self._state is CircuitState.OPEN:
+                if time.monotonic() - self._opened_at < self.open_duration:
+                    return None
+                self._transition(CircuitState.HALF_OPEN)
+            if self._state is CircuitState.HALF_OPEN:
+                if self._trials + self._successes >= self.half_open_runs:
+                    return None
+                self._trials += 1
+            return self._generation
+
+    def record(self, permit: int, duration: float, error: Optional[BaseException]):
+        """Records the outcome of a run, runs admitted before a state change are ignored"""
+        failed = error is not None and isinstance(error, self.failure_on)
+        slow = self.slow_duration is not None and duration >= self.slow_duration
+        with self._lock:
+            if permit != self._generation:
+                return
+            if self._state is CircuitState.HALF_OPEN:
+                self._trials -= 1
+                if failed or slow:
+                    self._open()
+                else:
+                    self._successes += 1
+                    if self._successes >= self.half_open_runs:
+                        self._transition(CircuitState.CLOSED)
+                return
+            self._window.append((failed, slow))
+            if len(self._window) < self.min_runs:
+                return
+            runs = len(self._window)
+            failures = sum(1 for outcome in self._window if outcome[0])
+            slow_runs = sum(1 for outcome in self._window if outcome[1])
+            if (
+                failures >= self.failure_rate * runs
+                or slow_runs >= self.slow_rate * runs
+            ):
+                self._open()
+
+    def release(self, permit: int):
+        """Gives back the permit of a run that was cancelled before it finished"""
+        with self._lock:
+            if permit == self._generation and self._state is CircuitState.HALF_OPEN:
+                self._trials -= 1
+
+    def reset(self):
+        """Closes the breaker and forgets the recorded runs"""
+        with self._lock:
+            self._transition(CircuitState.CLOSED)
+
+    def _open(self):
+        """Opens the breaker, the lock must be held"""
+        self._opened_at = time.monotonic()
+        self._transition(CircuitState.OPEN)
+
+    def _transition(self, state: CircuitState):
+        """Moves to state and invalidates the permits of running runs"""
+        self._state = state
+        self._generation += 1
+        self._window.clear()
+        self._trials = self._successes = 0
+
+    def __getstate__(self):
+        """Pickles the breaker without its lock"""
+        state = super().__getstate__()
+        private = dict(state["__pydantic_private__"])
+        del private["_lock"]
+        return {**state, "__pydantic_private__": private}
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._lock = threading.Lock()
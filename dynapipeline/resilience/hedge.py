@@ -0,0 +1,57 @@
+"""
+    Contains HedgePolicy which decides when a slow stage run is duplicated
+"""
+from typing import Iterable, Optional
+
+from pydantic import BaseModel, Field
+
+from dynapipeline.metrics.histogram import LatencyHistogram
+from dynapipeline.utils.run_record import RunRecord
+
+
+class HedgePolicy(BaseModel):
+    """
+    Hedging policy of an idempotent stage
+
+    A run that has not finished after the `percentile` latency of the stage is
+    duplicated and the first successful result wins, the other run is
+    cancelled. The threshold follows the latencies of the successful runs in
+    the run history of the stage, so it adapts when the latency shifts. It is
+    refreshed every `refresh_every` runs once `min_samples` runs are in the
+    history, and at most `max_rate` of the runs are hedged
+    """
+
+    percentile: float = Field(
+        default=95, gt=0, lt=100, description="Latency percentile used as threshold"
+    )
+    min_samples: int = Field(
+        default=20,
+        ge=1,
+        description="Successful runs in the run history before hedging starts",
+    )
+    max_rate: float = Field(
+        default=0.1, ge=0, le=1, description="Maximum fraction of runs that are hedged"
+    )
+    min_delay: float = Field(
+        default=0.0, ge=0, description="Lower bound of the threshold in seconds"
+    )
+    refresh_every: int = Field(
+        default=16, ge=1, description="Runs between recomputations of the threshold"
+    )
+
+    def threshold(self, history: Iterable[RunRecord]) -> Optional[float]:
+        """
+        Returns the hedging threshold in seconds for the recent runs in history,
+        None while samples are missing
+        """
+        latency = LatencyHistogram()
+        for record in history:
+            if not record.failed:
+                latency.record(record.duration_ns)
+        if latency.count < self.min_samples:
+            return None
+        return max(self.min_delay, latency.percentile(self.percentile) / 1e9)
+
+    def allows(self, runs: int, hedges: int) -> bool:
+        """Returns True if one more hedge keeps the hedge rate within max_rate"""
+        return hedges + 1 <= self.max_rate * runs
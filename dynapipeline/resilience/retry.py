@@ -0,0 +1,43 @@
+"""
+    Contains RetryPolicy which describes how a failed stage run is retried
+"""
+import random
+from typing import Tuple, Type
+
+from pydantic import BaseModel, Field
+
+
+class RetryPolicy(BaseModel):
+    """
+    Declarative retry policy of a stage
+
+    A failed attempt is retried if its exception is an instance of one of
+    `retry_on` and fewer than `max_attempts` attempts were made. The wait before
+    attempt n + 1 is drawn uniformly from [0, min(max_delay, base_delay * multiplier ** (n - 1))]
+    (exponential backoff with full jitter)
+    """
+
+    max_attempts: int = Field(
+        default=3, ge=1, description="Maximum number of attempts including the first"
+    )
+    base_delay: float = Field(
+        default=0.1, ge=0, description="Backoff cap in seconds after the first attempt"
+    )
+    max_delay: float = Field(
+        default=10.0, ge=0, description="Upper bound of the backoff in seconds"
+    )
+    multiplier: float = Field(
+        default=2.0, ge=1, description="Growth factor of the backoff cap per attempt"
+    )
+    retry_on: Tuple[Type[BaseException], ...] = Field(
+        default=(Exception,), description="Exception classes that are retried"
+    )
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        """Returns True if the attempt that raised error should be retried"""
+        return attempt < self.max_attempts and isinstance(error, self.retry_on)
+
+    def backoff(self, attempt: int) -> float:
+        """Returns the seconds to wait after the given failed attempt"""
+        cap = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        return random.uniform(0, cap)
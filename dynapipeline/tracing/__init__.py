@@ -0,0 +1,21 @@
+"""
+This module provides span tracing of pipeline, stage group and stage execution"""
+
+from dynapipeline.tracing.exporters import (
+    ChromeTraceExporter,
+    OTLPJsonExporter,
+    SpanExporter,
+)
+from dynapipeline.tracing.span import Span, SpanContext
+from dynapipeline.tracing.tracer import Tracer, current_span_context, trace_span
+
+__all__ = [
+    "Tracer",
+    "Span",
+    "SpanContext",
+    "SpanExporter",
+    "ChromeTraceExporter",
+    "OTLPJsonExporter",
+    "current_span_context",
+    "trace_span",
+]
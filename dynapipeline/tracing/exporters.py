@@ -0,0 +1,147 @@
+"""
+    Contains exporters which write finished spans to a file or a local collector
+"""
+import json
+import os
+import urllib.request
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+
+from dynapipeline.tracing.span import Span
+
+
+class SpanExporter(ABC):
+    """
+    Abstract base class for span exporters
+    """
+
+    @abstractmethod
+    def export(self, spans: List[Span]) -> None:
+        """Exports a batch of finished spans"""
+        raise NotImplementedError("Subclasses must implement the export method")
+
+
+class ChromeTraceExporter(SpanExporter):
+    """
+    Writes spans as Chrome trace events, the file opens in chrome://tracing and Perfetto
+
+    Events are appended to a JSON array, each export only writes its own spans
+    and moves the closing bracket so the file stays valid JSON
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._started = False
+
+    @staticmethod
+    def _event(span: Span) -> Dict[str, Any]:
+        """Converts a span into a complete trace event"""
+        return {
+            "name": span.name,
+            "cat": span.attributes.get("kind", "span"),
+            "ph": "X",
+            "ts": span.start_ns / 1000,
+            "dur": (span.duration_ns or 0) / 1000,
+            "pid": span.pid,
+            "tid": span.tid,
+            "args": {
+                "trace_id": span.trace_id,
+                "span_id": span.span_id,
+                "parent_id": span.parent_id,
+                "error": span.error,
+                **span.attributes,
+            },
+        }
+
+    def export(self, spans: List[Span]) -> None:
+        """Appends the spans to the trace file"""
+        if not spans:
+            return
+        events = ",\n".join(
+            json.dumps(self._event(span), default=str) for span in spans
+        )
+        if not self._started:
+            with open(self.path, "wb") as file:
+                file.write(f"[\n{events}\n]".encode())
+            self._started = True
+            return
+        with open(self.path, "r+b") as file:
+            # overwrite the closing "\n]" written by the previous export
+            file.seek(-2, os.SEEK_END)
+            file.write(f",\n{events}\n]".encode())
+
+
+class OTLPJsonExporter(SpanExporter):
+    """
+    Sends spans to an OTLP/HTTP compatible collector using the JSON encoding
+    """
+
+    def __init__(
+        self,
+        endpoint: str = "http://127.0.0.1:4318/v1/traces",
+        service_name: str = "dynapipeline",
+        timeout: float = 5.0,
+    ):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    @staticmethod
+    def _attributes(values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Converts a dictionary into OTLP attributes"""
+        return [
+            {"key": key, "value": {"stringValue": str(value)}}
+            for key, value in values.items()
+        ]
+
+    def encode(self, spans: List[Span]) -> Dict[str, Any]:
+        """Returns the OTLP JSON payload for the spans"""
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": self._attributes(
+                            {"service.name": self.service_name}
+                        )
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "dynapipeline"},
+                            "spans": [
+                                {
+                                    "traceId": span.trace_id,
+                                    "spanId": span.span_id,
+                                    "parentSpanId": span.parent_id or "",
+                                    "name": span.name,
+                                    "kind": 1,
+                                    "startTimeUnixNano": str(span.start_ns),
+                                    "endTimeUnixNano": str(span.end_ns),
+                                    "attributes": self._attributes(
+                                        {
+                                            **span.attributes,
+                                            "pid": span.pid,
+                                            "tid": span.tid,
+                                        }
+                                    ),
+                                    "status": {"code": 2, "message": span.error}
+                                    if span.error
+                                    else {"code": 1},
+                                }
+                                for span in spans
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def export(self, spans: List[Span]) -> None:
+        """Posts the spans to the collector"""
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(self.encode(spans)).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
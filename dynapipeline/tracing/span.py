@@ -0,0 +1,94 @@
+"""
+    Contains Span and SpanContext used by the tracer
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class SpanContext:
+    """
+    Identifies a span inside a trace, it is small and picklable so it can be
+    propagated into threads and worker processes
+    """
+
+    __slots__ = ("trace_id", "span_id", "sampled")
+
+    def __init__(self, trace_id: str, span_id: Optional[str], sampled: bool = True):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+    def __getstate__(self):
+        return (self.trace_id, self.span_id, self.sampled)
+
+    def __setstate__(self, state):
+        self.trace_id, self.span_id, self.sampled = state
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(trace_id={self.trace_id}, span_id={self.span_id}, "
+            f"sampled={self.sampled})"
+        )
+
+
+class Span:
+    """
+    A timed operation with a link to its parent span
+    Timestamps are wall clock nanoseconds so spans of different processes line up
+    """
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "error",
+        "pid",
+        "tid",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        span_id: str,
+        parent_id: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.attributes = attributes or {}
+        self.error: Optional[str] = None
+        self.pid = os.getpid()
+        self.tid = threading.get_ident()
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+
+    def end(self) -> None:
+        """Marks the span as finished"""
+        self.end_ns = time.time_ns()
+
+    @property
+    def duration_ns(self) -> Optional[int]:
+        """Returns the duration of a finished span in nanoseconds"""
+        return None if self.end_ns is None else self.end_ns - self.start_ns
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(name={self.name}, trace_id={self.trace_id}, "
+            f"span_id={self.span_id}, parent_id={self.parent_id}, duration_ns={self.duration_ns})"
+        )
@@ -0,0 +1,140 @@
+"""
+    Contains Tracer which records spans following the component hierarchy
+"""
+import random
+import secrets
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Iterable, Iterator, List, Optional, Tuple
+
+from dynapipeline.tracing.exporters import SpanExporter
+from dynapipeline.tracing.span import Span, SpanContext
+
+# active tracer and span of the running task, asyncio tasks copy it automatically
+# and the thread/process strategies hand it over explicitly
+_active: ContextVar[Optional[Tuple["Tracer", SpanContext]]] = ContextVar(
+    "dynapipeline_active_span", default=None
+)
+
+
+class Tracer:
+    """
+    Records spans with parent/child links
+
+    Sampling is decided once per trace when its root span starts, spans of an
+    unsampled trace are never created
+    """
+
+    def __init__(
+        self,
+        exporter: Optional[SpanExporter] = None,
+        sample_rate: float = 1.0,
+        max_buffered: int = 100_000,
+    ):
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.max_buffered = max_buffered
+        self._finished: Deque[Span] = deque(maxlen=max_buffered)
+
+    def _sample(self) -> bool:
+        """Decides whether a new trace is recorded"""
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        """
+        Records a span around the block, as a child of the active span if any
+        Yields None when the trace is not sampled
+        """
+        active = _active.get()
+        parent = active[1] if active is not None else None
+        if parent is None:
+            if not self._sample():
+                token = _active.set(
+                    (self, SpanContext(secrets.token_hex(16), None, False))
+                )
+                try:
+                    yield None
+                finally:
+                    _active.reset(token)
+                return
+            trace_id, parent_id = secrets.token_hex(16), None
+        elif not parent.sampled:
+            yield None
+            return
+        else:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+
+        span = Span(name, trace_id, secrets.token_hex(8), parent_id, attributes)
+        token = _active.set((self, SpanContext(trace_id, span.span_id)))
+        try:
+            yield span
+        except BaseException as error:
+            span.error = type(error).__name__
+            raise
+        finally:
+            _active.reset(token)
+            span.end()
+            self._finished.append(span)
+
+    def collect(self, spans: Iterable[Span]) -> None:
+        """Adds spans recorded elsewhere, e.g. in a worker process"""
+        self._finished.extend(spans)
+
+    def drain(self) -> List[Span]:
+        """Removes and returns the finished spans"""
+        spans = []
+        while self._finished:
+            spans.append(self._finished.popleft())
+        return spans
+
+    def flush(self) -> None:
+        """Hands the finished spans to the exporter"""
+        spans = self.drain()
+        if self.exporter is not None and spans:
+            self.exporter.export(spans)
+
+    def __getstate__(self):
+        """Copies only the configuration, exporters and buffers stay in this process"""
+        return {"sample_rate": self.sample_rate, "max_buffered": self.max_buffered}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+
+def current_span_context() -> Optional[SpanContext]:
+    """Returns the context of the active span"""
+    active = _active.get()
+    return None if active is None else active[1]
+
+
+@contextmanager
+def trace_span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Records a child span of the active span with the active tracer
+    Does nothing when no sampled trace is active
+    """
+    active = _active.get()
+    if active is None or not active[1].sampled:
+        yield None
+        return
+    with active[0].span(name, **attributes) as span:
+        yield span
+
+
+@contextmanager
+def use_span_context(
+    tracer: "Tracer", context: Optional[SpanContext]
+) -> Iterator[None]:
+    """Makes a propagated span context the parent of spans started in the block"""
+    if context is None:
+        yield
+        return
+    token = _active.set((tracer, context))
+    try:
+        yield
+    finally:
+        _active.reset(token)
@@ -0,0 +1,14 @@
+"""
+    Defines enumeration for circuit breaker states
+"""
+from enum import Enum
+
+
+class CircuitState(str, Enum):
+    """
+    Enum representing the states of a circuit breaker
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
@@ -0,0 +1,74 @@
+"""
+    Contains the per-cycle state shared by the components of overlapping cycles
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Tuple
+
+
+@dataclass
+class CycleState:
+    """
+    Number of a cycle and a dict private to it, stages of overlapping cycles
+    use `data` instead of the pipeline context for values of a single cycle
+    """
+
+    number: int
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+class CycleGates:
+    """Lets every component run the overlapping cycles in order, one at a time"""
+
+    def __init__(self, components: Iterable[Any]):
+        self.loop = asyncio.get_running_loop()
+        self._next = {component.id: 0 for component in components}
+        self._changed = asyncio.Condition()
+
+    def __contains__(self, component: Any) -> bool:
+        return component.id in self._next
+
+    @asynccontextmanager
+    async def turn(self, component: Any, number: int) -> AsyncIterator[None]:
+        """Waits until the component finished all earlier cycles"""
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._next[component.id] == number)
+        try:
+            yield
+        finally:
+            async with self._changed:
+                self._next[component.id] = number + 1
+                self._changed.notify_all()
+
+
+_current: ContextVar[Optional[Tuple[CycleState, CycleGates]]] = ContextVar(
+    "dynapipeline_cycle", default=None
+)
+
+
+def enter_cycle(state: CycleState, gates: CycleGates) -> None:
+    """Makes state the current cycle of the calling task"""
+    _current.set((state, gates))
+
+
+def current_cycle() -> Optional[CycleState]:
+    """Returns the state of the overlapping cycle being executed, if any"""
+    active = _current.get()
+    return None if active is None else active[0]
+
+
+def cycle_turn(component: Any):
+    """
+    Returns a context manager waiting for the turn of the component in the
+    current overlapping cycle, or None if the component is not gated
+    """
+    active = _current.get()
+    if active is None:
+        return None
+    state, gates = active
+    # components offloaded to another event loop cannot wait on the gates
+    if component not in gates or asyncio.get_running_loop() is not gates.loop:
+        return None
+    return gates.turn(component, state.number)
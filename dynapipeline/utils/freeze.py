@@ -0,0 +1,85 @@
+"""
+    Contains freeze which converts values into deeply immutable, hashable equivalents
+"""
+import array
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator
+
+
+class FrozenDict(Mapping):
+    """
+    Immutable and hashable mapping
+    Compares equal to a dict with the same items
+    """
+
+    __slots__ = ("_data", "_hash")
+
+    def __init__(self, *args, **kwargs):
+        self._data: Dict[Any, Any] = dict(*args, **kwargs)
+        self._hash = None
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = frozen_hash(self)
+        return self._hash
+
+    def __reduce__(self):
+        return self.__class__, (self._data,)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._data!r})"
+
+
+def _hash_key(value: Any) -> Any:
+    """Returns a hashable stand-in for a frozen value"""
+    if isinstance(value, memoryview):
+        # views of mutable buffers are not hashable themselves, byte views
+        # hash like the bytes they compare equal to
+        data = value.tobytes()
+        return data if value.format == "B" else (value.format, data)
+    if isinstance(value, tuple):
+        return tuple(_hash_key(item) for item in value)
+    if isinstance(value, FrozenDict):
+        return frozenset((key, _hash_key(item)) for key, item in value.items())
+    return value
+
+
+def frozen_hash(value: Any) -> int:
+    """
+    Returns the hash of a frozen value, also when it contains memoryviews
+    of mutable buffers which cannot be hashed directly
+    """
+    return hash(_hash_key(value))
+
+
+def freeze(value: Any) -> Any:
+    """
+    Returns a deeply immutable equivalent of value
+
+    Mappings become FrozenDicts, lists and tuples become tuples, sets become
+    frozensets and mutable buffers (bytearray, array.array, memoryview) become
+    read-only memoryviews sharing the original memory. Other values are
+    returned unchanged
+    """
+    if isinstance(value, (str, bytes, int, float, bool, FrozenDict)) or value is None:
+        return value
+    if isinstance(value, Mapping):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, tuple) and hasattr(value, "_fields"):
+        return type(value)(*(freeze(item) for item in value))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(item) for item in value)
+    if isinstance(value, (bytearray, memoryview, array.array)):
+        return memoryview(value).toreadonly()
+    return value
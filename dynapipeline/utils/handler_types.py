@@ -14,3 +14,4 @@ class HandlerType(str, Enum):
     AROUND = "around"
     AFTER = "after"
     ON_ERROR = "on_error"
+    ON_CIRCUIT_CHANGE = "on_circuit_change"
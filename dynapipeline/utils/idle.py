@@ -0,0 +1,32 @@
+"""
+    Contains the IDLE sentinel stages return when a cycle found no work
+"""
+from typing import Any
+
+
+class _Idle:
+    """Type of the IDLE sentinel, there is a single instance"""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "IDLE"
+
+    def __reduce__(self):
+        # unpickles as the module level instance so identity checks keep working
+        return "IDLE"
+
+
+IDLE = _Idle()
+
+
+def is_idle(result: Any) -> bool:
+    """
+    Returns True if result is IDLE or a non-empty list or tuple of idle results,
+    such as the result of a cycle in which every stage returned IDLE
+    """
+    if result is IDLE:
+        return True
+    if isinstance(result, (list, tuple)) and result:
+        return all(is_idle(item) for item in result)
+    return False
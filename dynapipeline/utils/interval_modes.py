@@ -0,0 +1,23 @@
+"""
+    Defines enumerations for interval cycle scheduling
+"""
+from enum import Enum
+
+
+class IntervalMode(str, Enum):
+    """
+    Enum representing how the start of the next cycle is scheduled
+    """
+
+    FIXED_RATE = "fixed_rate"
+    FIXED_DELAY = "fixed_delay"
+
+
+class MissedTickPolicy(str, Enum):
+    """
+    Enum representing what a fixed rate schedule does with ticks missed by an overrun
+    """
+
+    SKIP = "skip"
+    CATCH_UP = "catch_up"
+    COALESCE = "coalesce"
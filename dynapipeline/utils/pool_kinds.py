@@ -0,0 +1,14 @@
+"""
+    Defines enumeration for resource pool kinds
+"""
+from enum import Enum
+
+
+class PoolKind(str, Enum):
+    """
+    Enum representing the resource shared by the pools of a bulkhead
+    """
+
+    ASYNC = "async"
+    THREAD = "thread"
+    PROCESS = "process"
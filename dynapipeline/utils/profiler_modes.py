@@ -0,0 +1,13 @@
+"""
+    Defines enumeration for profiler modes
+"""
+from enum import Enum
+
+
+class ProfilerMode(str, Enum):
+    """
+    Enum representing how a profiler collects samples
+    """
+
+    CPROFILE = "cprofile"
+    SAMPLING = "sampling"
@@ -0,0 +1,33 @@
+"""
+    Contains RunRecord which stores timing information of a single component run
+"""
+
+
+class RunRecord:
+    """
+    Compact record of a single invocation of a pipeline component
+    Times are taken from time.perf_counter_ns so they are monotonic
+    """
+
+    __slots__ = ("start_ns", "end_ns", "failed")
+
+    def __init__(self, start_ns: int, end_ns: int, failed: bool = False):
+        self.start_ns = start_ns
+        self.end_ns = end_ns
+        self.failed = failed
+
+    @property
+    def duration_ns(self) -> int:
+        """Returns the duration of the run in nanoseconds"""
+        return self.end_ns - self.start_ns
+
+    @property
+    def duration(self) -> float:
+        """Returns the duration of the run in seconds"""
+        return self.duration_ns / 1e9
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(start_ns={self.start_ns}, end_ns={self.end_ns}, "
+            f"failed={self.failed})"
+        )
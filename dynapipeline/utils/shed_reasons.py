@@ -0,0 +1,14 @@
+"""
+    Defines enumeration for the reasons work is shed by admission control
+"""
+from enum import Enum
+
+
+class ShedReason(str, Enum):
+    """
+    Enum representing why an admission controller rejected or dropped an item
+    """
+
+    QUEUE_FULL = "queue_full"
+    QUEUE_DELAY = "queue_delay"
+    LOOP_LAG = "loop_lag"
@@ -0,0 +1,126 @@
+"""
+    Contains ExecutionSlot which lets a running component give back its slot
+"""
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Awaitable, Callable, Iterator, List, Optional
+
+
+class ExecutionSlot:
+    """Slot of a bounded execution strategy held by the component it runs"""
+
+    def __init__(
+        self,
+        acquire: Callable[[], Awaitable[None]],
+        release: Callable[[], None],
+        try_acquire: Optional[Callable[[], Awaitable[bool]]] = None,
+    ):
+        self.loop = asyncio.get_running_loop()
+        self.held = False
+        self.parent: Optional["ExecutionSlot"] = None
+        self._acquire = acquire
+        self._release = release
+        self._try_acquire = try_acquire
+
+    async def acquire(self) -> None:
+        """Waits for the slot and holds it"""
+        await self._acquire()
+        self.held = True
+
+    async def try_acquire(self) -> bool:
+        """Holds the slot if it is free right away, returns whether it is held"""
+        if self._try_acquire is None or not await self._try_acquire():
+            return False
+        self.held = True
+        return True
+
+    def spare(self) -> "ExecutionSlot":
+        """Returns another slot of the same strategy or pool, not yet held"""
+        return ExecutionSlot(self._acquire, self._release, self._try_acquire)
+
+    def release(self) -> None:
+        """Gives the slot back to the strategy if it is held"""
+        if self.held:
+            self.held = False
+            self._release()
+
+
+_current_slot: ContextVar[Optional[ExecutionSlot]] = ContextVar(
+    "dynapipeline_execution_slot", default=None
+)
+
+
+@asynccontextmanager
+async def holding_slot(slot: ExecutionSlot) -> AsyncIterator[None]:
+    """
+    Holds slot for the duration of the block, nested inside the slot the
+    current task already holds
+    """
+    await slot.acquire()
+    slot.parent = _current_slot.get()
+    token = _current_slot.set(slot)
+    try:
+        yield
+    finally:
+        _current_slot.reset(token)
+        slot.release()
+
+
+@asynccontextmanager
+async def released_slot() -> AsyncIterator[None]:
+    """
+    Gives back the execution slots held by the current task for the duration
+    of the block, so waiting does not block other components from running
+    The slots are acquired again outermost first, in the order they were taken
+    """
+    loop = asyncio.get_running_loop()
+    slots = []
+    slot = _current_slot.get()
+    while slot is not None:
+        if slot.held and slot.loop is loop:
+            slots.append(slot)
+        slot = slot.parent
+    for slot in slots:
+        slot.release()
+    try:
+        yield
+    finally:
+        for slot in reversed(slots):
+            await slot.acquire()
+
+
+async def spare_slots() -> Optional[List[ExecutionSlot]]:
+    """
+    Takes one more of every slot held by the current task, without waiting
+    Returns None and holds nothing when one of them is not free, the slots
+    are returned innermost first
+    """
+    loop = asyncio.get_running_loop()
+    taken: List[ExecutionSlot] = []
+    slot = _current_slot.get()
+    while slot is not None:
+        if slot.held and slot.loop is loop:
+            spare = slot.spare()
+            if not await spare.try_acquire():
+                for other in taken:
+                    other.release()
+                return None
+            taken.append(spare)
+        slot = slot.parent
+    for inner, outer in zip(taken, taken[1:]):
+        inner.parent = outer
+    return taken
+
+
+@contextmanager
+def using_slots(slots: List[ExecutionSlot]) -> Iterator[None]:
+    """
+    Makes slots taken by `spare_slots` the slots of the current task in the
+    block, tasks created in it hold them, releasing them is up to the caller
+    """
+    token = _current_slot.set(slots[0] if slots else None)
+    try:
+        yield
+    finally:
+        _current_slot.reset(token)
@@ -1,21 +1,63 @@
 """Contains decorator to measure execution time"""
+import asyncio
 import time
+from contextvars import ContextVar
 from functools import wraps
+from typing import Optional
+
+from dynapipeline.utils.run_record import RunRecord
+
+
+class RunScope:
+    """
+    Groups the runs started in a task, runs of a discarded scope that get
+    cancelled are not recorded (for example the losing run of a hedged stage)
+    """
+
+    __slots__ = ("discarded",)
+
+    def __init__(self):
+        self.discarded = False
+
+
+_run_scope: ContextVar[Optional[RunScope]] = ContextVar(
+    "dynapipeline_run_scope", default=None
+)
+
+
+def use_run_scope(scope: RunScope) -> None:
+    """Makes scope the run scope of the calling task"""
+    _run_scope.set(scope)
 
 
 def measure_execution_time(func):
-    """Decorator to calculate execution time"""
+    """Decorator that records a RunRecord for every call of the wrapped method
+
+    The record is handed to `self.record_run` instead of being written onto the
+    component so concurrent runs of the same instance do not overwrite each other
+    """
 
     @wraps(func)
     async def wrapper(self, *args, **kwargs):
+        in_flight = self.component_stats.in_flight
+        if in_flight is not None:
+            in_flight.add(1)
+        start_ns = time.perf_counter_ns()
+        failed = True
+        discarded = False
         try:
-            self.start_time = time.time()
             result = await func(self, *args, **kwargs)
+            failed = False
             return result
-        except Exception:
+        except asyncio.CancelledError:
+            scope = _run_scope.get()
+            discarded = scope is not None and scope.discarded
             raise
         finally:
-            self.end_time = time.time()
-            self.execution_time = self.end_time - self.start_time
+            end_ns = time.perf_counter_ns()
+            if in_flight is not None:
+                in_flight.add(-1)
+            if not discarded:
+                self.record_run(RunRecord(start_ns, end_ns, failed))
 
     return wrapper
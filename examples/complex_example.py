@@ -20,7 +20,8 @@ This example simulates a data pipeline that includes:
    - A thread-safe `queue.Queue` for error events
 
 The pipeline demonstrates:
-- InfinitLoopStrategy for continuously reading sensor data 
+- IntervalCycleStrategy for reading sensor data at a fixed rate without drift
+- InfinitLoopStrategy for continuously monitoring thresholds
 - MultithreadExecutionStrategy for running the watchdog independently from the sensor stages allowing it to handle errors in parallel
 - ConcurrentExecutionStrategy for simultaneous sensor data collection 
 
@@ -43,6 +44,7 @@ from dynapipeline.execution import (
 )
 from dynapipeline.execution.cycle_strategies import (
     InfinitLoopStrategy,
+    IntervalCycleStrategy,
     OnceCycleStrategy,
 )
 
@@ -265,7 +267,8 @@ async def run_pipeline():
     sensor_group = StageGroup(
         name="Sensor Data Group",
         stages=[temp_stage, pressure_stage, humidity_stage],
-        cycle_strategy=InfinitLoopStrategy(),
+        # poll the sensors every 5 seconds measured from the start of each cycle
+        cycle_strategy=IntervalCycleStrategy(5.0),
         execution_strategy=ConcurrentExecutionStrategy(),
     )
 
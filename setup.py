@@ -13,7 +13,9 @@ setup(
     author="Moel",
     author_email="mohana.rj13@example.com",
     url="https://github.com/oldcorvus/dynapipeline",
-    packages=find_packages(exclude=["tests", "examples", "docs"]),
+    packages=find_packages(
+        exclude=["tests", "examples", "docs", "benchmarks", "benchmarks.*"]
+    ),
     include_package_data=True,
     install_requires=[
         "pydantic>=1.8.2",
@@ -0,0 +1,127 @@
+""" Contains tests for the mergeable context aggregates"""
+import pickle
+import threading
+
+import pytest
+
+from dynapipeline.contexts.aggregates import (
+    Counter,
+    Histogram,
+    HyperLogLog,
+    Maximum,
+    Minimum,
+    SetUnion,
+    TopK,
+    apply_deltas,
+    collect_deltas,
+)
+
+
+def run_threads(target, count=4):
+    """Runs target in several threads and waits for them"""
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_counter_merges_thread_replicas():
+    """Test updates from many threads are merged on read"""
+    counter = Counter()
+
+    def increment():
+        """Increments the counter many times"""
+        for _ in range(5000):
+            counter.add()
+
+    run_threads(increment)
+
+    assert counter.value == 20000
+
+
+def test_extrema_and_set_union():
+    """Test maximum, minimum and set union aggregates"""
+    maximum, minimum, union = Maximum(), Minimum(), SetUnion()
+    assert maximum.value is None
+
+    for value in (3, 9, 1):
+        maximum.add(value)
+        minimum.add(value)
+        union.add(value)
+
+    assert (maximum.value, minimum.value) == (9, 1)
+    assert union.value == frozenset({1, 3, 9})
+
+
+def test_hyperloglog_estimates_distinct_items():
+    """Test the distinct count estimate stays within a few percent"""
+    first, second = HyperLogLog(), HyperLogLog()
+    for item in range(20000):
+        first.add(f"user-{item}")
+        second.add(f"user-{item + 10000}")
+
+    first.merge(second)
+
+    assert first.value == pytest.approx(30000, rel=0.05)
+
+
+def test_topk_returns_heavy_hitters():
+    """Test the most frequent items are reported in order"""
+    topk = TopK(k=2)
+    for item, count in (("a", 5), ("b", 9), ("c", 1)):
+        topk.add(item, count)
+
+    assert topk.value == [("b", 9), ("a", 5)]
+
+
+def test_histogram_aggregate_records_values():
+    """Test the histogram aggregate merges recorded values"""
+    histogram = Histogram()
+    for value in range(1, 101):
+        histogram.add(value)
+
+    assert histogram.value.count == 100
+    assert histogram.value.max == 100
+
+
+def test_merge_rejects_other_types():
+    """Test aggregates of different types cannot be merged"""
+    with pytest.raises(TypeError):
+        Counter().merge(Maximum())
+
+
+def test_unpickled_copy_ships_deltas_back():
+    """Test updates to a copy are returned as deltas and merged into the original"""
+    counter = Counter()
+    counter.add(5)
+    copy = pickle.loads(pickle.dumps(counter))
+    copy.add(2)
+
+    deltas = collect_deltas()
+    apply_deltas(deltas)
+
+    assert deltas == {counter.id: [2]}
+    assert copy.value == 7
+    assert counter.value == 7
+
+
+def test_replicas_of_finished_threads_are_merged():
+    """Test threads that ended leave no replicas behind and keep their updates"""
+    counter = Counter()
+    for _ in range(10):
+        run_threads(counter.add)
+
+    assert len(counter._replicas) == 0
+    assert counter.value == 40
+
+
+def test_copy_updated_by_finished_threads_ships_deltas_back():
+    """Test updates from threads that ended in a worker process are not lost"""
+    counter = Counter()
+    copy = pickle.loads(pickle.dumps(counter))
+    run_threads(copy.add)
+
+    apply_deltas(collect_deltas())
+
+    assert counter.value == 4
@@ -1,8 +1,11 @@
 """This module provides tests for AsyncLockableContext"""
 
+import asyncio
+
 import pytest
 
 from dynapipeline.contexts.async_ctx import AsyncLockableContext
+from dynapipeline.exceptions.context import ContextKeyError
 
 
 @pytest.mark.asyncio
@@ -93,3 +96,104 @@ async def test_lock_releases_properly_on_error_in_async_with():
         pass
 
     assert not context.is_locked
+
+
+@pytest.mark.asyncio
+async def test_unrelated_keys_do_not_block():
+    """Test locking one key does not block another key"""
+    context = AsyncLockableContext({"a": 0, "b": 0})
+    release = asyncio.Event()
+
+    async def hold_a():
+        """Holds the lock of key a until released"""
+        async with context.locked("a"):
+            await release.wait()
+
+    holder = asyncio.create_task(hold_a())
+    await asyncio.sleep(0)
+
+    async with context.locked("b") as ctx:
+        ctx["b"] += 1
+
+    release.set()
+    await holder
+    assert context["b"] == 1
+
+
+@pytest.mark.asyncio
+async def test_same_key_is_serialised():
+    """Test concurrent increments of one key are not lost"""
+    context = AsyncLockableContext({"counter": 0})
+
+    async def increment():
+        """Increments the counter with a suspension point in between"""
+        async with context.locked("counter") as ctx:
+            value = ctx["counter"]
+            await asyncio.sleep(0)
+            ctx["counter"] = value + 1
+
+    await asyncio.gather(*(increment() for _ in range(20)))
+    assert context["counter"] == 20
+
+
+@pytest.mark.asyncio
+async def test_opposite_key_order_does_not_deadlock():
+    """Test multi-key locks are taken in a fixed order"""
+    context = AsyncLockableContext({"a": 0, "b": 0})
+
+    async def update(*keys):
+        """Locks several keys and yields while holding them"""
+        async with context.locked(*keys):
+            await asyncio.sleep(0)
+
+    await asyncio.wait_for(
+        asyncio.gather(*(update("a", "b") for _ in range(5)), update("b", "a")),
+        timeout=1,
+    )
+
+
+@pytest.mark.asyncio
+async def test_global_lock_waits_for_key_holders():
+    """Test the global lock is granted only after key locks are released"""
+    context = AsyncLockableContext({"a": 0})
+    order = []
+
+    async def hold_a():
+        """Holds key a for a moment"""
+        async with context.locked("a"):
+            await asyncio.sleep(0.01)
+            order.append("key")
+
+    holder = asyncio.create_task(hold_a())
+    await asyncio.sleep(0)
+    async with context:
+        order.append("global")
+    await holder
+
+    assert order == ["key", "global"]
+
+
+@pytest.mark.asyncio
+async def test_transaction_applies_all_or_nothing():
+    """Test transaction writes are discarded when the block fails"""
+    context = AsyncLockableContext({"a": 1, "b": 1})
+
+    with pytest.raises(RuntimeError):
+        async with context.transaction("a", "b") as tx:
+            tx["a"] = 10
+            raise RuntimeError()
+    assert context["a"] == 1
+
+    async with context.transaction("a", "b") as tx:
+        tx["a"], tx["b"] = tx["b"] + 1, tx["a"] + 1
+    assert (context["a"], context["b"]) == (2, 2)
+
+
+@pytest.mark.asyncio
+async def test_transaction_rejects_unlocked_keys():
+    """Test a transaction only touches the keys it locked"""
+    context = AsyncLockableContext({"a": 1, "b": 1})
+
+    with pytest.raises(ContextKeyError):
+        async with context.transaction("a") as tx:
+            tx["b"] = 2
@@ -0,0 +1,121 @@
+""" Contains tests for PersistentContext"""
+import gc
+import pickle
+import sqlite3
+import time
+
+import pytest
+
+from dynapipeline.contexts.persistent import PersistentContext
+from dynapipeline.exceptions.context import ContextKeyError, ContextLockedError
+
+
+def stored_keys(path):
+    """Returns the keys written to the database"""
+    with sqlite3.connect(path) as connection:
+        return {key for (key,) in connection.execute("SELECT key FROM context")}
+
+
+def test_writes_are_deferred_until_flush(tmp_path):
+    """Test writes stay in memory until they are flushed"""
+    path = tmp_path / "context.db"
+    context = PersistentContext(str(path), flush_interval=60)
+    context["a"] = [1, 2]
+
+    assert context.pending == 1
+    assert stored_keys(path) == set()
+
+    context.flush()
+    assert stored_keys(path) == {"a"}
+    context.close()
+
+
+def test_flush_size_triggers_background_flush(tmp_path):
+    """Test the background thread flushes once enough keys are dirty"""
+    path = tmp_path / "context.db"
+    context = PersistentContext(str(path), flush_interval=60, flush_size=3)
+    for index in range(3):
+        context[f"key-{index}"] = index
+
+    deadline = time.monotonic() + 5
+    while context.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert stored_keys(path) == {"key-0", "key-1", "key-2"}
+    context.close()
+
+
+def test_restart_loads_values_lazily(tmp_path):
+    """Test a reopened context sees the keys and loads values on access"""
+    path = str(tmp_path / "context.db")
+    context = PersistentContext(path)
+    context["a"] = {"depth": 1}
+    context["b"] = 2
+    del context["b"]
+    context.close()
+
+    reopened = PersistentContext(path)
+    assert set(reopened) == {"a"}
+    assert reopened._data == {}
+    assert reopened["a"] == {"depth": 1}
+    with pytest.raises(ContextKeyError):
+        del reopened["b"]
+    reopened.close()
+
+
+def test_locked_context_rejects_writes(tmp_path):
+    """Test a locked context cannot be modified"""
+    context = PersistentContext(str(tmp_path / "context.db"))
+    context.lock()
+
+    with pytest.raises(ContextLockedError):
+        context["a"] = 1
+    context.close()
+
+
+def test_unpickled_copy_writes_through(tmp_path):
+    """Test a copy for a worker process reads earlier writes and writes without a thread"""
+    path = tmp_path / "context.db"
+    context = PersistentContext(str(path), flush_interval=60)
+    context["a"] = 1
+    copy = pickle.loads(pickle.dumps(context))
+
+    assert copy["a"] == 1
+    copy["b"] = 2
+    del copy["a"]
+
+    assert copy.pending == 0
+    assert copy._flusher is None
+    assert stored_keys(path) == {"b"}
+    copy.close()
+    context.close()
+
+
+def test_unpickled_copy_closes_its_connection(tmp_path):
+    """Test a copy that is never closed releases its connection once collected"""
+    context = PersistentContext(str(tmp_path / "context.db"))
+    copy = pickle.loads(pickle.dumps(context))
+    connection = copy._connection
+
+    del copy
+    gc.collect()
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        connection.execute("SELECT 1")
+    context.close()
+
+
+def test_membership_does_not_copy_the_keys(tmp_path, monkeypatch):
+    """Test lookups and deletes check the key sets instead of building their union"""
+    path = str(tmp_path / "context.db")
+    context = PersistentContext(path)
+    context["a"] = 1
+    context.close()
+
+    reopened = PersistentContext(path)
+    monkeypatch.setattr(reopened, "_keys", None)
+    assert "a" in reopened
+    assert "b" not in reopened
+    del reopened["a"]
+    assert "a" not in reopened
+    reopened.close()
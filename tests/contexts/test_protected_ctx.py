@@ -1,7 +1,10 @@
 """ Contains tests for ProtectedContext"""
+import pickle
+
 import pytest
 
 from dynapipeline.contexts.protected import ProtectedContext
+from dynapipeline.core.context import ALL_KEYS, track_reads
 from dynapipeline.exceptions.context import ContextKeyError, ContextLockedError
 
 
@@ -67,3 +70,38 @@ def test_delete_non_existent_key(context):
     """Test that deleting a non-existent key raises ContextKeyError"""
     with pytest.raises(ContextKeyError):
         del context["non_existent_key"]
+
+
+def test_key_versions_and_read_tracking():
+    """Test writes bump key versions and reads are tracked inside track_reads"""
+    context = ProtectedContext({"a": 1})
+    context["a"] = 2
+    context["b"] = 3
+    del context["b"]
+
+    with track_reads() as reads:
+        _ = context["a"]
+        _ = context.get("missing")
+
+    assert reads == {"a": 1, "missing": 0}
+    assert context.key_version("b") == 2
+
+    with track_reads() as reads:
+        _ = dict(context.items())
+    assert reads == {ALL_KEYS: 3}
+
+
+def test_lock_freezes_nested_values():
+    """Test locking deeply freezes values and unlocking restores them"""
+    context = ProtectedContext({"items": [1, 2], "config": {"depth": 1}})
+    context.lock()
+
+    assert context["items"] == (1, 2)
+    with pytest.raises(TypeError):
+        context["config"]["depth"] = 2
+    copy = pickle.loads(pickle.dumps(context))
+    assert copy.is_locked and copy["config"] == {"depth": 1}
+
+    context.unlock()
+    context["items"].append(3)
+    assert context["items"] == [1, 2, 3]
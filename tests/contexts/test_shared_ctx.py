@@ -0,0 +1,79 @@
+""" Contains tests for SharedMemoryContext"""
+import array
+import ctypes
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from dynapipeline.contexts.shared import SharedMemoryContext
+from dynapipeline.exceptions.context import ContextLockedError
+
+
+@pytest.fixture
+def context():
+    """Fixture that provides a published SharedMemoryContext"""
+    context = SharedMemoryContext(
+        {
+            "config": {"threshold": 3},
+            "blob": b"x" * 100000,
+            "weights": array.array("d", [0.5, 1.5, 2.5]),
+        }
+    )
+    context.lock()
+    yield context
+    context.close()
+
+
+def read_in_worker(context):
+    """Reads values from the context inside a worker process"""
+    return (
+        context["config"]["threshold"],
+        len(context["blob"]),
+        context["weights"][1],
+        context["weights"].readonly,
+    )
+
+
+def test_locked_context_pickles_as_segment_name(context):
+    """Test a published context does not copy its values when pickled"""
+    assert len(pickle.dumps(context)) < 200
+    assert SharedMemoryContext({"a": 1}).segment_name is None
+
+
+def test_locked_context_rejects_writes(context):
+    """Test a published context is immutable"""
+    with pytest.raises(ContextLockedError):
+        context["config"] = {}
+    with pytest.raises(ContextLockedError):
+        del context["blob"]
+
+
+def test_workers_read_shared_values(context):
+    """Test worker processes attach to the segment and read zero-copy views"""
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(read_in_worker, [context] * 4))
+
+    assert results == [(3, 100000, 1.5, True)] * 4
+
+
+def test_unlock_releases_segment(context):
+    """Test unlocking removes the segment and allows modifications again"""
+    context.unlock()
+
+    assert context.segment_name is None
+    context["config"] = {"threshold": 4}
+    assert pickle.loads(pickle.dumps(context))["config"] == {"threshold": 4}
+
+
+def test_byte_order_prefixed_buffers_are_shared():
+    """Test buffers with a native byte-order prefix, like '<d' of ctypes, are read back"""
+    context = SharedMemoryContext({"values": (ctypes.c_double * 3)(0.5, 1.5, 2.5)})
+    context.lock()
+    try:
+        values = pickle.loads(pickle.dumps(context))["values"]
+
+        assert values.format == "d"
+        assert values.tolist() == [0.5, 1.5, 2.5]
+    finally:
+        context.close()
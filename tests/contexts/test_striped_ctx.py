@@ -0,0 +1,111 @@
+""" Contains tests for StripedLockContext"""
+import pickle
+import sys
+import threading
+
+import pytest
+
+from dynapipeline.contexts.striped import StripedLockContext
+from dynapipeline.core.context import ALL_KEYS
+from dynapipeline.exceptions.context import ContextKeyError, ContextLockedError
+
+
+@pytest.fixture
+def context():
+    """Fixture that provides a StripedLockContext"""
+    return StripedLockContext({"counter": 0}, stripes=4)
+
+
+def run_threads(target, count=4):
+    """Runs target in several threads and waits for them"""
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_update_value_from_threads(context):
+    """Test read-modify-write from many threads loses no update"""
+
+    def increment():
+        """Increments the counter many times"""
+        for _ in range(2000):
+            context.update_value("counter", lambda value: value + 1)
+
+    run_threads(increment)
+
+    assert context["counter"] == 8000
+
+
+def test_writes_to_different_stripes_are_all_counted():
+    """Test the version of the whole context counts writes made under any stripe"""
+    context = StripedLockContext(stripes=8)
+
+    def write():
+        """Writes keys of its own, spread over the stripes"""
+        for index in range(5000):
+            context[f"{threading.get_ident()}-{index}"] = index
+
+    interval = sys.getswitchinterval()
+    # switch threads as often as possible to expose lost updates
+    sys.setswitchinterval(1e-6)
+    try:
+        run_threads(write)
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert context.key_version(ALL_KEYS) == 20000
+
+
+def test_locked_allows_multi_key_updates(context):
+    """Test keys locked together can be updated consistently"""
+    context["a"], context["b"] = 100, 0
+
+    def transfer():
+        """Moves one unit from a to b many times"""
+        for _ in range(25):
+            with context.locked("a", "b"):
+                context["a"] -= 1
+                context["b"] += 1
+
+    def check():
+        """Checks the invariant a + b == 100 with consistent reads"""
+        for _ in range(200):
+            a, b = context.get_many("a", "b")
+            assert a + b == 100
+
+    threads = [threading.Thread(target=transfer) for _ in range(4)]
+    threads.append(threading.Thread(target=check))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert context.get_many("a", "b") == (0, 100)
+
+
+def test_locked_context_rejects_writes(context):
+    """Test writes fail while the context is locked"""
+    context.lock()
+    with pytest.raises(ContextLockedError):
+        context["counter"] = 1
+    with pytest.raises(ContextLockedError):
+        del context["counter"]
+
+
+def test_delete_missing_key(context):
+    """Test deleting a missing key raises ContextKeyError"""
+    with pytest.raises(ContextKeyError):
+        del context["missing"]
+
+
+def test_pickle(context):
+    """Test the context can be sent to worker processes"""
+    context["counter"] = 2
+
+    copy = pickle.loads(pickle.dumps(context))
+    copy["counter"] += 1
+
+    assert copy["counter"] == 3
+    assert context["counter"] == 2
@@ -0,0 +1,119 @@
+""" Contains tests for VersionedContext"""
+import pickle
+import threading
+
+import pytest
+
+from dynapipeline.contexts.versioned import VersionedContext
+from dynapipeline.exceptions.context import (
+    ContextConflictError,
+    ContextKeyError,
+    ContextLockedError,
+)
+
+
+@pytest.fixture
+def context():
+    """Fixture that provides a VersionedContext"""
+    return VersionedContext({"counter": 0, "name": "a"})
+
+
+def test_set_item_commits_new_version(context):
+    """Test every write creates a new version"""
+    context["counter"] = 1
+
+    assert context["counter"] == 1
+    assert context.version == 1
+
+
+def test_snapshot_is_stable(context):
+    """Test a snapshot does not see later commits"""
+    snapshot = context.snapshot()
+    context["counter"] = 5
+    del context["name"]
+
+    assert snapshot["counter"] == 0
+    assert "name" in snapshot
+    assert "name" not in context
+
+
+def test_unchanged_values_are_shared(context):
+    """Test commits share values of untouched keys with the previous version"""
+    context["table"] = {"big": list(range(10))}
+    before = context.snapshot()
+    context["counter"] = 1
+
+    assert context.snapshot()["table"] is before["table"]
+
+
+def test_commit_with_stale_version_conflicts(context):
+    """Test compare-and-swap rejects commits based on an old version"""
+    base = context.version
+    context["counter"] = 1
+
+    with pytest.raises(ContextConflictError):
+        context.commit({"counter": 2}, expected_version=base)
+
+
+def test_transaction_commits_atomically(context):
+    """Test transaction writes become visible together"""
+    with context.transaction() as tx:
+        tx["counter"] = tx["counter"] + 1
+        del tx["name"]
+        assert context["counter"] == 0
+
+    assert context["counter"] == 1
+    assert "name" not in context
+
+
+def test_transaction_conflict(context):
+    """Test a transaction fails if another commit happened in between"""
+    with pytest.raises(ContextConflictError):
+        with context.transaction() as tx:
+            tx["counter"] = 1
+            context["counter"] = 2
+
+    assert context["counter"] == 2
+
+
+def test_apply_retries_until_consistent(context):
+    """Test optimistic increments from many threads are not lost"""
+
+    def increment():
+        """Increments the counter many times"""
+        for _ in range(500):
+            context.apply(
+                lambda snapshot: {"counter": snapshot["counter"] + 1}, retries=10_000
+            )
+
+    threads = [threading.Thread(target=increment) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert context["counter"] == 2000
+
+
+def test_locked_context_rejects_commits(context):
+    """Test commits fail while the context is locked"""
+    context.lock()
+    with pytest.raises(ContextLockedError):
+        context["counter"] = 1
+    context.unlock()
+    context["counter"] = 1
+
+
+def test_delete_missing_key(context):
+    """Test deleting a missing key raises ContextKeyError"""
+    with pytest.raises(ContextKeyError):
+        del context["missing"]
+
+
+def test_pickle(context):
+    """Test the context can be sent to worker processes"""
+    context["counter"] = 3
+
+    copy = pickle.loads(pickle.dumps(context))
+
+    assert dict(copy) == {"counter": 3, "name": "a"}
@@ -0,0 +1,197 @@
+""" Contains tests for cycle strategies"""
+import asyncio
+import pickle
+from typing import Any
+
+import pytest
+
+from dynapipeline import PipelineFactory, PipeLineType, Stage, StageGroup
+from dynapipeline.execution.cycle_strategies import (
+    InfinitLoopStrategy,
+    IntervalCycleStrategy,
+    LoopCycleStrategy,
+    OnceCycleStrategy,
+)
+from dynapipeline.execution.strategies import SequentialExecutionStrategy
+from dynapipeline.utils.cycles import current_cycle
+from dynapipeline.utils.idle import IDLE, is_idle
+from dynapipeline.utils.interval_modes import IntervalMode, MissedTickPolicy
+
+
+def make_execute_fn(durations):
+    """Returns an execute_fn recording its start times and sleeping for each duration"""
+    starts = []
+
+    async def execute_fn(components, *args, **kwargs):
+        """Records the start time and simulates work"""
+        loop = asyncio.get_running_loop()
+        starts.append(loop.time())
+        await asyncio.sleep(durations[len(starts) - 1])
+        return len(starts)
+
+    return execute_fn, starts
+
+
+@pytest.mark.asyncio
+async def test_fixed_rate_does_not_drift():
+    """Test cycles start on the interval grid regardless of execution time"""
+    execute_fn, starts = make_execute_fn([0.03] * 5)
+    strategy = IntervalCycleStrategy(0.05, cycles=5)
+
+    results = await strategy.run(execute_fn, [])
+
+    assert results == [1, 2, 3, 4, 5]
+    assert starts[-1] - starts[0] == pytest.approx(0.2, abs=0.03)
+    assert strategy.overruns == 0
+
+
+@pytest.mark.asyncio
+async def test_fixed_delay_waits_after_each_cycle():
+    """Test fixed delay adds the interval after every cycle ends"""
+    execute_fn, starts = make_execute_fn([0.03] * 3)
+    strategy = IntervalCycleStrategy(0.02, mode=IntervalMode.FIXED_DELAY, cycles=3)
+
+    await strategy.run(execute_fn, [])
+
+    assert starts[-1] - starts[0] == pytest.approx(0.1, abs=0.03)
+    assert strategy.overruns == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "policy, skipped, overruns",
+    [
+        (MissedTickPolicy.SKIP, 2, 1),
+        (MissedTickPolicy.COALESCE, 1, 1),
+        (MissedTickPolicy.CATCH_UP, 0, 2),
+    ],
+)
+async def test_missed_tick_policies(policy, skipped, overruns):
+    """Test an overrun of two ticks is skipped, coalesced or caught up"""
+    execute_fn, starts = make_execute_fn([0.125, 0.0, 0.0])
+    strategy = IntervalCycleStrategy(0.05, missed_ticks=policy, cycles=3)
+
+    await strategy.run(execute_fn, [])
+    gap = starts[1] - starts[0]
+
+    assert strategy.overruns == overruns
+    assert strategy.skipped_ticks == skipped
+    if policy == MissedTickPolicy.SKIP:
+        assert gap == pytest.approx(0.15, abs=0.02)
+    else:
+        assert gap == pytest.approx(0.125, abs=0.02)
+    assert strategy.stats()["ticks"] == 3
+
+
+@pytest.mark.asyncio
+async def test_event_stops_sleeping_strategy():
+    """Test setting the event ends the schedule without waiting for the next tick"""
+    event = asyncio.Event()
+    execute_fn, starts = make_execute_fn([0.0] * 10)
+    strategy = IntervalCycleStrategy(10, event=event)
+
+    task = asyncio.create_task(strategy.run(execute_fn, []))
+    await asyncio.sleep(0.05)
+    event.set()
+    await asyncio.wait_for(task, 1)
+
+    assert len(starts) == 1
+
+
+class CycleStage(Stage):
+    """A stage recording the cycles it runs and passing values to later groups"""
+
+    delay: float = 0.05
+    log: Any = None
+
+    async def execute(self, *args, **kwargs):
+        """Records start and end of the cycle and hands a value to the next group"""
+        cycle = current_cycle()
+        self.log.append(("start", self.name, cycle.number))
+        await asyncio.sleep(self.delay)
+        cycle.data[self.name] = cycle.number
+        self.log.append(("end", self.name, cycle.number))
+        return dict(cycle.data)
+
+
+def make_group(name, log):
+    """Creates a group with a single cycle stage"""
+    return StageGroup(
+        name=name,
+        stages=[CycleStage(name=name, log=log)],
+        cycle_strategy=OnceCycleStrategy(),
+        execution_strategy=SequentialExecutionStrategy(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_overlapped_cycles_pipeline_groups():
+    """Test groups of overlapping cycles run one cycle at a time and in order"""
+    log = []
+    pipeline = PipelineFactory().create_pipeline(
+        pipeline_type=PipeLineType.SIMPLE,
+        name="pipeline",
+        groups=[make_group("first", log), make_group("second", log)],
+        cycle_strategy=LoopCycleStrategy(4, overlap=2),
+        execution_strategy=SequentialExecutionStrategy(),
+    )
+    loop = asyncio.get_running_loop()
+
+    start = loop.time()
+    results = await pipeline.run()
+    elapsed = loop.time() - start
+
+    assert elapsed < 0.35
+    for name in ("first", "second"):
+        events = [(kind, number) for kind, stage, number in log if stage == name]
+        assert events == [(kind, n) for n in range(4) for kind in ("start", "end")]
+    assert [cycle[1][0] for cycle in results] == [
+        {"first": n, "second": n} for n in range(4)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_overlapped_cycles_stop_on_error():
+    """Test a failing cycle cancels the cycles in flight"""
+
+    async def execute_fn(components, *args, **kwargs):
+        """Fails in the second cycle"""
+        if current_cycle().number == 1:
+            raise RuntimeError("failed")
+        await asyncio.sleep(1)
+
+    with pytest.raises(RuntimeError):
+        await asyncio.wait_for(
+            LoopCycleStrategy(10, overlap=3).run(execute_fn, []), 0.5
+        )
+
+
+@pytest.mark.asyncio
+async def test_idle_backoff_grows_and_resets():
+    """Test idle cycles back off exponentially and work resets the delay"""
+    event = asyncio.Event()
+    strategy = InfinitLoopStrategy(
+        event, backoff=True, min_delay=0.001, max_delay=0.008
+    )
+    delays = []
+    outcomes = [IDLE] * 5 + ["work"] + [IDLE]
+
+    async def execute_fn(components, *args, **kwargs):
+        """Returns the next outcome and records the current delay"""
+        delays.append(strategy.delay)
+        if len(delays) == len(outcomes):
+            event.set()
+        return [outcomes[len(delays) - 1], IDLE]
+
+    await asyncio.wait_for(strategy.run(execute_fn, []), 1)
+
+    assert delays == [0, 0.001, 0.002, 0.004, 0.008, 0.008, 0]
+    assert strategy.idle_cycles == 6
+
+
+def test_idle_sentinel_survives_pickling():
+    """Test IDLE keeps its identity when results come back from a process"""
+    assert pickle.loads(pickle.dumps([IDLE]))[0] is IDLE
+    assert is_idle([[IDLE], (IDLE,)])
+    assert not is_idle([IDLE, None])
+    assert not is_idle([])
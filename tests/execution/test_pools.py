@@ -0,0 +1,264 @@
+""" Contains tests for bulkheads and resource pools"""
+import asyncio
+import pickle
+import threading
+from typing import Any
+
+import pytest
+
+from dynapipeline import PipelineFactory, PipeLineType, Stage, StageGroup
+from dynapipeline.exceptions.registry import ItemAlreadyRegisteredError
+from dynapipeline.execution import Bulkhead
+from dynapipeline.execution.cycle_strategies import OnceCycleStrategy
+from dynapipeline.execution.strategies import (
+    ConcurrentExecutionStrategy,
+    MultiprocessExecutionStrategy,
+    MultithreadExecutionStrategy,
+    SemaphoreExecutionStrategy,
+)
+from dynapipeline.resilience import HedgePolicy, RetryPolicy
+from dynapipeline.utils.pool_kinds import PoolKind
+
+
+class TrackingStage(Stage):
+    """A stage recording how many stages of its group run at once"""
+
+    tracker: Any = None
+    delay: float = 0.02
+    failures: int = 0
+
+    async def execute(self, *args, **kwargs):
+        """Sleeps while counted as running"""
+        self.tracker["running"] += 1
+        self.tracker["peak"] = max(self.tracker["peak"], self.tracker["running"])
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.tracker["running"] -= 1
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("transient")
+        return asyncio.get_running_loop().time()
+
+
+class ThreadNameStage(Stage):
+    """A stage returning the name of the thread it runs in"""
+
+    async def execute(self, *args, **kwargs):
+        """Returns the thread name"""
+        return threading.current_thread().name
+
+
+def _group(name, pool, count, strategy=None, delay=0.02):
+    """Creates a group of tracking stages sharing one tracker"""
+    tracker = {"running": 0, "peak": 0}
+    stages = [
+        TrackingStage(name=f"{name}{i}", tracker=tracker, delay=delay)
+        for i in range(count)
+    ]
+    group = StageGroup(
+        name=name,
+        stages=stages,
+        cycle_strategy=OnceCycleStrategy(),
+        execution_strategy=strategy or ConcurrentExecutionStrategy(),
+        pool=pool,
+    )
+    return group, tracker
+
+
+def test_pool_sizes_are_validated():
+    """Test pools cannot reserve more than the capacity"""
+    bulkhead = Bulkhead(4)
+    bulkhead.pool("a", min_size=3)
+
+    with pytest.raises(ValueError):
+        bulkhead.pool("b", min_size=2)
+    with pytest.raises(ValueError):
+        bulkhead.pool("c", max_size=5)
+    with pytest.raises(ItemAlreadyRegisteredError):
+        bulkhead.pool("a")
+
+
+@pytest.mark.asyncio
+async def test_pool_bounds_group_concurrency():
+    """Test a group never runs more stages than the maximum of its pool"""
+    pool = Bulkhead(10).pool("io", max_size=2)
+    group, tracker = _group("io", pool, 6)
+
+    await group.run()
+
+    assert tracker["peak"] == 2
+    assert pool.in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_burst_leaves_guaranteed_slots_free():
+    """Test a bursting pool cannot use the slots guaranteed to another pool"""
+    bulkhead = Bulkhead(4)
+    busy = bulkhead.pool("busy", max_size=4)
+    quiet = bulkhead.pool("quiet", min_size=2)
+    busy_group, busy_tracker = _group("busy", busy, 6, delay=0.1)
+    quiet_group, quiet_tracker = _group("quiet", quiet, 2, delay=0.01)
+
+    loop = asyncio.get_running_loop()
+    busy_task = asyncio.create_task(busy_group.run())
+    await asyncio.sleep(0.01)
+    start = loop.time()
+    await quiet_group.run()
+    quiet_time = loop.time() - start
+    await busy_task
+
+    assert busy_tracker["peak"] == 2
+    assert quiet_tracker["peak"] == 2
+    assert quiet_time < 0.08
+
+
+@pytest.mark.asyncio
+async def test_pool_bursts_into_unused_capacity():
+    """Test a pool with a small guarantee uses the free capacity of the bulkhead"""
+    bulkhead = Bulkhead(4)
+    pool = bulkhead.pool("a", min_size=1, max_size=4)
+    bulkhead.pool("b", min_size=1)
+    group, tracker = _group("a", pool, 6)
+
+    await group.run()
+
+    assert tracker["peak"] == 3
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_slot():
+    """Test cancelling a task waiting for a slot keeps the pool usable"""
+    pool = Bulkhead(1).pool("a")
+    await pool.acquire()
+    waiter = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    pool.release()
+
+    await asyncio.wait_for(pool.acquire(), timeout=1)
+    assert pool.in_use == 1
+    assert pool.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_retry_backoff_releases_pool_slot():
+    """Test a stage waiting to retry gives back its pool and semaphore slots"""
+    pool = Bulkhead(1).pool("a")
+    policy = RetryPolicy(base_delay=0.2, max_delay=0.2, multiplier=1)
+    tracker = {"running": 0, "peak": 0}
+    flaky = TrackingStage(name="flaky", tracker=tracker, failures=1, retry=policy)
+    healthy = TrackingStage(name="healthy", tracker=tracker)
+    group = StageGroup(
+        name="g",
+        stages=[flaky, healthy],
+        cycle_strategy=OnceCycleStrategy(),
+        execution_strategy=SemaphoreExecutionStrategy(2),
+        pool=pool,
+    )
+
+    finished = await group.run()
+
+    assert finished[1] < finished[0]
+    assert tracker["peak"] == 1
+
+
+@pytest.mark.asyncio
+async def test_thread_pool_provides_executor():
+    """Test groups in a thread pool run their stages in the pool's threads"""
+    bulkhead = Bulkhead(2, kind=PoolKind.THREAD)
+    pool = bulkhead.pool("workers")
+    group = StageGroup(
+        name="g",
+        stages=[ThreadNameStage(name="a"), ThreadNameStage(name="b", offload=True)],
+        cycle_strategy=OnceCycleStrategy(),
+        execution_strategy=MultithreadExecutionStrategy(),
+        pool=pool,
+    )
+    try:
+        names = await group.run()
+    finally:
+        bulkhead.shutdown()
+
+    assert names[0].startswith("pool-workers")
+    # offloading from a worker of the pool uses the default executor
+    assert not names[1].startswith("pool-workers")
+    assert bulkhead.stats()["workers"]["in_use"] == 0
+
+
+@pytest.mark.asyncio
+async def test_offloaded_stage_uses_pool_threads():
+    """Test offloaded stages of a group in a thread pool run in the pool's threads"""
+    bulkhead = Bulkhead(2, kind=PoolKind.THREAD)
+    group = StageGroup(
+        name="g",
+        stages=[ThreadNameStage(name="a", offload=True)],
+        cycle_strategy=OnceCycleStrategy(),
+        execution_strategy=ConcurrentExecutionStrategy(),
+        pool=bulkhead.pool("workers"),
+    )
+    try:
+        names = await group.run()
+    finally:
+        bulkhead.shutdown()
+
+    assert names[0].startswith("pool-workers")
+
+
+@pytest.mark.asyncio
+async def test_pooled_group_runs_in_worker_process():
+    """Test a pooled group is pickled without its pool for multiprocess pipelines"""
+    pool = Bulkhead(2).pool("io")
+    group, _ = _group("io", pool, 2, delay=0)
+    assert pickle.loads(pickle.dumps(group)).pool is None
+    pipeline = PipelineFactory().create_pipeline(
+        pipeline_type=PipeLineType.ADVANCED,
+        name="p",
+        groups=[group],
+        cycle_strategy=OnceCycleStrategy(),
+        execution_strategy=MultiprocessExecutionStrategy(),
+    )
+
+    results = await pipeline.run()
+
+    assert len(results[0]) == 2
+    assert group.pool is pool
+
+
+class SlowTailStage(Stage):
+    """A stage whose eleventh run is slow"""
+
+    calls: int = 0
+
+    async def execute(self, *args, **kwargs):
+        """Sleeps on the eleventh run"""
+        self.calls += 1
+        if self.calls == 11:
+            await asyncio.sleep(0.1)
+        return self.calls
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_size, hedged", [(1, False), (2, True)])
+async def test_hedge_needs_a_pool_slot(max_size, hedged):
+    """Test a hedged copy only starts when the pool has a free slot for it"""
+    pool = Bulkhead(4).pool("io", max_size=max_size)
+    policy = HedgePolicy(min_samples=10, max_rate=0.5, min_delay=0.01, refresh_every=1)
+    stage = SlowTailStage(name="io", hedge=policy)
+    for _ in range(10):
+        await stage.run()
+    group = StageGroup(
+        name="io",
+        stages=[stage],
+        cycle_strategy=OnceCycleStrategy(),
+        execution_strategy=ConcurrentExecutionStrategy(),
+        pool=pool,
+    )
+
+    await group.run()
+
+    assert ("hedges" in stage.stats()) is hedged
+    assert ("hedges_skipped" in stage.stats()) is not hedged
+    assert pool.in_use == 0
@@ -0,0 +1,132 @@
+""" Contains tests for TriggeredCycleStrategy and its triggers"""
+import asyncio
+import socket
+
+import pytest
+
+from dynapipeline import Stage
+from dynapipeline.execution.cycle_strategies import TriggeredCycleStrategy
+from dynapipeline.execution.triggers import (
+    FileTrigger,
+    GroupTrigger,
+    QueueTrigger,
+    SocketTrigger,
+)
+
+
+def make_execute_fn(runs):
+    """Returns an execute_fn counting its calls"""
+
+    async def execute_fn(components, *args, **kwargs):
+        """Records the run"""
+        runs.append(asyncio.get_running_loop().time())
+        return len(runs)
+
+    return execute_fn
+
+
+@pytest.mark.asyncio
+async def test_queue_burst_is_coalesced():
+    """Test a burst of queue puts within the debounce window causes one run"""
+    queue = asyncio.Queue()
+    runs = []
+    strategy = TriggeredCycleStrategy([QueueTrigger(queue)], debounce=0.05, cycles=1)
+
+    task = asyncio.create_task(strategy.run(make_execute_fn(runs), []))
+    await asyncio.sleep(0.01)
+    assert runs == []
+    for item in range(5):
+        await queue.put(item)
+        await asyncio.sleep(0.01)
+
+    assert await asyncio.wait_for(task, 1) == [1]
+    assert strategy.stats() == {"fired": 5, "runs": 1, "coalesced": 4}
+    assert "put_nowait" not in vars(queue)
+
+
+@pytest.mark.asyncio
+async def test_max_wait_bounds_debounce():
+    """Test a steady stream of triggers still runs after max_wait"""
+    queue = asyncio.Queue()
+    runs = []
+    strategy = TriggeredCycleStrategy(
+        [QueueTrigger(queue)], debounce=0.05, max_wait=0.1, cycles=1
+    )
+
+    async def produce():
+        """Puts an item more often than the debounce window"""
+        while True:
+            queue.put_nowait(1)
+            await asyncio.sleep(0.01)
+
+    producer = asyncio.create_task(produce())
+    await asyncio.wait_for(strategy.run(make_execute_fn(runs), []), 1)
+    producer.cancel()
+
+    assert len(runs) == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("use_inotify", [True, False])
+async def test_file_trigger(tmp_path, use_inotify):
+    """Test writing into a watched directory wakes the strategy"""
+    runs = []
+    trigger = FileTrigger(str(tmp_path), poll_interval=0.02, use_inotify=use_inotify)
+    strategy = TriggeredCycleStrategy([trigger], cycles=1)
+
+    task = asyncio.create_task(strategy.run(make_execute_fn(runs), []))
+    await asyncio.sleep(0.05)
+    if use_inotify and not trigger.uses_inotify:
+        task.cancel()
+        pytest.skip("inotify is not available")
+    (tmp_path / "data.txt").write_text("new data")
+
+    await asyncio.wait_for(task, 1)
+    assert len(runs) == 1
+
+
+@pytest.mark.asyncio
+async def test_socket_trigger():
+    """Test a readable socket wakes the strategy once per run"""
+    reader, writer = socket.socketpair()
+    reader.setblocking(False)
+    received = []
+
+    async def execute_fn(components, *args, **kwargs):
+        """Consumes the pending data"""
+        received.append(reader.recv(1024))
+
+    strategy = TriggeredCycleStrategy([SocketTrigger(reader)], cycles=2)
+    task = asyncio.create_task(strategy.run(execute_fn, []))
+    writer.send(b"first")
+    await asyncio.sleep(0.05)
+    writer.send(b"second")
+
+    await asyncio.wait_for(task, 1)
+    reader.close()
+    writer.close()
+    assert received == [b"first", b"second"]
+
+
+class DoneStage(Stage):
+    """A stage that finishes immediately"""
+
+    async def execute(self, *args, **kwargs):
+        """Returns done"""
+        return "done"
+
+
+@pytest.mark.asyncio
+async def test_group_trigger_fires_after_component_run():
+    """Test another component finishing a run wakes the strategy"""
+    upstream = DoneStage(name="upstream")
+    runs = []
+    strategy = TriggeredCycleStrategy([GroupTrigger(upstream)], cycles=1)
+
+    task = asyncio.create_task(strategy.run(make_execute_fn(runs), []))
+    await asyncio.sleep(0.01)
+    await upstream.run()
+
+    await asyncio.wait_for(task, 1)
+    assert len(runs) == 1
+    assert not upstream.handlers.get("after")
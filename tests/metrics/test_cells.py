@@ -0,0 +1,58 @@
+"""This module provides tests for ThreadCells"""
+from concurrent.futures import ThreadPoolExecutor
+
+from dynapipeline.metrics.cells import ThreadCells
+from dynapipeline.metrics.stats import ComponentStats
+from dynapipeline.utils.run_record import RunRecord
+
+
+def _new_cell():
+    """Returns an empty cell"""
+    return [0]
+
+
+def _fold(target, source):
+    """Adds a cell to another one"""
+    target[0] += source[0]
+
+
+def test_cells_of_finished_threads_are_retired():
+    """Test short-lived threads leave no cells behind and keep their values"""
+    cells = ThreadCells(_new_cell, _fold)
+
+    def add(_):
+        """Increments the cell of the calling thread"""
+        cells.get()[0] += 1
+
+    for _ in range(20):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(add, range(8)))
+
+    assert len(cells) == 0
+    assert cells.fold_into([0]) == [160]
+
+
+def test_drain_starts_over():
+    """Test draining returns every value and leaves empty cells"""
+    cells = ThreadCells(_new_cell, _fold)
+    cells.get()[0] += 2
+    cells.absorb([3])
+
+    assert cells.drain([0]) == [5]
+    cells.get()[0] += 1
+    assert cells.fold_into([0]) == [1]
+
+
+def test_component_stats_shards_stay_bounded():
+    """Test runs recorded by executor threads of every cycle do not grow the shards"""
+    stats = ComponentStats()
+    stats.track_in_flight()
+    for _ in range(10):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: stats.record(RunRecord(0, 1000)), range(8)))
+            executor.submit(stats.in_flight.add).result()
+
+    assert len(stats._shards) == 0
+    assert len(stats.in_flight._cells) == 0
+    assert stats.summary()["runs"] == 80
+    assert stats.in_flight.value == 10
@@ -0,0 +1,42 @@
+"""This module provides tests for ThreadLocalCounter"""
+import pickle
+import threading
+
+from dynapipeline.metrics.counters import ThreadLocalCounter
+
+
+def test_counter_sums_threads():
+    """Test increments from several threads are all counted"""
+    counter = ThreadLocalCounter()
+
+    def work():
+        """Increments the counter many times"""
+        for _ in range(10_000):
+            counter.add()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.value == 40_000
+
+
+def test_counter_decrement_from_other_thread():
+    """Test a value added in one thread can be removed in another"""
+    counter = ThreadLocalCounter()
+    counter.add(1)
+    thread = threading.Thread(target=counter.add, args=(-1,))
+    thread.start()
+    thread.join()
+
+    assert counter.value == 0
+
+
+def test_counter_pickles_value():
+    """Test pickling keeps the summed value"""
+    counter = ThreadLocalCounter()
+    counter.add(5)
+
+    assert pickle.loads(pickle.dumps(counter)).value == 5
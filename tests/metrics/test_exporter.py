@@ -0,0 +1,199 @@
+"""This module provides tests for OpenMetricsExporter"""
+import asyncio
+
+import pytest
+
+from dynapipeline import PipelineFactory, PipeLineType, Stage, StageGroup
+from dynapipeline.execution.cycle_strategies import LoopCycleStrategy, OnceCycleStrategy
+from dynapipeline.execution.strategies import (
+    SemaphoreExecutionStrategy,
+    SequentialExecutionStrategy,
+)
+from dynapipeline.metrics.exporter import OpenMetricsExporter
+from dynapipeline.metrics.openmetrics import render_openmetrics
+from dynapipeline.resilience import CircuitBreaker
+
+
+class FailingStage(Stage):
+    """A stage that fails on every run"""
+
+    async def execute(self, *args, **kwargs):
+        """Raises an error"""
+        raise ValueError("failed")
+
+
+class QuickStage(Stage):
+    """A stage that returns immediately"""
+
+    async def execute(self, *args, **kwargs):
+        """Returns a constant"""
+        return 1
+
+
+@pytest.fixture
+def pipeline():
+    """Fixture to create a pipeline with a single group"""
+    group = StageGroup(
+        name="group",
+        stages=[QuickStage(name="quick")],
+        cycle_strategy=LoopCycleStrategy(3),
+        execution_strategy=SemaphoreExecutionStrategy(1),
+    )
+    return PipelineFactory().create_pipeline(
+        pipeline_type=PipeLineType.SIMPLE,
+        name="pipe",
+        groups=[group],
+        cycle_strategy=OnceCycleStrategy(),
+        execution_strategy=SequentialExecutionStrategy(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_render_contains_metrics(pipeline):
+    """Test the exposition contains latency, counters and queue depth"""
+    await pipeline.run()
+
+    text = OpenMetricsExporter([pipeline]).render()
+
+    assert text.endswith("# EOF\n")
+    assert "# TYPE dynapipeline_latency_seconds summary" in text
+    assert 'dynapipeline_runs_total{kind="stage",path="pipe/group/quick"} 3' in text
+    assert 'dynapipeline_cycles_total{kind="group",path="pipe/group"} 3' in text
+    assert 'dynapipeline_queue_depth{kind="group",path="pipe/group"} 0' in text
+    assert 'dynapipeline_in_flight{kind="pipeline",path="pipe"} 0' in text
+
+
+@pytest.mark.asyncio
+async def test_render_quantile_labels(pipeline):
+    """Test quantile labels are the exact quantiles without float noise"""
+    await pipeline.run()
+
+    text = OpenMetricsExporter([pipeline]).render()
+
+    labels = [
+        line.split('quantile="')[1].split('"')[0]
+        for line in text.splitlines()
+        if 'path="pipe/group/quick",quantile=' in line
+    ]
+    assert labels == ["0.5", "0.9", "0.99", "0.999"]
+
+
+@pytest.mark.asyncio
+async def test_in_flight_is_only_counted_when_exported(pipeline):
+    """Test runs in progress are counted only for pipelines with an exporter"""
+    await pipeline.run()
+    assert pipeline.stats()["in_flight"] is None
+    assert "dynapipeline_in_flight" not in render_openmetrics([pipeline])
+
+    exporter = OpenMetricsExporter([pipeline])
+    await pipeline.run()
+
+    assert pipeline.stats()["in_flight"] == 0
+    assert 'dynapipeline_in_flight{kind="stage",path="pipe/group/quick"} 0' in (
+        exporter.render()
+    )
+
+
+def test_counters_cannot_shadow_built_in_metrics():
+    """Test counters named like a built-in statistic are rejected"""
+    stage = QuickStage(name="quick")
+
+    for name in ("runs", "errors", "in_flight", "p99"):
+        with pytest.raises(ValueError):
+            stage.component_stats.counter(name)
+    stage.component_stats.counter("batches").add()
+    assert stage.stats()["batches"] == 1
+
+
+@pytest.mark.asyncio
+async def test_render_counts_errors():
+    """Test failed runs are exported as errors"""
+    stage = FailingStage(name="bad")
+    with pytest.raises(ValueError):
+        await stage.run()
+    group = StageGroup(
+        name="g",
+        stages=[stage],
+        cycle_strategy=OnceCycleStrategy(),
+        execution_strategy=SequentialExecutionStrategy(),
+    )
+    pipeline = PipelineFactory().create_pipeline(
+        pipeline_type=PipeLineType.SIMPLE,
+        name="p",
+        groups=[group],
+        cycle_strategy=OnceCycleStrategy(),
+        execution_strategy=SequentialExecutionStrategy(),
+    )
+
+    text = OpenMetricsExporter([pipeline]).render()
+
+    assert 'dynapipeline_errors_total{kind="stage",path="p/g/bad"} 1' in text
+
+
+@pytest.mark.asyncio
+async def test_render_circuit_state():
+    """Test the state of a circuit breaker is exported as a stateset"""
+    breaker = CircuitBreaker(min_runs=1, window_size=1)
+    stage = FailingStage(name="bad", circuit_breaker=breaker)
+    with pytest.raises(ValueError):
+        await stage.run()
+    group = StageGroup(
+        name="g",
+        stages=[stage],
+        cycle_strategy=OnceCycleStrategy(),
+        execution_strategy=SequentialExecutionStrategy(),
+    )
+    pipeline = PipelineFactory().create_pipeline(
+        pipeline_type=PipeLineType.SIMPLE,
+        name="p",
+        groups=[group],
+        cycle_strategy=OnceCycleStrategy(),
+        execution_strategy=SequentialExecutionStrategy(),
+    )
+
+    text = OpenMetricsExporter([pipeline]).render()
+
+    assert "# TYPE dynapipeline_circuit_state stateset" in text
+    labels = 'kind="stage",path="p/g/bad"'
+    assert (
+        f'dynapipeline_circuit_state{{{labels},dynapipeline_circuit_state="open"}} 1'
+        in text
+    )
+    assert (
+        f'dynapipeline_circuit_state{{{labels},dynapipeline_circuit_state="closed"}} 0'
+        in text
+    )
+    assert 'dynapipeline_circuit_opened_total{kind="stage",path="p/g/bad"} 1' in text
+
+
+@pytest.mark.asyncio
+async def test_serve_http(pipeline):
+    """Test metrics are served over HTTP"""
+    exporter = OpenMetricsExporter([pipeline])
+    server = await exporter.serve_http(port=0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+    finally:
+        await exporter.close()
+
+    assert response.startswith(b"HTTP/1.1 200 OK")
+    assert b"application/openmetrics-text" in response
+    assert response.endswith(b"# EOF\n")
+
+
+@pytest.mark.asyncio
+async def test_write_periodically(pipeline, tmp_path):
+    """Test metrics are written to a file"""
+    path = tmp_path / "metrics.txt"
+    exporter = OpenMetricsExporter([pipeline])
+
+    exporter.write_periodically(str(path), interval=0.01)
+    await asyncio.sleep(0.05)
+    await exporter.close()
+
+    assert path.read_text().endswith("# EOF\n")
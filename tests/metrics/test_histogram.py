@@ -0,0 +1,64 @@
+"""This module provides tests for LatencyHistogram"""
+import pytest
+
+from dynapipeline.metrics.histogram import LatencyHistogram
+
+
+def test_empty_histogram():
+    """Test an empty histogram reports no percentiles"""
+    histogram = LatencyHistogram()
+    assert histogram.count == 0
+    assert histogram.percentile(50) is None
+    assert histogram.mean is None
+
+
+def test_small_values_are_exact():
+    """Test values below 2**precision are stored exactly"""
+    histogram = LatencyHistogram(precision=5)
+    for value in range(1, 11):
+        histogram.record(value)
+
+    assert histogram.percentile(50) == 5
+    assert histogram.percentile(100) == 10
+    assert histogram.min == 1
+
+
+def test_relative_error_is_bounded():
+    """Test percentiles of large values stay within the bucket precision"""
+    histogram = LatencyHistogram(precision=5)
+    values = list(range(1_000, 1_000_000, 997))
+    for value in values:
+        histogram.record(value)
+
+    expected = values[len(values) // 2 - 1]
+    assert abs(histogram.percentile(50) - expected) / expected < 2**-4
+    assert histogram.percentile(100) == values[-1]
+
+
+def test_bucket_count_is_bounded():
+    """Test memory is bounded by the number of buckets, not the number of values"""
+    histogram = LatencyHistogram(precision=4)
+    for value in range(0, 10_000_000, 101):
+        histogram.record(value)
+
+    assert len(list(histogram.buckets())) < 200
+
+
+def test_merge():
+    """Test merging two histograms"""
+    first = LatencyHistogram()
+    second = LatencyHistogram()
+    first.record(10)
+    second.record(1_000)
+
+    first.merge(second)
+
+    assert first.count == 2
+    assert first.min == 10
+    assert first.max == 1_000
+
+
+def test_merge_requires_same_precision():
+    """Test merging histograms of different precision is rejected"""
+    with pytest.raises(ValueError):
+        LatencyHistogram(precision=3).merge(LatencyHistogram(precision=5))
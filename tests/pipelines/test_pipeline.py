@@ -0,0 +1,156 @@
+"""
+        Contains tests for Pipeline
+"""
+import pytest
+
+from dynapipeline import PipelineFactory, PipeLineType, Stage, StageGroup
+from dynapipeline.contexts.aggregates import Counter, SetUnion
+from dynapipeline.contexts.persistent import PersistentContext
+from dynapipeline.contexts.protected import ProtectedContext
+from dynapipeline.contexts.striped import StripedLockContext
+from dynapipeline.contexts.versioned import VersionedContext
+from dynapipeline.execution.cycle_strategies import LoopCycleStrategy, OnceCycleStrategy
+from dynapipeline.execution.strategies import (
+    MultiprocessExecutionStrategy,
+    MultithreadExecutionStrategy,
+    SequentialExecutionStrategy,
+)
+
+
+class EchoStage(Stage):
+    """A stage that returns its own name"""
+
+    async def execute(self, *args, **kwargs):
+        """Returns the name of the stage"""
+        return self.name
+
+
+def make_pipeline(cycles: int = 1, pipeline_type=PipeLineType.SIMPLE, **kwargs):
+    """Creates a pipeline with a single group of two echo stages"""
+    group = StageGroup(
+        name="group",
+        stages=[EchoStage(name="first"), EchoStage(name="second")],
+        cycle_strategy=LoopCycleStrategy(cycles),
+        execution_strategy=SequentialExecutionStrategy(),
+    )
+    return PipelineFactory().create_pipeline(
+        pipeline_type=pipeline_type,
+        name="pipeline",
+        groups=[group],
+        cycle_strategy=OnceCycleStrategy(),
+        execution_strategy=SequentialExecutionStrategy(),
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_pipeline_stats_are_nested():
+    """Test pipeline.stats reports the pipeline, its groups and their stages"""
+    pipeline = make_pipeline(cycles=3)
+
+    await pipeline.run()
+    stats = pipeline.stats()
+
+    assert stats["runs"] == 1
+    assert stats["groups"]["group"]["runs"] == 1
+    assert stats["groups"]["group"]["stages"]["first"]["runs"] == 3
+    assert stats["groups"]["group"]["stages"]["second"]["p99"] is not None
+
+
+@pytest.mark.asyncio
+async def test_custom_pipeline_uses_given_context():
+    """Test a CUSTOM pipeline runs with the context passed to the factory"""
+    context = VersionedContext()
+    pipeline = make_pipeline(
+        pipeline_type=PipeLineType.CUSTOM, context=context, context_data={"a": 1}
+    )
+
+    await pipeline.run()
+
+    assert pipeline.context is context
+    assert pipeline.stage_groups[0].stages[0].context is context
+    assert context["a"] == 1
+
+
+def test_custom_pipeline_requires_context():
+    """Test a CUSTOM pipeline without a context is rejected"""
+    with pytest.raises(ValueError):
+        make_pipeline(pipeline_type=PipeLineType.CUSTOM)
+
+
+class CountingStage(Stage):
+    """A stage incrementing a counter in a thread-safe context"""
+
+    async def execute(self, *args, **kwargs):
+        """Increments the counter"""
+        self.context.update_value("count", lambda value: value + 1)
+
+
+@pytest.mark.asyncio
+async def test_threads_publish_to_striped_context():
+    """Test thread-offloaded stages can write to a StripedLockContext"""
+    group = StageGroup(
+        name="group",
+        stages=[CountingStage(name=f"stage-{i}") for i in range(8)],
+        cycle_strategy=LoopCycleStrategy(5),
+        execution_strategy=MultithreadExecutionStrategy(),
+    )
+    pipeline = PipelineFactory().create_pipeline(
+        pipeline_type=PipeLineType.CUSTOM,
+        name="pipeline",
+        groups=[group],
+        cycle_strategy=OnceCycleStrategy(),
+        execution_strategy=SequentialExecutionStrategy(),
+        context=StripedLockContext({"count": 0}),
+    )
+
+    await pipeline.run()
+
+    assert pipeline.context["count"] == 40
+
+
+class AggregatingStage(Stage):
+    """A stage updating context aggregates without the context lock"""
+
+    async def execute(self, *args, **kwargs):
+        """Counts the run and records the stage name"""
+        self.context["runs"].add()
+        self.context["names"].add(self.name)
+
+
+@pytest.mark.asyncio
+async def test_process_aggregate_updates_are_merged():
+    """Test aggregate updates made in worker processes reach the parent context"""
+    context = ProtectedContext({"runs": Counter(), "names": SetUnion()})
+    group = StageGroup(
+        name="group",
+        stages=[AggregatingStage(name=f"stage-{i}") for i in range(3)],
+        cycle_strategy=LoopCycleStrategy(2),
+        execution_strategy=MultiprocessExecutionStrategy(),
+    )
+    pipeline = PipelineFactory().create_pipeline(
+        pipeline_type=PipeLineType.CUSTOM,
+        name="pipeline",
+        groups=[group],
+        cycle_strategy=OnceCycleStrategy(),
+        execution_strategy=SequentialExecutionStrategy(),
+        context=context,
+    )
+
+    await pipeline.run()
+
+    assert context["runs"].value == 6
+    assert context["names"].value == {"stage-0", "stage-1", "stage-2"}
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_persistent_context(tmp_path):
+    """Test stopping a pipeline forces pending context writes to disk"""
+    context = PersistentContext(str(tmp_path / "context.db"), flush_interval=60)
+    pipeline = make_pipeline(pipeline_type=PipeLineType.CUSTOM, context=context)
+    context["a"] = 1
+
+    pipeline.stop()
+
+    assert context.pending == 0
+    context.close()
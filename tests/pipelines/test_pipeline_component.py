@@ -9,6 +9,7 @@ import pytest
 from dynapipeline.handlers.handler import Handler
 from dynapipeline.handlers.handler_registry import HandlerRegistry
 from dynapipeline.pipelines.component import PipelineComponent
+from dynapipeline.utils.run_record import RunRecord
 
 
 class TestHandler(Handler):
@@ -135,3 +136,66 @@ async def test_run_without_around_handler(
     assert test_handler.around_called is False
     assert test_handler.after_called is True
     assert test_handler.error_called is False
+
+
+@pytest.mark.asyncio
+async def test_run_records_history(test_component):
+    """Test each run appends a RunRecord instead of overwriting attributes"""
+    assert test_component.last_run is None
+    assert test_component.execution_time is None
+
+    await test_component.run()
+    await test_component.run()
+
+    assert len(test_component.run_history) == 2
+    record = test_component.last_run
+    assert record.failed is False
+    assert record.end_ns >= record.start_ns
+    assert test_component.execution_time == record.duration
+
+
+@pytest.mark.asyncio
+async def test_run_history_is_bounded(handler_registry):
+    """Test run history keeps only the configured number of records"""
+    component = TestPipelineComponent(
+        name="bounded", handlers=handler_registry, history_size=2
+    )
+    component.record_run(RunRecord(0, 1))
+    component.record_run(RunRecord(1, 2))
+    component.record_run(RunRecord(2, 3, failed=True))
+
+    assert [record.start_ns for record in component.run_history] == [1, 2]
+    assert component.last_run.failed is True
+
+
+@pytest.mark.asyncio
+async def test_failed_run_is_recorded(test_component):
+    """Test a failing run is recorded as failed"""
+    with pytest.raises(Exception):
+        await test_component.run("fail")
+
+    assert test_component.last_run.failed is True
+
+
+@pytest.mark.asyncio
+async def test_concurrent_runs_record_separately(test_component):
+    """Test concurrent runs of the same instance keep their own records"""
+    await asyncio.gather(test_component.run(), test_component.run())
+
+    assert len(test_component.run_history) == 2
+
+
+@pytest.mark.asyncio
+async def test_stats_reports_percentiles(handler_registry):
+    """Test stats exposes run counters and latency percentiles"""
+    component = TestPipelineComponent(name="stats", handlers=handler_registry)
+    component.record_run(RunRecord(0, 1_000_000))
+    component.record_run(RunRecord(1_000_000, 3_000_000, failed=True))
+
+    stats = component.stats()
+
+    assert stats["runs"] == 2
+    assert stats["errors"] == 1
+    assert stats["p50"] == pytest.approx(0.001, rel=0.05)
+    assert stats["p999"] == pytest.approx(0.002, rel=0.05)
+    assert stats["throughput"] == pytest.approx(2 / 0.003)
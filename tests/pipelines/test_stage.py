@@ -5,6 +5,7 @@ import asyncio
 
 import pytest
 
+from dynapipeline.contexts.protected import ProtectedContext
 from dynapipeline.pipelines.stage import Stage
 
 
@@ -71,3 +72,96 @@ async def test_stage_with_negative_timeout(test_stage):
 
     result = await test_stage.run()
     assert result == "result"
+
+
+class SumStage(Stage):
+    """A stage adding two context values and counting its executions"""
+
+    executions: int = 0
+
+    async def execute(self, *args, **kwargs):
+        """Returns the sum of a and b"""
+        self.executions += 1
+        return self.context["a"] + self.context["b"]
+
+
+@pytest.mark.asyncio
+async def test_reactive_stage_skips_unchanged_inputs():
+    """Test a reactive stage only re-runs when a key it read changes"""
+    context = ProtectedContext({"a": 1, "b": 2, "other": 0})
+    stage = SumStage(name="sum", context=context, reactive=True)
+
+    assert await stage.run() == 3
+    context["other"] = 1
+    assert await stage.run() == 3
+    assert stage.executions == 1
+    assert stage.stats()["reactive_skips"] == 1
+
+    context["b"] = 5
+    assert await stage.run() == 6
+    assert stage.executions == 2
+
+
+class TotalStage(Stage):
+    """A stage adding every context value and counting its executions"""
+
+    executions: int = 0
+
+    async def execute(self, *args, **kwargs):
+        """Returns the sum of all values"""
+        self.executions += 1
+        return sum(self.context.values())
+
+
+class ConstantStage(Stage):
+    """A stage reading no context key and counting its executions"""
+
+    executions: int = 0
+
+    async def execute(self, *args, **kwargs):
+        """Returns the number of executions"""
+        self.executions += 1
+        return self.executions
+
+
+@pytest.mark.asyncio
+async def test_reactive_stage_tracks_bulk_reads():
+    """Test a stage reading the whole context re-runs when any key changes"""
+    context = ProtectedContext({"a": 1, "b": 2})
+    stage = TotalStage(name="total", context=context, reactive=True)
+
+    assert await stage.run() == 3
+    assert await stage.run() == 3
+    assert stage.executions == 1
+
+    context["c"] = 4
+    assert await stage.run() == 7
+    assert stage.executions == 2
+
+
+@pytest.mark.asyncio
+async def test_reactive_stage_without_reads_always_runs():
+    """Test a stage that read no key is not skipped, its inputs are unknown"""
+    context = ProtectedContext({"a": 1})
+    stage = ConstantStage(name="constant", context=context, reactive=True)
+
+    await stage.run()
+    assert await stage.run() == 2
+
+
+@pytest.mark.asyncio
+async def test_reactive_stage_uses_declared_dependencies():
+    """Test declared dependencies replace the tracked reads"""
+    context = ProtectedContext({"a": 1, "b": 2})
+    stage = SumStage(name="sum", context=context, reactive=True, depends_on=["a"])
+
+    await stage.run()
+    context["b"] = 10
+    assert await stage.run() == 3
+
+    context["a"] = 2
+    assert await stage.run() == 12
+
+    stage.invalidate()
+    await stage.run()
+    assert stage.executions == 3
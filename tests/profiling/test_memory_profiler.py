@@ -0,0 +1,126 @@
+"""This module provides tests for MemoryProfilerHandler"""
+import pytest
+
+from dynapipeline import StageGroup
+from dynapipeline.execution.cycle_strategies import OnceCycleStrategy
+from dynapipeline.execution.strategies import SequentialExecutionStrategy
+from dynapipeline.handlers.handler import Handler
+from dynapipeline.pipelines.stage import Stage
+from dynapipeline.profiling.memory import attach_memory_profiler
+from dynapipeline.utils.handler_types import HandlerType
+
+LEAK = []
+
+
+class LeakingStage(Stage):
+    """A stage keeping a reference to everything it allocates"""
+
+    async def execute(self, *args, **kwargs):
+        """Allocates and retains 100KB"""
+        LEAK.append(bytearray(100_000))
+
+
+class TidyStage(Stage):
+    """A stage freeing everything it allocates"""
+
+    async def execute(self, *args, **kwargs):
+        """Allocates and drops 100KB"""
+        data = bytearray(100_000)
+        return len(data)
+
+
+class CountingStage(Stage):
+    """A stage counting its executions"""
+
+    calls: int = 0
+
+    async def execute(self, *args, **kwargs):
+        """Counts the call"""
+        self.calls += 1
+
+
+@pytest.mark.asyncio
+async def test_retained_allocations_are_attributed():
+    """Test the leaking stage reports growth and its allocation site"""
+    leaking, tidy = LeakingStage(name="leaking"), TidyStage(name="tidy")
+    handler = attach_memory_profiler([leaking, tidy], sample_every=2, window=5)
+    try:
+        for _ in range(10):
+            await leaking.run()
+            await tidy.run()
+        report = handler.report()
+        growth = handler.growth()
+    finally:
+        handler.stop()
+        LEAK.clear()
+
+    assert report[leaking.id]["name"] == "leaking"
+    assert report[leaking.id]["sampled_runs"] == 5
+    assert report[leaking.id]["retained"] >= 5 * 100_000
+    assert "test_memory_profiler.py" in report[leaking.id]["top_sites"][0][0]
+    assert report[tidy.id]["retained"] < 100_000
+    assert any("test_memory_profiler.py" in site for site, _ in growth)
+
+
+@pytest.mark.asyncio
+async def test_stop_detaches_handler():
+    """Test stopping removes the handler from the component"""
+    stage = TidyStage(name="tidy")
+    handler = attach_memory_profiler([stage])
+
+    handler.stop()
+
+    assert not stage.handlers.get(HandlerType.BEFORE)
+
+
+@pytest.mark.asyncio
+async def test_stages_with_the_same_name_are_reported_separately():
+    """Test the report is keyed by component id so equal names do not collide"""
+    first, second = TidyStage(name="tidy"), TidyStage(name="tidy")
+    handler = attach_memory_profiler([first, second], sample_every=1)
+    try:
+        await first.run()
+        await second.run()
+        report = handler.report()
+    finally:
+        handler.stop()
+
+    assert set(report) == {first.id, second.id}
+    assert all(summary["sampled_runs"] == 1 for summary in report.values())
+
+
+@pytest.mark.asyncio
+async def test_instrumented_stage_executes_once():
+    """Test memory profiling a stage with a handler does not run execute more often"""
+    stage = CountingStage(name="counting")
+    stage.handlers.attach([Handler()])
+    handler = attach_memory_profiler([stage], sample_every=1)
+    try:
+        await stage.run()
+    finally:
+        handler.stop()
+
+    assert stage.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_nested_stage_does_not_take_the_group_sample():
+    """Test a sample started by a group is finished by the group, not its stages"""
+    stage = LeakingStage(name="leaking")
+    group = StageGroup(
+        name="group",
+        stages=[stage],
+        cycle_strategy=OnceCycleStrategy(),
+        execution_strategy=SequentialExecutionStrategy(),
+    )
+    handler = attach_memory_profiler([group, stage], sample_every=1)
+    try:
+        await group.run()
+        report = handler.report()
+    finally:
+        handler.stop()
+        LEAK.clear()
+
+    assert set(report) == {group.id}
+    assert report[group.id]["sampled_runs"] == 1
+    assert report[group.id]["retained"] >= 100_000
@@ -0,0 +1,137 @@
+"""This module provides tests for ProfilerHandler"""
+import time
+
+import pytest
+
+from dynapipeline import StageGroup
+from dynapipeline.execution.cycle_strategies import OnceCycleStrategy
+from dynapipeline.execution.strategies import SequentialExecutionStrategy
+from dynapipeline.handlers.handler import Handler
+from dynapipeline.pipelines.stage import Stage
+from dynapipeline.profiling.handler import attach_profiler
+from dynapipeline.utils.handler_types import HandlerType
+from dynapipeline.utils.profiler_modes import ProfilerMode
+
+
+def burn(seconds: float) -> int:
+    """Keeps the CPU busy for the given time"""
+    total = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+class BusyStage(Stage):
+    """A stage doing synchronous CPU work"""
+
+    async def execute(self, *args, **kwargs):
+        """Burns CPU for a short time"""
+        return burn(0.05)
+
+
+class QuickStage(Stage):
+    """A stage returning immediately"""
+
+    async def execute(self, *args, **kwargs):
+        """Returns a constant"""
+        return 1
+
+
+@pytest.mark.asyncio
+async def test_sampling_profiler_writes_collapsed_stacks(tmp_path):
+    """Test sampled stacks pass through the stage's execute"""
+    stage = BusyStage(name="busy")
+    output = tmp_path / "busy.collapsed"
+    handler = attach_profiler([stage], str(output), interval=0.001)
+
+    await stage.run()
+    handler.stop()
+
+    lines = output.read_text().splitlines()
+    assert lines
+    assert all("execute (test_profiler_handler.py" in line for line in lines)
+    assert any("burn" in line for line in lines)
+    assert not handler.active
+    assert not stage.handlers.get(HandlerType.BEFORE)
+
+
+@pytest.mark.asyncio
+async def test_cprofile_profiler_writes_collapsed_stacks(tmp_path):
+    """Test cProfile output is converted to caller;callee stacks"""
+    stage = BusyStage(name="busy")
+    output = tmp_path / "busy.collapsed"
+    handler = attach_profiler([stage], str(output), mode=ProfilerMode.CPROFILE)
+
+    await stage.run()
+    handler.stop()
+
+    text = output.read_text()
+    assert "execute (test_profiler_handler.py" in text
+    assert "burn (test_profiler_handler.py" in text
+    assert (tmp_path / "busy.collapsed.prof").exists()
+
+
+@pytest.mark.asyncio
+async def test_profiler_detaches_after_duration(tmp_path):
+    """Test the profiler stops itself once its duration is over"""
+    stage = BusyStage(name="busy")
+    output = tmp_path / "busy.collapsed"
+    handler = attach_profiler(
+        [stage], str(output), mode=ProfilerMode.CPROFILE, duration=0.01
+    )
+    time.sleep(0.02)
+
+    await stage.run()
+
+    assert not handler.active
+    assert output.exists()
+    assert not stage.handlers.get(HandlerType.BEFORE)
+
+
+class CountingStage(Stage):
+    """A stage counting its executions"""
+
+    calls: int = 0
+
+    async def execute(self, *args, **kwargs):
+        """Counts the call"""
+        self.calls += 1
+        return self.calls
+
+
+@pytest.mark.asyncio
+async def test_profiled_stage_executes_once(tmp_path):
+    """Test profiling a stage with a handler does not run execute more often"""
+    stage = CountingStage(name="counting")
+    stage.handlers.attach([Handler()])
+    handler = attach_profiler([stage], str(tmp_path / "counting.collapsed"))
+
+    await stage.run()
+    handler.stop()
+
+    assert stage.calls == 1
+    assert len(stage.handlers.get(HandlerType.AROUND)) == 1
+
+
+@pytest.mark.asyncio
+async def test_nested_stage_keeps_group_profiled(tmp_path):
+    """Test a stage finishing inside a profiled group does not stop its profile"""
+    stage = QuickStage(name="quick")
+    group = StageGroup(
+        name="group",
+        stages=[stage],
+        cycle_strategy=OnceCycleStrategy(),
+        execution_strategy=SequentialExecutionStrategy(),
+    )
+    output = tmp_path / "group.collapsed"
+    handler = attach_profiler([group, stage], str(output), mode=ProfilerMode.CPROFILE)
+
+    handler.before(group)
+    handler.before(stage)
+    await handler.after(stage, 1)
+    burn(0.05)
+    await handler.after(group, None)
+    handler.stop()
+
+    assert "burn (test_profiler_handler.py" in output.read_text()
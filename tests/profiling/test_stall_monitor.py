@@ -0,0 +1,100 @@
+"""This module provides tests for LoopStallMonitor"""
+import asyncio
+import time
+
+import pytest
+
+from dynapipeline import PipelineFactory, PipeLineType, Stage, StageGroup
+from dynapipeline.execution.cycle_strategies import LoopCycleStrategy, OnceCycleStrategy
+from dynapipeline.execution.strategies import (
+    ConcurrentExecutionStrategy,
+    SequentialExecutionStrategy,
+)
+from dynapipeline.profiling.stall_monitor import LoopStallMonitor
+
+
+class BlockingStage(Stage):
+    """A stage blocking the event loop with synchronous work"""
+
+    async def execute(self, *args, **kwargs):
+        """Sleeps synchronously"""
+        time.sleep(0.15)
+        return "blocked"
+
+
+class PoliteStage(Stage):
+    """A stage that yields to the event loop"""
+
+    async def execute(self, *args, **kwargs):
+        """Sleeps asynchronously"""
+        await asyncio.sleep(0.01)
+        return "polite"
+
+
+def make_pipeline(cycles: int, offload_safe: bool = False):
+    """Creates a pipeline with a blocking and a polite stage"""
+    group = StageGroup(
+        name="group",
+        stages=[
+            BlockingStage(name="blocking", offload_safe=offload_safe),
+            PoliteStage(name="polite"),
+        ],
+        cycle_strategy=LoopCycleStrategy(cycles),
+        execution_strategy=ConcurrentExecutionStrategy(),
+    )
+    return PipelineFactory().create_pipeline(
+        pipeline_type=PipeLineType.SIMPLE,
+        name="pipeline",
+        groups=[group],
+        cycle_strategy=OnceCycleStrategy(),
+        execution_strategy=SequentialExecutionStrategy(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_stall_is_attributed_to_blocking_stage():
+    """Test stalls are recorded for the stage that blocked the loop"""
+    pipeline = make_pipeline(cycles=2)
+    stage = pipeline.stage_groups[0].stages[0]
+    async with LoopStallMonitor(pipeline, threshold=0.05, interval=0.01) as monitor:
+        await pipeline.run()
+        await asyncio.sleep(0.05)
+
+    report = monitor.report()
+    assert list(report) == [stage.id]
+    assert report[stage.id]["name"] == "blocking"
+    assert report[stage.id]["stalls"] == 2
+    assert report[stage.id]["max"] >= 0.1
+    assert report[stage.id]["offloaded"] is False
+
+
+@pytest.mark.asyncio
+async def test_repeat_offender_is_offloaded():
+    """Test an offload-safe stage is moved to a thread after offload_after stalls"""
+    pipeline = make_pipeline(cycles=4, offload_safe=True)
+    stage = pipeline.stage_groups[0].stages[0]
+    async with LoopStallMonitor(
+        pipeline, threshold=0.05, interval=0.01, offload_after=2
+    ) as monitor:
+        await pipeline.run()
+        await asyncio.sleep(0.05)
+
+    assert stage.offload is True
+    assert monitor.report()[stage.id]["stalls"] == 2
+    assert stage.stats()["runs"] == 4
+
+
+@pytest.mark.asyncio
+async def test_stage_not_marked_offload_safe_is_not_offloaded(caplog):
+    """Test stages that may use loop-bound primitives only get a suggestion"""
+    pipeline = make_pipeline(cycles=3)
+    stage = pipeline.stage_groups[0].stages[0]
+    async with LoopStallMonitor(
+        pipeline, threshold=0.05, interval=0.01, offload_after=2
+    ) as monitor:
+        await pipeline.run()
+        await asyncio.sleep(0.05)
+
+    assert stage.offload is False
+    assert monitor.report()[stage.id]["stalls"] == 3
+    assert sum("offload_safe=True" in message for message in caplog.messages) == 1
@@ -0,0 +1,174 @@
+""" Contains tests for admission control"""
+import asyncio
+
+import pytest
+
+from dynapipeline import PipelineFactory, PipeLineType, Stage, StageGroup
+from dynapipeline.exceptions.resilience import AdmissionRejectedError
+from dynapipeline.execution.cycle_strategies import (
+    OnceCycleStrategy,
+    TriggeredCycleStrategy,
+)
+from dynapipeline.execution.strategies import SequentialExecutionStrategy
+from dynapipeline.execution.triggers import QueueTrigger
+from dynapipeline.metrics.openmetrics import render_openmetrics
+from dynapipeline.resilience import AdmissionController
+from dynapipeline.utils.shed_reasons import ShedReason
+
+
+class LaggingMonitor:
+    """Stands in for a LoopStallMonitor reporting a fixed lag"""
+
+    lag = 0.5
+
+
+class ConsumeStage(Stage):
+    """A stage processing every admitted item"""
+
+    admission: AdmissionController
+
+    async def execute(self, *args, **kwargs):
+        """Processes the queued items"""
+        items = []
+        while not self.admission.empty():
+            items.append(await self.admission.get())
+            self.admission.done()
+        return items
+
+
+@pytest.mark.asyncio
+async def test_items_are_served_by_priority():
+    """Test higher priority items are taken first, in order of arrival"""
+    admission = AdmissionController()
+    admission.submit("low")
+    admission.submit("high", priority=5)
+    admission.submit("low2")
+
+    assert [await admission.get() for _ in range(3)] == ["high", "low", "low2"]
+
+
+@pytest.mark.asyncio
+async def test_in_flight_limit_holds_back_items():
+    """Test get waits until a taken item is done when max_in_flight are taken"""
+    admission = AdmissionController(max_in_flight=1)
+    admission.submit(1)
+    admission.submit(2)
+
+    assert await admission.get() == 1
+    waiter = asyncio.create_task(admission.get())
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+
+    admission.done()
+    assert await asyncio.wait_for(waiter, timeout=1) == 2
+    assert admission.in_flight == 1
+
+
+def test_full_queue_sheds_lowest_priority():
+    """Test a full queue evicts a lower priority item and rejects equal ones"""
+    shed = []
+    admission = AdmissionController(
+        max_queue=2, on_shed=lambda item, reason: shed.append((item, reason))
+    )
+    admission.submit("a")
+    admission.submit("b")
+
+    with pytest.raises(AdmissionRejectedError) as error:
+        admission.submit("c")
+    assert error.value.reason == "queue_full"
+
+    admission.submit("urgent", priority=1)
+    assert shed == [("b", ShedReason.QUEUE_FULL)]
+    assert admission.shed[ShedReason.QUEUE_FULL] == 2
+    assert admission.qsize() == 2
+
+
+def test_loop_lag_rejects_non_critical_items():
+    """Test items are rejected while the loop lags, except critical ones"""
+    admission = AdmissionController(
+        lag_monitor=LaggingMonitor(), max_lag=0.1, critical_priority=10
+    )
+
+    with pytest.raises(AdmissionRejectedError):
+        admission.submit("bulk")
+    admission.submit("control", priority=10)
+
+    assert admission.shed[ShedReason.LOOP_LAG] == 1
+    assert admission.qsize() == 1
+
+
+@pytest.mark.asyncio
+async def test_standing_queue_sheds_delayed_items():
+    """Test items waiting beyond the target are shed once the delay persisted an interval"""
+    admission = AdmissionController(target_delay=0.01, interval=0.02)
+    for item in range(5):
+        admission.submit(item)
+    await asyncio.sleep(0.03)
+
+    assert await admission.get() == 0
+    await asyncio.sleep(0.03)
+    assert admission.overloaded
+    admission.submit("fresh")
+
+    assert await admission.get() == "fresh"
+    assert admission.shed[ShedReason.QUEUE_DELAY] == 4
+
+
+@pytest.mark.asyncio
+async def test_short_queue_delay_is_not_shed():
+    """Test items are not shed while the queue drains within the target"""
+    admission = AdmissionController(target_delay=0.01, interval=0.0)
+    admission.submit(1)
+    admission.submit(2)
+
+    assert [await admission.get(), await admission.get()] == [1, 2]
+    assert not admission.overloaded
+    assert admission.shed[ShedReason.QUEUE_DELAY] == 0
+
+
+@pytest.mark.asyncio
+async def test_pipeline_submit_feeds_triggered_group():
+    """Test items submitted to a pipeline wake up and feed a triggered group"""
+    admission = AdmissionController()
+    stage = ConsumeStage(name="consume", admission=admission)
+    group = StageGroup(
+        name="g",
+        stages=[stage],
+        cycle_strategy=TriggeredCycleStrategy([QueueTrigger(admission)], cycles=1),
+        execution_strategy=SequentialExecutionStrategy(),
+    )
+    pipeline = PipelineFactory().create_pipeline(
+        pipeline_type=PipeLineType.SIMPLE,
+        name="p",
+        groups=[group],
+        cycle_strategy=OnceCycleStrategy(),
+        execution_strategy=SequentialExecutionStrategy(),
+        admission=admission,
+    )
+
+    task = asyncio.create_task(pipeline.run())
+    await asyncio.sleep(0.01)
+    pipeline.submit("job", priority=1)
+    results = await asyncio.wait_for(task, timeout=1)
+
+    assert results == [[[["job"]]]]
+    assert pipeline.stats()["admission"]["admitted"] == 1
+    text = render_openmetrics([pipeline])
+    assert (
+        'dynapipeline_admission_shed_total{kind="pipeline",path="p",reason="loop_lag"} 0'
+        in text
+    )
+
+
+def test_submit_requires_admission_controller():
+    """Test submitting to a pipeline without admission control fails"""
+    pipeline = PipelineFactory().create_pipeline(
+        pipeline_type=PipeLineType.SIMPLE,
+        name="p",
+        groups=[],
+        cycle_strategy=OnceCycleStrategy(),
+        execution_strategy=SequentialExecutionStrategy(),
+    )
+
+    with pytest.raises(RuntimeError):
+        pipeline.submit("job")
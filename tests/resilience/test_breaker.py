@@ -0,0 +1,206 @@
+""" Contains tests for stages with a circuit breaker"""
+import asyncio
+import pickle
+
+import pytest
+
+from dynapipeline import Stage
+from dynapipeline.exceptions.resilience import CircuitOpenError
+from dynapipeline.handlers.handler import Handler
+from dynapipeline.resilience import CircuitBreaker, RetryPolicy
+from dynapipeline.utils.circuit_states import CircuitState
+
+
+class FlakyStage(Stage):
+    """A stage that fails while `failing` is set"""
+
+    failing: bool = True
+    delay: float = 0.0
+    calls: int = 0
+
+    async def execute(self, *args, **kwargs):
+        """Fails or returns the number of calls"""
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.failing:
+            raise ConnectionError("dependency down")
+        return self.calls
+
+
+class ChangeRecorder(Handler):
+    """Records the state changes of circuit breakers"""
+
+    changes: list = []
+
+    def on_circuit_change(self, component, previous, state):
+        """Stores the change"""
+        self.changes.append((previous, state))
+
+
+async def _fail(stage: Stage, runs: int):
+    """Runs a failing stage the given number of times"""
+    for _ in range(runs):
+        with pytest.raises(ConnectionError):
+            await stage.run()
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_and_fails_fast():
+    """Test the breaker opens at the failure rate and rejects without executing"""
+    recorder = ChangeRecorder(changes=[])
+    breaker = CircuitBreaker(min_runs=4, window_size=4, open_duration=60)
+    stage = FlakyStage(name="fetch", circuit_breaker=breaker)
+    stage.handlers.register("on_circuit_change", [recorder.on_circuit_change])
+
+    await _fail(stage, 4)
+    assert breaker.state is CircuitState.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        await stage.run()
+    assert stage.calls == 4
+    stats = stage.stats()
+    assert stats["circuit_opened"] == 1
+    assert stats["circuit_rejections"] == 1
+    assert recorder.changes == [(CircuitState.CLOSED, CircuitState.OPEN)]
+
+
+@pytest.mark.asyncio
+async def test_breaker_needs_min_runs():
+    """Test failures below min_runs keep the breaker closed"""
+    breaker = CircuitBreaker(min_runs=5, window_size=10)
+    stage = FlakyStage(name="fetch", circuit_breaker=breaker)
+
+    await _fail(stage, 4)
+    assert breaker.state is CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_returns_fallback():
+    """Test rejected runs return the fallback result when one is given"""
+    breaker = CircuitBreaker(min_runs=2, window_size=2, open_duration=60, fallback=None)
+    stage = FlakyStage(name="fetch", circuit_breaker=breaker)
+
+    await _fail(stage, 2)
+    assert await stage.run() is None
+    assert stage.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_half_open_trial_closes_breaker():
+    """Test a successful trial run after open_duration closes the breaker"""
+    recorder = ChangeRecorder(changes=[])
+    breaker = CircuitBreaker(min_runs=2, window_size=2, open_duration=0.05)
+    stage = FlakyStage(name="fetch", circuit_breaker=breaker)
+    stage.handlers.register("on_circuit_change", [recorder.on_circuit_change])
+
+    await _fail(stage, 2)
+    await asyncio.sleep(0.06)
+    stage.failing = False
+
+    assert await stage.run() == 3
+    assert breaker.state is CircuitState.CLOSED
+    assert recorder.changes == [
+        (CircuitState.CLOSED, CircuitState.OPEN),
+        (CircuitState.OPEN, CircuitState.HALF_OPEN),
+        (CircuitState.HALF_OPEN, CircuitState.CLOSED),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_failed_trial_reopens_breaker():
+    """Test a failed trial run opens the breaker again"""
+    breaker = CircuitBreaker(min_runs=2, window_size=2, open_duration=0.05)
+    stage = FlakyStage(name="fetch", circuit_breaker=breaker)
+
+    await _fail(stage, 2)
+    await asyncio.sleep(0.06)
+    await _fail(stage, 1)
+
+    assert breaker.state is CircuitState.OPEN
+    assert stage.stats()["circuit_opened"] == 2
+
+
+@pytest.mark.asyncio
+async def test_half_open_limits_trial_runs():
+    """Test only half_open_runs runs are admitted while half open"""
+    breaker = CircuitBreaker(min_runs=1, window_size=1, open_duration=0.0)
+    stage = FlakyStage(name="fetch", circuit_breaker=breaker)
+    await _fail(stage, 1)
+    stage.failing, stage.delay = False, 0.05
+
+    results = await asyncio.gather(stage.run(), stage.run(), return_exceptions=True)
+
+    assert results[0] == 2
+    assert isinstance(results[1], CircuitOpenError)
+    assert breaker.state is CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_slow_runs_open_breaker():
+    """Test runs slower than slow_duration open the breaker at the slow rate"""
+    breaker = CircuitBreaker(
+        min_runs=2, window_size=2, slow_duration=0.01, slow_rate=1.0, open_duration=60
+    )
+    stage = FlakyStage(name="fetch", circuit_breaker=breaker, failing=False, delay=0.02)
+
+    await stage.run()
+    await stage.run()
+
+    assert breaker.state is CircuitState.OPEN
+
+
+class RecoveringStage(Stage):
+    """A fast stage failing its first attempt of every run"""
+
+    calls: int = 0
+
+    async def execute(self, *args, **kwargs):
+        """Fails on odd calls"""
+        self.calls += 1
+        if self.calls % 2:
+            raise ConnectionError("transient")
+        return self.calls
+
+
+class FixedBackoff(RetryPolicy):
+    """A retry policy waiting 50ms before every retry"""
+
+    def backoff(self, attempt: int) -> float:
+        """Returns a fixed wait"""
+        return 0.05
+
+
+@pytest.mark.asyncio
+async def test_retry_backoff_does_not_count_as_slow():
+    """Test only the attempts of a retried run are timed by the breaker"""
+    breaker = CircuitBreaker(
+        min_runs=2, window_size=2, slow_duration=0.02, slow_rate=1.0, open_duration=60
+    )
+    retry = FixedBackoff(max_attempts=2)
+    stage = RecoveringStage(name="fetch", circuit_breaker=breaker, retry=retry)
+
+    await stage.run()
+    await stage.run()
+
+    assert stage.stats()["retries"] == 2
+    assert breaker.state is CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_breaker_ignores_other_errors():
+    """Test errors outside failure_on do not count as failures"""
+    breaker = CircuitBreaker(min_runs=2, window_size=2, failure_on=(TimeoutError,))
+    stage = FlakyStage(name="fetch", circuit_breaker=breaker)
+
+    await _fail(stage, 3)
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_breaker_pickles():
+    """Test a breaker can be sent to worker processes"""
+    breaker = CircuitBreaker(min_runs=3)
+    copy = pickle.loads(pickle.dumps(breaker))
+
+    assert copy.min_runs == 3
+    assert copy.acquire() is not None
@@ -0,0 +1,160 @@
+""" Contains tests for hedged stages"""
+import asyncio
+
+import pytest
+
+from dynapipeline import Stage, StageGroup
+from dynapipeline.execution.cycle_strategies import (
+    LoopCycleStrategy,
+    OnceCycleStrategy,
+)
+from dynapipeline.execution.strategies import (
+    SemaphoreExecutionStrategy,
+    SequentialExecutionStrategy,
+)
+from dynapipeline.resilience import HedgePolicy
+
+
+class SlowTailStage(Stage):
+    """A stage whose listed runs are slow"""
+
+    slow_runs: list = []
+    delay: float = 0.5
+    calls: int = 0
+
+    async def execute(self, *args, **kwargs):
+        """Sleeps for a long time on the slow runs"""
+        self.calls += 1
+        if self.calls in self.slow_runs:
+            await asyncio.sleep(self.delay)
+        return self.calls
+
+
+@pytest.mark.asyncio
+async def test_slow_run_is_hedged():
+    """Test a run slower than the threshold is duplicated and the duplicate wins"""
+    policy = HedgePolicy(min_samples=10, max_rate=0.5, min_delay=0.01, refresh_every=1)
+    stage = SlowTailStage(name="io", hedge=policy, slow_runs=[11])
+    for _ in range(10):
+        await stage.run()
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    result = await stage.run()
+
+    assert loop.time() - start < 0.25
+    assert result == 12
+    stats = stage.stats()
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+    assert stats["runs"] == 11
+    assert stats["errors"] == 0
+
+
+@pytest.mark.asyncio
+async def test_hedge_rate_is_capped():
+    """Test no hedge is started once the hedge budget is used up"""
+    policy = HedgePolicy(min_samples=1, max_rate=0.0, refresh_every=1)
+    stage = SlowTailStage(name="io", hedge=policy, slow_runs=[2], delay=0.05)
+
+    await stage.run()
+    assert await stage.run() == 2
+    assert "hedges" not in stage.stats()
+
+
+@pytest.mark.asyncio
+async def test_no_hedging_without_samples():
+    """Test runs are not hedged before enough latencies were recorded"""
+    stage = SlowTailStage(name="io", hedge=HedgePolicy(), slow_runs=[1], delay=0.05)
+
+    assert await stage.run() == 1
+    assert stage.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_hedge_inside_overlapped_cycles():
+    """Test the hedged copy does not wait for the cycle turn held by its primary"""
+    policy = HedgePolicy(min_samples=10, max_rate=0.5, min_delay=0.01, refresh_every=1)
+    stage = SlowTailStage(name="io", hedge=policy, slow_runs=[11])
+    for _ in range(10):
+        await stage.run()
+    group = StageGroup(
+        name="g",
+        stages=[stage],
+        cycle_strategy=LoopCycleStrategy(2, overlap=2),
+        execution_strategy=SequentialExecutionStrategy(),
+    )
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await asyncio.wait_for(group.run(), timeout=1)
+
+    assert loop.time() - start < 0.25
+    assert stage.stats()["hedge_wins"] == 1
+
+
+async def run_in_semaphore_group(stage, max_concurrent):
+    """Runs a warmed up stage once in a group limited by a semaphore"""
+    for _ in range(10):
+        await stage.run()
+    strategy = SemaphoreExecutionStrategy(max_concurrent)
+    group = StageGroup(
+        name="g",
+        stages=[stage],
+        cycle_strategy=OnceCycleStrategy(),
+        execution_strategy=strategy,
+    )
+    await group.run()
+    return strategy
+
+
+@pytest.mark.asyncio
+async def test_hedge_is_skipped_without_a_free_slot():
+    """Test the duplicate is not started beyond the concurrency limit"""
+    policy = HedgePolicy(min_samples=10, max_rate=0.5, min_delay=0.01, refresh_every=1)
+    stage = SlowTailStage(name="io", hedge=policy, slow_runs=[11], delay=0.05)
+
+    await run_in_semaphore_group(stage, max_concurrent=1)
+
+    assert stage.calls == 11
+    assert stage.stats()["hedges_skipped"] == 1
+    assert "hedges" not in stage.stats()
+
+
+@pytest.mark.asyncio
+async def test_hedge_holds_a_slot_of_its_own():
+    """Test the duplicate takes a free slot and gives it back"""
+    policy = HedgePolicy(min_samples=10, max_rate=0.5, min_delay=0.01, refresh_every=1)
+    stage = SlowTailStage(name="io", hedge=policy, slow_runs=[11])
+
+    strategy = await run_in_semaphore_group(stage, max_concurrent=2)
+
+    assert stage.stats()["hedge_wins"] == 1
+    assert strategy.semaphore._value == 2
+
+
+@pytest.mark.asyncio
+async def test_threshold_follows_recent_runs():
+    """Test the threshold drops once slow runs leave the run history"""
+    policy = HedgePolicy(min_samples=10, max_rate=0.0, refresh_every=1)
+    stage = SlowTailStage(
+        name="io",
+        hedge=policy,
+        history_size=10,
+        slow_runs=list(range(1, 21)),
+        delay=0.02,
+    )
+    for _ in range(20):
+        await stage.run()
+    assert stage._hedge_delay >= 0.02
+
+    for _ in range(11):
+        await stage.run()
+
+    assert stage._hedge_delay < 0.01
+
+
+def test_min_samples_must_fit_the_run_history():
+    """Test a hedge policy needing more samples than the history keeps is rejected"""
+    with pytest.raises(ValueError):
+        SlowTailStage(name="io", hedge=HedgePolicy(min_samples=40), history_size=32)
@@ -0,0 +1,93 @@
+""" Contains tests for retrying stages"""
+import asyncio
+
+import pytest
+
+from dynapipeline import Stage, StageGroup
+from dynapipeline.execution.cycle_strategies import LoopCycleStrategy
+from dynapipeline.execution.strategies import (
+    SemaphoreExecutionStrategy,
+    SequentialExecutionStrategy,
+)
+from dynapipeline.resilience import RetryPolicy
+
+
+class FlakyStage(Stage):
+    """A stage failing a number of times before it succeeds"""
+
+    failures: int = 0
+    error: type = ConnectionError
+    attempts: int = 0
+
+    async def execute(self, *args, **kwargs):
+        """Fails until the configured number of failures is reached"""
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise self.error("transient")
+        return asyncio.get_running_loop().time()
+
+
+def test_backoff_uses_full_jitter():
+    """Test backoff delays stay below the exponential cap"""
+    policy = RetryPolicy(base_delay=0.1, max_delay=0.3)
+
+    assert all(0 <= policy.backoff(1) <= 0.1 for _ in range(100))
+    assert all(0 <= policy.backoff(5) <= 0.3 for _ in range(100))
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried():
+    """Test a stage succeeds after transient failures and counts the retries"""
+    stage = FlakyStage(name="flaky", failures=2, retry=RetryPolicy(base_delay=0.01))
+
+    await stage.run()
+
+    assert stage.attempts == 3
+    stats = stage.stats()
+    assert stats["retries"] == 2
+    assert stats["errors"] == 2
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_errors_and_exhausted_attempts_raise():
+    """Test errors outside retry_on and the last failed attempt are raised"""
+    policy = RetryPolicy(base_delay=0, retry_on=(ConnectionError,))
+    wrong_error = FlakyStage(name="flaky", failures=1, error=ValueError, retry=policy)
+    exhausted = FlakyStage(name="flaky", failures=5, retry=policy)
+
+    with pytest.raises(ValueError):
+        await wrong_error.run()
+    with pytest.raises(ConnectionError):
+        await exhausted.run()
+    assert wrong_error.attempts == 1
+    assert exhausted.attempts == 3
+
+
+@pytest.mark.asyncio
+async def test_backoff_releases_semaphore_slot():
+    """Test other stages use the slot while a stage waits to retry"""
+    policy = RetryPolicy(base_delay=0.2, max_delay=0.2, multiplier=1)
+    flaky = FlakyStage(name="flaky", failures=1, retry=policy)
+    healthy = FlakyStage(name="healthy")
+
+    finished = await SemaphoreExecutionStrategy(1).execute([flaky, healthy])
+
+    assert finished[1] < finished[0]
+
+
+@pytest.mark.asyncio
+async def test_retry_inside_overlapped_cycles():
+    """Test a retried attempt keeps the cycle turn of its stage"""
+    stage = FlakyStage(name="flaky", failures=1, retry=RetryPolicy(base_delay=0))
+    group = StageGroup(
+        name="g",
+        stages=[stage],
+        cycle_strategy=LoopCycleStrategy(3, overlap=2),
+        execution_strategy=SequentialExecutionStrategy(),
+    )
+
+    results = await asyncio.wait_for(group.run(), timeout=1)
+
+    assert len(results) == 3
+    assert stage.attempts == 4
+    assert stage.stats()["retries"] == 1
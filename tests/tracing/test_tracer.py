@@ -0,0 +1,175 @@
+"""This module provides tests for Tracer"""
+import json
+
+import pytest
+
+from dynapipeline import PipelineFactory, PipeLineType, Stage, StageGroup
+from dynapipeline.execution.cycle_strategies import LoopCycleStrategy, OnceCycleStrategy
+from dynapipeline.execution.strategies import (
+    MultiprocessExecutionStrategy,
+    MultithreadExecutionStrategy,
+    SequentialExecutionStrategy,
+)
+from dynapipeline.tracing.exporters import ChromeTraceExporter, OTLPJsonExporter
+from dynapipeline.tracing.tracer import Tracer, trace_span
+
+
+class EchoStage(Stage):
+    """A stage that returns its own name"""
+
+    async def execute(self, *args, **kwargs):
+        """Returns the name of the stage"""
+        return self.name
+
+
+def make_pipeline(tracer, strategy=None, pipeline_type=PipeLineType.SIMPLE):
+    """Creates a traced pipeline with one group of two stages"""
+    group = StageGroup(
+        name="group",
+        stages=[EchoStage(name="first"), EchoStage(name="second")],
+        cycle_strategy=LoopCycleStrategy(2),
+        execution_strategy=strategy or SequentialExecutionStrategy(),
+    )
+    return PipelineFactory().create_pipeline(
+        pipeline_type=pipeline_type,
+        name="pipeline",
+        groups=[group],
+        cycle_strategy=OnceCycleStrategy(),
+        execution_strategy=SequentialExecutionStrategy(),
+        tracer=tracer,
+    )
+
+
+def by_name(spans):
+    """Indexes spans by name, keeping the last one"""
+    return {span.name: span for span in spans}
+
+
+def test_nested_spans_share_trace():
+    """Test child spans link to their parent"""
+    tracer = Tracer()
+    with tracer.span("root") as root:
+        with trace_span("child") as child:
+            pass
+
+    spans = tracer.drain()
+    assert [span.name for span in spans] == ["child", "root"]
+    assert child.parent_id == root.span_id
+    assert child.trace_id == root.trace_id
+    assert root.parent_id is None
+
+
+def test_trace_span_without_tracer_is_noop():
+    """Test trace_span does nothing outside of a trace"""
+    with trace_span("orphan") as span:
+        assert span is None
+
+
+def test_unsampled_trace_records_nothing():
+    """Test head sampling drops the whole trace"""
+    tracer = Tracer(sample_rate=0.0)
+    with tracer.span("root") as root:
+        with trace_span("child") as child:
+            pass
+
+    assert root is None and child is None
+    assert tracer.drain() == []
+
+
+def test_error_is_recorded():
+    """Test a failing block marks the span"""
+    tracer = Tracer()
+    with pytest.raises(ValueError):
+        with tracer.span("root"):
+            raise ValueError()
+
+    assert tracer.drain()[0].error == "ValueError"
+
+
+@pytest.mark.asyncio
+async def test_pipeline_hierarchy():
+    """Test spans follow pipeline -> group -> cycle -> stage"""
+    tracer = Tracer()
+    await make_pipeline(tracer).run()
+
+    spans = tracer.drain()
+    names = by_name(spans)
+    assert len([span for span in spans if span.name == "first"]) == 2
+    cycles = {span.span_id: span for span in spans if span.name == "cycle"}
+    assert names["group"].parent_id in cycles
+    assert cycles[names["group"].parent_id].parent_id == names["pipeline"].span_id
+    assert cycles[names["first"].parent_id].parent_id == names["group"].span_id
+
+
+@pytest.mark.asyncio
+async def test_propagation_into_threads():
+    """Test spans recorded in threads link to the group cycle"""
+    tracer = Tracer()
+    pipeline = make_pipeline(
+        tracer, MultithreadExecutionStrategy(), pipeline_type=PipeLineType.ADVANCED
+    )
+    await pipeline.run()
+
+    spans = tracer.drain()
+    cycles = {span.span_id for span in spans if span.name == "cycle"}
+    stages = [span for span in spans if span.name in ("first", "second")]
+    assert len(stages) == 4
+    assert all(span.parent_id in cycles for span in stages)
+
+
+@pytest.mark.asyncio
+async def test_propagation_into_processes():
+    """Test spans recorded in worker processes are collected by the parent"""
+    tracer = Tracer()
+    pipeline = make_pipeline(
+        tracer, MultiprocessExecutionStrategy(), pipeline_type=PipeLineType.ADVANCED
+    )
+    await pipeline.run()
+
+    spans = tracer.drain()
+    cycles = {span.span_id for span in spans if span.name == "cycle"}
+    stages = [span for span in spans if span.name in ("first", "second")]
+    assert len(stages) == 4
+    assert all(span.parent_id in cycles for span in stages)
+    assert {span.trace_id for span in spans} == {spans[0].trace_id}
+
+
+def test_chrome_trace_exporter(tmp_path):
+    """Test spans are written as Chrome trace events"""
+    path = tmp_path / "trace.json"
+    tracer = Tracer(exporter=ChromeTraceExporter(str(path)))
+    with tracer.span("root", kind="Pipeline"):
+        pass
+    tracer.flush()
+
+    events = json.loads(path.read_text())
+    assert events[0]["name"] == "root"
+    assert events[0]["ph"] == "X"
+    assert events[0]["cat"] == "Pipeline"
+
+
+def test_chrome_trace_exporter_appends(tmp_path):
+    """Test later flushes append their events and keep the file valid JSON"""
+    path = tmp_path / "trace.json"
+    tracer = Tracer(exporter=ChromeTraceExporter(str(path)))
+    for name in ("first", "second"):
+        with tracer.span(name):
+            pass
+        tracer.flush()
+    tracer.flush()
+
+    events = json.loads(path.read_text())
+    assert [event["name"] for event in events] == ["first", "second"]
+
+
+def test_otlp_payload():
+    """Test spans are encoded as OTLP JSON"""
+    tracer = Tracer()
+    with tracer.span("root"):
+        pass
+    payload = OTLPJsonExporter().encode(tracer.drain())
+
+    span = payload["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert span["name"] == "root"
+    assert len(span["traceId"]) == 32
+    assert len(span["spanId"]) == 16
@@ -0,0 +1,46 @@
+""" Contains tests for freeze"""
+import array
+from collections import namedtuple
+
+import pytest
+
+from dynapipeline.utils.freeze import FrozenDict, freeze, frozen_hash
+
+Point = namedtuple("Point", "x y")
+
+
+def test_freeze_nested_values():
+    """Test nested containers become immutable equivalents"""
+    frozen = freeze({"a": [1, {"b": {2, 3}}], "p": Point([1], 2)})
+
+    assert isinstance(frozen, FrozenDict)
+    assert frozen["a"] == (1, FrozenDict({"b": frozenset({2, 3})}))
+    assert frozen["p"] == Point((1,), 2)
+    assert frozen == {"a": (1, {"b": frozenset({2, 3})}), "p": Point((1,), 2)}
+
+
+def test_frozen_values_are_hashable():
+    """Test equal frozen values have equal hashes"""
+    first = freeze({"a": [1, 2], "b": bytearray(b"xy")})
+    second = freeze({"b": bytearray(b"xy"), "a": [1, 2]})
+
+    assert hash(first) == hash(second)
+    with pytest.raises(TypeError):
+        first["c"] = 1
+
+
+def test_buffers_become_readonly_views():
+    """Test mutable buffers are shared as read-only memoryviews"""
+    values = array.array("d", [1.0, 2.0])
+    frozen = freeze(values)
+
+    values[0] = 5.0
+    assert frozen.readonly
+    assert frozen[0] == 5.0
+    with pytest.raises(TypeError):
+        frozen[0] = 1.0
+
+
+def test_frozen_hash_of_tuples_with_views():
+    """Test frozen_hash supports sequences holding read-only views"""
+    assert frozen_hash(freeze([bytearray(b"a")])) == frozen_hash(freeze([b"a"]))
@@ -5,6 +5,7 @@ from typing import Any, Awaitable, Callable
 
 import pytest
 
+from dynapipeline.core.handler_registry import AbstractHandlerRegistry
 from dynapipeline.handlers.handler_registry import HandlerRegistry
 
 
@@ -237,3 +238,37 @@ async def test_notify_around(
     await handler_registry.notify("around", mock_execute)
 
     assert test_handler_two.around_called is True
+
+
+@pytest.mark.asyncio
+async def test_detach_removes_handler_methods(
+    handler_registry, test_handler_one, test_handler_three, test_component
+):
+    """Test detaching a handler removes only its methods"""
+    handler_registry.attach([test_handler_one, test_handler_three])
+
+    handler_registry.detach([test_handler_one])
+    await handler_registry.notify("before", test_component)
+
+    assert "after" not in handler_registry._items
+    assert test_handler_one.before_called is False
+    assert test_handler_three.before_called is True
+
+
+def test_registry_without_detach_can_be_created():
+    """Test registries written before detach existed still work until detaching"""
+
+    class AttachOnlyRegistry(AbstractHandlerRegistry):
+        """A registry implementing only attach and notify"""
+
+        def attach(self, handler):
+            """Ignores the handlers"""
+
+        async def notify(self, method_name, *args, **kwargs):
+            """Notifies nobody"""
+
+    registry = AttachOnlyRegistry()
+    registry.attach([])
+
+    with pytest.raises(NotImplementedError):
+        registry.detach([])